@@ -0,0 +1,250 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from datetime import date, datetime, time, timedelta
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from psycopg import Cursor
+from psycopg import connect as pg_connect
+from psycopg.rows import tuple_row
+
+from common.settings import settings
+
+# Arquivamento da bronze de acessos em Parquet (zstd) com retenção.
+#
+# Linhas com extracted_at mais antigo que BRONZE_RETENTION_DAYS e que já estão
+# na silver-transacional são exportadas por dia (fuso app_tz) para
+#   <BRONZE_ARCHIVE_DIR>/<tabela>/dt=YYYY-MM-DD/<tabela>_YYYYMMDD_<hhmmss>.parquet
+# O arquivo é relido e a contagem conferida antes do DELETE (mesma transação que
+# grava o manifesto em _control.bronze_archive_manifest). Linhas ainda ausentes
+# da silver nunca são arquivadas (o heal da silver depende delas).
+#
+# O payload vai como texto JSON; as colunas geradas/tipadas vão junto, mas no
+# replay só as colunas regulares da tabela atual são regravadas (as geradas
+# são recalculadas pelo Postgres).
+
+ARCHIVE_TABLES = {
+    "limber_acessos_raw": {
+        "key": "nrvoucher",
+        "in_silver": 'exists (select 1 from "_silver-transacional".s_limber_acesso s where s.id_acesso = b.nrvoucher)',
+    },
+    "quality_acessos_raw": {
+        "key": "idacesso",
+        "in_silver": (
+            'exists (select 1 from "_silver-transacional".s_quality_acesso s '
+            "where s.id_acesso = (b.\"idacesso\")::bigint)"
+        ),
+    },
+}
+
+MANIFEST_DDL = """
+create table if not exists _control.bronze_archive_manifest (
+    tabela           text        not null,
+    dia              date        not null,
+    arquivo          text        not null,
+    linhas           bigint      not null,
+    min_extracted_at timestamptz,
+    max_extracted_at timestamptz,
+    sha256           text        not null,
+    archived_at      timestamptz not null default now(),
+    primary key (tabela, arquivo)
+);
+"""
+
+DIAS_ARQUIVAVEIS_SQL = """
+select distinct (b.extracted_at at time zone %(tz)s)::date as dia
+from _bronze.{table} b
+where b.extracted_at < %(limite)s
+  and {in_silver}
+order by 1;
+"""
+
+LINHAS_DIA_SQL = """
+select b.*
+from _bronze.{table} b
+where b.extracted_at >= %(inicio)s
+  and b.extracted_at < %(fim)s
+  and {in_silver};
+"""
+
+DELETE_KEYS_SQL = """
+delete from _bronze.{table}
+where {key} = any(%(keys)s);
+"""
+
+INSERT_MANIFEST_SQL = """
+insert into _control.bronze_archive_manifest (
+    tabela, dia, arquivo, linhas, min_extracted_at, max_extracted_at, sha256
+)
+values (%s, %s, %s, %s, %s, %s, %s);
+"""
+
+MANIFEST_RANGE_SQL = """
+select arquivo, linhas
+from _control.bronze_archive_manifest
+where tabela = %(tabela)s
+  and dia between %(inicio)s and %(fim)s
+order by dia, arquivo;
+"""
+
+REGULAR_COLUMNS_SQL = """
+select column_name
+from information_schema.columns
+where table_schema = '_bronze'
+  and table_name = %s
+  and is_generated = 'NEVER'
+order by ordinal_position;
+"""
+
+
+def _day_bounds(dia: date, tz: ZoneInfo) -> tuple[datetime, datetime]:
+    inicio = datetime.combine(dia, time(0, 0), tzinfo=tz)
+    return inicio, inicio + timedelta(days=1)
+
+
+def _sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _to_arrow(columns: list[str], rows: list[tuple]) -> pa.Table:
+    data = {name: [r[i] for r in rows] for i, name in enumerate(columns)}
+    if "payload" in data:
+        data["payload"] = [None if p is None else json.dumps(p, default=str, ensure_ascii=False) for p in data["payload"]]
+    return pa.Table.from_pydict(data)
+
+
+def archive_day(cur: Cursor, table: str, dia: date, tz: ZoneInfo, base_dir: Path) -> int:
+    """
+    Exporta, confere e apaga da bronze as linhas de um dia. Não faz commit.
+    Retorna quantas linhas foram arquivadas.
+    """
+    cfg = ARCHIVE_TABLES[table]
+    inicio, fim = _day_bounds(dia, tz)
+    cur.execute(LINHAS_DIA_SQL.format(table=table, in_silver=cfg["in_silver"]), {"inicio": inicio, "fim": fim})
+    rows = cur.fetchall()
+    if not rows:
+        return 0
+    columns = [d.name for d in cur.description]
+
+    part_dir = base_dir / table / f"dt={dia.isoformat()}"
+    part_dir.mkdir(parents=True, exist_ok=True)
+    path = part_dir / f"{table}_{dia.strftime('%Y%m%d')}_{datetime.now().strftime('%H%M%S')}.parquet"
+    tmp = path.with_suffix(".parquet.tmp")
+
+    pq.write_table(_to_arrow(columns, rows), tmp, compression="zstd")
+    if pq.ParquetFile(tmp).metadata.num_rows != len(rows):
+        tmp.unlink()
+        raise RuntimeError(f"[ARCHIVE] contagem divergente no arquivo {tmp}")
+    os.replace(tmp, path)
+
+    key_idx = columns.index(cfg["key"])
+    ext_idx = columns.index("extracted_at")
+    keys = [r[key_idx] for r in rows]
+    extracted = [r[ext_idx] for r in rows if r[ext_idx] is not None]
+
+    cur.execute(
+        INSERT_MANIFEST_SQL,
+        (
+            table,
+            dia,
+            str(path),
+            len(rows),
+            min(extracted, default=None),
+            max(extracted, default=None),
+            _sha256(path),
+        ),
+    )
+    cur.execute(DELETE_KEYS_SQL.format(table=table, key=cfg["key"]), {"keys": keys})
+    if cur.rowcount != len(rows):
+        raise RuntimeError(
+            f"[ARCHIVE] {table} {dia}: apagadas {cur.rowcount} linhas, esperado {len(rows)} (rollback)"
+        )
+    return len(rows)
+
+
+def archive_bronze_acessos(retention_days: int | None = None) -> int:
+    """
+    Arquiva (Parquet zstd + manifesto) e remove da bronze as linhas mais
+    antigas que a retenção. Um commit por dia arquivado.
+    """
+    retention_days = settings.bronze_retention_days if retention_days is None else retention_days
+    tz = ZoneInfo(settings.app_tz)
+    base_dir = Path(settings.bronze_archive_dir)
+    limite = datetime.now(tz) - timedelta(days=retention_days)
+
+    total = 0
+    with pg_connect(settings.pg_dsn(), row_factory=tuple_row) as conn:
+        with conn.cursor() as cur:
+            cur.execute(MANIFEST_DDL)
+            conn.commit()
+
+            for table, cfg in ARCHIVE_TABLES.items():
+                cur.execute(
+                    DIAS_ARQUIVAVEIS_SQL.format(table=table, in_silver=cfg["in_silver"]),
+                    {"tz": settings.app_tz, "limite": limite},
+                )
+                dias = [r[0] for r in cur.fetchall()]
+                for dia in dias:
+                    # o último dia pode cruzar o limite: só arquiva dias inteiros
+                    if _day_bounds(dia, tz)[1] > limite:
+                        continue
+                    try:
+                        n = archive_day(cur, table, dia, tz, base_dir)
+                        conn.commit()
+                    except Exception:
+                        conn.rollback()
+                        raise
+                    print(f"[ARCHIVE] _bronze.{table} {dia.isoformat()}: {n} linhas")
+                    total += n
+    return total
+
+
+def replay_bronze_archive(table: str, inicio: date, fim: date) -> int:
+    """
+    Re-materializa na bronze as linhas arquivadas de [inicio, fim] (por dia do
+    manifesto). Idempotente: ON CONFLICT na chave da tabela.
+    """
+    cfg = ARCHIVE_TABLES[table]
+    inserted = 0
+    with pg_connect(settings.pg_dsn(), row_factory=tuple_row) as conn:
+        with conn.cursor() as cur:
+            cur.execute(MANIFEST_RANGE_SQL, {"tabela": table, "inicio": inicio, "fim": fim})
+            arquivos = cur.fetchall()
+
+            cur.execute(REGULAR_COLUMNS_SQL, (table,))
+            regulares = [r[0] for r in cur.fetchall()]
+
+            for arquivo, linhas in arquivos:
+                arrow = pq.read_table(arquivo)
+                if arrow.num_rows != linhas:
+                    raise RuntimeError(f"[REPLAY] {arquivo}: {arrow.num_rows} linhas, manifesto diz {linhas}")
+
+                columns = [c for c in regulares if c in arrow.column_names]
+                cols_sql = ", ".join(f'"{c}"' for c in columns)
+                cur.execute(
+                    f"create temp table bronze_replay_stage as "
+                    f"select {cols_sql} from _bronze.{table} with no data"
+                )
+                with cur.copy(f"copy pg_temp.bronze_replay_stage ({cols_sql}) from stdin") as copy:
+                    for row in zip(*(arrow.column(c).to_pylist() for c in columns)):
+                        copy.write_row(row)
+                cur.execute(
+                    f"insert into _bronze.{table} ({cols_sql}) "
+                    f"select {cols_sql} from pg_temp.bronze_replay_stage "
+                    f'on conflict ("{cfg["key"]}") do nothing'
+                )
+                n = cur.rowcount
+                inserted += n
+                cur.execute("drop table pg_temp.bronze_replay_stage")
+                print(f"[REPLAY] {arquivo}: +{n}")
+        conn.commit()
+    return inserted
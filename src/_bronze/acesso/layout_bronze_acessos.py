@@ -0,0 +1,276 @@
+from __future__ import annotations
+
+from psycopg import Cursor, sql
+from psycopg import connect as pg_connect
+from psycopg.rows import tuple_row
+
+from common.settings import settings
+
+# Colunas tipadas das tabelas bronze de acessos.
+#
+# A silver lia os campos quentes direto do JSONB a cada linha
+# (payload->>'DTBAIXA', payload->>'data_hora_entrada', regex/split de
+# categoria_tipo_ingresso), destoastando e parseando o documento inteiro.
+# Aqui esses campos viram colunas STORED GENERATED, calculadas uma vez na
+# escrita da bronze e indexadas; a silver passa a ler colunas estreitas.
+#
+# Expressões de coluna gerada precisam ser IMMUTABLE: o cast text->timestamp
+# depende de DateStyle, por isso fica encapsulado em funções do schema _bronze
+# (o payload é sempre gravado em ISO pelos loaders).
+#
+# A migração (ADD COLUMN ... GENERATED reescreve a tabela) roda uma vez pelo
+# script run_bronze_typed_columns.py; até lá a silver detecta a ausência das
+# colunas e continua lendo o payload.
+#
+# Modo "landing" tipado (BRONZE_TYPED=true, run_bronze_typed_columns.py --landing):
+# as colunas de LANDING_COLUMNS deixam de ser geradas (DROP EXPRESSION) e os
+# loaders gravam os valores nativos do driver (datetime/Decimal) direto nelas,
+# via COPY, retirando essas chaves do payload (payload compacto). A silver lê
+# coalesce(coluna, payload) e continua correta para linhas antigas.
+# id_tipo_ingresso / tipo_ingresso (DERIVED_COLUMNS) são calculados no loader
+# pelo parser Python de categoria_tipo_ingresso, uma vez por valor distinto.
+#
+# As funções _bronze.categoria_* são a única definição SQL das regras de
+# categoria_tipo_ingresso (o parser Python as espelha): coluna gerada, backfill
+# do landing e a silver em modo payload usam essas funções. Linhas do landing
+# gravadas sem as colunas derivadas (BRONZE_TYPED=false) são preenchidas por
+# backfill_categoria_columns antes da silver, que então só projeta as colunas.
+
+FUNCTIONS_DDL = """
+create or replace function _bronze.ts_texto(valor text)
+returns timestamp
+language sql
+immutable
+parallel safe
+as $$
+  select nullif(valor, '')::timestamp
+$$;
+
+-- id_tipo_ingresso: só converte se a parte antes do " - " for numérica
+create or replace function _bronze.categoria_id_tipo_ingresso(categoria text)
+returns bigint
+language sql
+immutable
+parallel safe
+as $$
+  select case
+    when position(' - ' in coalesce(categoria, '')) > 0
+     and regexp_replace(trim(split_part(categoria, ' - ', 1)), '\\s+', '', 'g') ~ '^\\d+$'
+      then regexp_replace(trim(split_part(categoria, ' - ', 1)), '\\s+', '', 'g')::bigint
+    else null
+  end
+$$;
+
+-- tipo_ingresso (desc) com regra OUTROS se inválido/nulo/sem delimitador
+create or replace function _bronze.categoria_tipo_ingresso(categoria text)
+returns text
+language sql
+immutable
+parallel safe
+as $$
+  select case
+    when categoria is null then 'OUTROS'
+    when trim(categoria) = '' then 'OUTROS'
+    when position(' - ' in categoria) = 0 then 'OUTROS'
+    when not (regexp_replace(trim(split_part(categoria, ' - ', 1)), '\\s+', '', 'g') ~ '^\\d+$')
+      then 'OUTROS'
+    else nullif(trim(split_part(categoria, ' - ', 2)), '')
+  end
+$$;
+"""
+
+# coluna -> (tipo, expressão sobre payload)
+LIMBER_COLUMNS = {
+    "dt_hr_voucher": ("timestamp", "_bronze.ts_texto(payload->>'DT_HR_VOUCHER')"),
+    "dt_hr_baixa": ("timestamp", "_bronze.ts_texto(payload->>'DTBAIXA')"),
+    "qtd": ("numeric", "nullif(payload->>'QTDE', '')::numeric"),
+    "vlr_unit": ("numeric", "nullif(payload->>'VLR_UNITARIO', '')::numeric"),
+}
+
+QUALITY_COLUMNS = {
+    "dt_hr_entrada": ("timestamp", "_bronze.ts_texto(payload->>'data_hora_entrada')"),
+    "dt_hr_saida": ("timestamp", "_bronze.ts_texto(payload->>'data_hora_saida')"),
+    "id_emp_relac": ("bigint", "nullif(payload->>'idEmpresaRelacionamento', '')::bigint"),
+    "id_tipo_ingresso": ("bigint", "_bronze.categoria_id_tipo_ingresso(payload->>'categoria_tipo_ingresso')"),
+    "tipo_ingresso": ("text", "_bronze.categoria_tipo_ingresso(payload->>'categoria_tipo_ingresso')"),
+}
+
+BRONZE_TABLES = {
+    "limber_acessos_raw": LIMBER_COLUMNS,
+    "quality_acessos_raw": QUALITY_COLUMNS,
+}
+
+# índices sobre as colunas tipadas (filtros por dia/horário de acesso)
+BRONZE_INDEXES = {
+    "limber_acessos_raw": ("dt_hr_baixa",),
+    "quality_acessos_raw": ("dt_hr_entrada",),
+}
+
+# colunas gravadas pelo loader no modo tipado: coluna -> chave do payload
+LANDING_COLUMNS = {
+    "limber_acessos_raw": {
+        "dt_hr_voucher": "DT_HR_VOUCHER",
+        "dt_hr_baixa": "DTBAIXA",
+        "qtd": "QTDE",
+        "vlr_unit": "VLR_UNITARIO",
+    },
+    "quality_acessos_raw": {
+        "dt_hr_entrada": "data_hora_entrada",
+        "dt_hr_saida": "data_hora_saida",
+        "id_emp_relac": "idEmpresaRelacionamento",
+    },
+}
+
+# colunas derivadas gravadas pelo loader no modo tipado (não vêm de uma chave do payload)
+DERIVED_COLUMNS = {
+    "limber_acessos_raw": (),
+    "quality_acessos_raw": ("id_tipo_ingresso", "tipo_ingresso"),
+}
+
+COLUMNS_PRESENT_SQL = """
+select count(*)
+from information_schema.columns
+where table_schema = '_bronze'
+  and table_name = %s
+  and column_name = any(%s);
+"""
+
+LANDING_READY_SQL = """
+select count(*)
+from information_schema.columns
+where table_schema = '_bronze'
+  and table_name = %s
+  and column_name = any(%s)
+  and is_generated = 'NEVER';
+"""
+
+
+CATEGORIA_FUNCTIONS_PRESENT_SQL = """
+select to_regprocedure('_bronze.categoria_id_tipo_ingresso(text)') is not null
+   and to_regprocedure('_bronze.categoria_tipo_ingresso(text)') is not null;
+"""
+
+# id nulo => tipo 'OUTROS' pelas regras: os dois nulos = linha ainda não preenchida
+BACKFILL_CATEGORIA_SQL = """
+update _bronze.quality_acessos_raw b
+set id_tipo_ingresso = _bronze.categoria_id_tipo_ingresso(b.payload->>'categoria_tipo_ingresso'),
+    tipo_ingresso = _bronze.categoria_tipo_ingresso(b.payload->>'categoria_tipo_ingresso')
+where b.id_tipo_ingresso is null
+  and b.tipo_ingresso is null
+  and (%(since)s::timestamptz is null or b.extracted_at > %(since)s)
+  and (%(until)s::timestamptz is null or b.extracted_at <= %(until)s);
+"""
+
+
+def ensure_categoria_functions(cur: Cursor) -> None:
+    """
+    Cria as funções IMMUTABLE de _bronze só se faltarem (sem DDL a cada carga).
+    """
+    cur.execute(CATEGORIA_FUNCTIONS_PRESENT_SQL)
+    if not cur.fetchone()[0]:
+        cur.execute(FUNCTIONS_DDL)
+
+
+def backfill_categoria_columns(cur: Cursor, since=None, until=None) -> int:
+    """
+    Modo landing: preenche id_tipo_ingresso / tipo_ingresso das linhas do
+    Quality gravadas sem elas, na janela (since, until] de extracted_at
+    (None = sem limite). Não faz commit. Retorna as linhas preenchidas.
+    """
+    cur.execute(BACKFILL_CATEGORIA_SQL, {"since": since, "until": until})
+    return cur.rowcount
+
+
+def has_typed_columns(cur: Cursor, table: str) -> bool:
+    """
+    True quando todas as colunas tipadas de _bronze.<table> já existem.
+    """
+    columns = list(BRONZE_TABLES[table])
+    cur.execute(COLUMNS_PRESENT_SQL, (table, columns))
+    return cur.fetchone()[0] == len(columns)
+
+
+def migrate_bronze_typed_columns() -> None:
+    """
+    Cria as funções IMMUTABLE, adiciona as colunas geradas que faltam
+    (reescreve a tabela: rodar fora do horário do cron) e os índices.
+    """
+    with pg_connect(settings.pg_dsn(), row_factory=tuple_row) as conn:
+        with conn.cursor() as cur:
+            cur.execute(FUNCTIONS_DDL)
+
+            for table, columns in BRONZE_TABLES.items():
+                for column, (col_type, expression) in columns.items():
+                    cur.execute(
+                        sql.SQL(
+                            "alter table {table} add column if not exists {column} {col_type} "
+                            "generated always as ({expression}) stored"
+                        ).format(
+                            table=sql.Identifier("_bronze", table),
+                            column=sql.Identifier(column),
+                            col_type=sql.SQL(col_type),
+                            expression=sql.SQL(expression),
+                        )
+                    )
+                    print(f"[BRONZE] _bronze.{table}.{column} ok")
+
+                for column in BRONZE_INDEXES[table]:
+                    cur.execute(
+                        sql.SQL("create index if not exists {name} on {table} ({column})").format(
+                            name=sql.Identifier(f"ix_{table}_{column}"),
+                            table=sql.Identifier("_bronze", table),
+                            column=sql.Identifier(column),
+                        )
+                    )
+        conn.commit()
+
+
+def landing_columns(table: str) -> list[str]:
+    """
+    Colunas gravadas pelo loader no modo tipado: LANDING_COLUMNS + DERIVED_COLUMNS.
+    """
+    return [*LANDING_COLUMNS[table], *DERIVED_COLUMNS[table]]
+
+
+def is_typed_landing(cur: Cursor, table: str) -> bool:
+    """
+    True quando as colunas de landing de _bronze.<table> existem e são
+    regulares (o loader pode gravá-las).
+    """
+    columns = landing_columns(table)
+    cur.execute(LANDING_READY_SQL, (table, columns))
+    return cur.fetchone()[0] == len(columns)
+
+
+def split_payload(table: str, payload: dict) -> tuple[list, dict]:
+    """
+    Separa os valores nativos das colunas de landing (na ordem de
+    LANDING_COLUMNS[table]) e devolve o payload compacto sem essas chaves.
+    """
+    keys = LANDING_COLUMNS[table]
+    values = [payload.get(key) for key in keys.values()]
+    compact = {k: v for k, v in payload.items() if k not in keys.values()}
+    return values, compact
+
+
+def migrate_bronze_typed_landing() -> None:
+    """
+    Prepara o modo landing tipado: garante as colunas/índices e converte as
+    colunas de landing (LANDING_COLUMNS + DERIVED_COLUMNS) em colunas regulares
+    (DROP EXPRESSION mantém os valores já calculados).
+    """
+    migrate_bronze_typed_columns()
+
+    with pg_connect(settings.pg_dsn(), row_factory=tuple_row) as conn:
+        with conn.cursor() as cur:
+            for table in LANDING_COLUMNS:
+                for column in landing_columns(table):
+                    cur.execute(
+                        sql.SQL("alter table {table} alter column {column} drop expression if exists").format(
+                            table=sql.Identifier("_bronze", table),
+                            column=sql.Identifier(column),
+                        )
+                    )
+                    print(f"[BRONZE] _bronze.{table}.{column} => coluna regular (landing)")
+            print(f"[BRONZE] _bronze.quality_acessos_raw: categorias preenchidas em {backfill_categoria_columns(cur)} linhas")
+        conn.commit()
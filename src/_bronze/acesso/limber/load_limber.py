@@ -8,6 +8,28 @@ from psycopg.rows import tuple_row
 
 from common.settings import settings
 from _bronze.limber.extract_limber import LimberRow
+from _bronze.acesso.layout_bronze_acessos import is_typed_landing, landing_columns, split_payload
+
+LIMBER_TABLE = "limber_acessos_raw"
+_LANDING = ", ".join(landing_columns(LIMBER_TABLE))
+
+# Modo tipado (BRONZE_TYPED): COPY para staging temporária e um único
+# INSERT ... ON CONFLICT, em vez de um INSERT por linha.
+STAGE_DDL = f"""
+create temp table limber_acessos_stage on commit drop as
+select nrvoucher, payload, {_LANDING}
+from _bronze.limber_acessos_raw
+with no data;
+"""
+
+COPY_STAGE_SQL = f"copy pg_temp.limber_acessos_stage (nrvoucher, payload, {_LANDING}) from stdin"
+
+STAGE_TO_RAW_SQL = f"""
+insert into _bronze.limber_acessos_raw (nrvoucher, payload, {_LANDING})
+select nrvoucher, payload, {_LANDING}
+from pg_temp.limber_acessos_stage
+on conflict (nrvoucher) do nothing;
+"""
 
 
 def upsert_watermark(
@@ -49,13 +71,27 @@ def load_limber_rows(rows: Iterable[LimberRow]) -> int:
 
     with pg_connect(settings.pg_dsn(), row_factory=tuple_row) as conn:
         with conn.cursor() as cur:
-            for row in rows:
-                cur.execute(
-                    insert_sql,
-                    (row.nrvoucher, json.dumps(row.payload, default=str)),
-                )
-                inserted += cur.rowcount  # 1 se inseriu, 0 se já existia
-                last_nrvoucher = row.nrvoucher
+            typed = settings.bronze_typed and is_typed_landing(cur, LIMBER_TABLE)
+            if settings.bronze_typed and not typed:
+                print("[LIMBER] BRONZE_TYPED ativo, mas a bronze não tem colunas de landing; usando payload.")
+
+            if typed:
+                cur.execute(STAGE_DDL)
+                with cur.copy(COPY_STAGE_SQL) as copy:
+                    for row in rows:
+                        values, compact = split_payload(LIMBER_TABLE, row.payload)
+                        copy.write_row((row.nrvoucher, json.dumps(compact, default=str), *values))
+                        last_nrvoucher = row.nrvoucher
+                cur.execute(STAGE_TO_RAW_SQL)
+                inserted = cur.rowcount
+            else:
+                for row in rows:
+                    cur.execute(
+                        insert_sql,
+                        (row.nrvoucher, json.dumps(row.payload, default=str)),
+                    )
+                    inserted += cur.rowcount  # 1 se inseriu, 0 se já existia
+                    last_nrvoucher = row.nrvoucher
 
         conn.commit()
 
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from typing import Iterable
+
+# Parser único de categoria_tipo_ingresso do Quality ("<id> - <descrição>").
+#
+# Mesmas regras das funções _bronze.categoria_*_tipo_ingresso
+# (layout_bronze_acessos.FUNCTIONS_DDL, única definição SQL):
+# - id_tipo_ingresso: parte antes do primeiro " - ", sem espaços, se for numérica
+# - tipo_ingresso: parte entre o primeiro e o segundo " - " (trim, vazio => None)
+# - nulo / vazio / sem " - " / id não numérico => ('OUTROS', id None)
+#
+# O conjunto de valores distintos é pequeno (dezenas de categorias), então o
+# resultado é memorizado: cada valor distinto é parseado uma vez por processo.
+
+OUTROS = "OUTROS"
+_DELIMITADOR = " - "
+_ESPACOS = re.compile(r"\s+")
+_NUMERICO = re.compile(r"^\d+$", re.ASCII)
+
+
+@lru_cache(maxsize=4096)
+def parse_categoria_tipo_ingresso(categoria: str | None) -> tuple[int | None, str | None]:
+    """
+    Retorna (id_tipo_ingresso, tipo_ingresso) de um valor de categoria_tipo_ingresso.
+    """
+    if categoria is None or categoria.strip(" ") == "" or _DELIMITADOR not in categoria:
+        return None, OUTROS
+
+    partes = categoria.split(_DELIMITADOR)
+    id_texto = _ESPACOS.sub("", partes[0].strip(" "))
+    if not _NUMERICO.match(id_texto):
+        return None, OUTROS
+
+    descricao = partes[1].strip(" ")
+    return int(id_texto), descricao or None
+
+
+def parse_categorias(categorias: Iterable[str | None]) -> list[tuple[int | None, str | None]]:
+    """
+    Versão em lote: parseia só os valores distintos do lote e mapeia o resultado.
+    """
+    categorias = list(categorias)
+    distintos = {c: parse_categoria_tipo_ingresso(c) for c in set(categorias)}
+    return [distintos[c] for c in categorias]
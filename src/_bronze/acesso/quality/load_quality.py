@@ -1,13 +1,16 @@
 from __future__ import annotations
 
 import json
-from typing import Iterable
+from itertools import islice
+from typing import Iterable, Iterator
 
 from psycopg import connect as pg_connect
 from psycopg.rows import tuple_row
 
 from common.settings import settings
 from _bronze.quality.extract_quality import QualityRow
+from _bronze.acesso.layout_bronze_acessos import is_typed_landing, landing_columns, split_payload
+from _bronze.acesso.quality.categoria_tipo_ingresso import parse_categorias
 
 
 UPSERT_SQL = """
@@ -16,19 +19,74 @@ values (%s, now(), %s::jsonb)
 on conflict (idAcesso) do nothing;
 """
 
+QUALITY_TABLE = "quality_acessos_raw"
+_LANDING = ", ".join(landing_columns(QUALITY_TABLE))
+
+# Modo tipado (BRONZE_TYPED): COPY para staging temporária e um único
+# INSERT ... ON CONFLICT, em vez de um INSERT por linha.
+STAGE_DDL = f"""
+create temp table quality_acessos_stage on commit drop as
+select idAcesso, payload, {_LANDING}
+from _bronze.quality_acessos_raw
+with no data;
+"""
+
+COPY_STAGE_SQL = f"copy pg_temp.quality_acessos_stage (idAcesso, payload, {_LANDING}) from stdin"
+
+# Linhas por lote no COPY do modo tipado (categorias parseadas por lote)
+BATCH_SIZE = 5000
+
+STAGE_TO_RAW_SQL = f"""
+insert into _bronze.quality_acessos_raw (idAcesso, extracted_at, payload, {_LANDING})
+select idAcesso, now(), payload, {_LANDING}
+from pg_temp.quality_acessos_stage
+on conflict (idAcesso) do nothing;
+"""
+
+
+def _lotes(rows: Iterable[QualityRow], size: int) -> Iterator[list[QualityRow]]:
+    it = iter(rows)
+    while lote := list(islice(it, size)):
+        yield lote
+
 
 def load_quality_rows(rows: Iterable[QualityRow]) -> int:
     """
     Idempotente:
     - insere somente se idAcesso ainda não existe na bronze (append-only sem duplicar)
+    - BRONZE_TYPED: colunas nativas + payload compacto via COPY (ver layout_bronze_acessos)
     """
     inserted = 0
     with pg_connect(settings.pg_dsn(), row_factory=tuple_row) as conn:
         with conn.cursor() as cur:
-            for r in rows:
-                payload_json = json.dumps(r.payload, default=str, ensure_ascii=False)
-                cur.execute(UPSERT_SQL, (r.id_acesso, payload_json))
-                # rowcount = 1 quando inseriu, 0 quando já existia (DO NOTHING)
-                inserted += cur.rowcount
+            typed = settings.bronze_typed and is_typed_landing(cur, QUALITY_TABLE)
+            if settings.bronze_typed and not typed:
+                print("[QUALITY] BRONZE_TYPED ativo, mas a bronze não tem colunas de landing; usando payload.")
+
+            if typed:
+                cur.execute(STAGE_DDL)
+                with cur.copy(COPY_STAGE_SQL) as copy:
+                    for lote in _lotes(rows, BATCH_SIZE):
+                        # categoria fica no payload (id_desc_tipo_ingresso na silver)
+                        categorias = parse_categorias(r.payload.get("categoria_tipo_ingresso") for r in lote)
+                        for r, (id_tipo, tipo) in zip(lote, categorias):
+                            values, compact = split_payload(QUALITY_TABLE, r.payload)
+                            copy.write_row(
+                                (
+                                    r.id_acesso,
+                                    json.dumps(compact, default=str, ensure_ascii=False),
+                                    *values,
+                                    id_tipo,
+                                    tipo,
+                                )
+                            )
+                cur.execute(STAGE_TO_RAW_SQL)
+                inserted = cur.rowcount
+            else:
+                for r in rows:
+                    payload_json = json.dumps(r.payload, default=str, ensure_ascii=False)
+                    cur.execute(UPSERT_SQL, (r.id_acesso, payload_json))
+                    # rowcount = 1 quando inseriu, 0 quando já existia (DO NOTHING)
+                    inserted += cur.rowcount
         conn.commit()
     return inserted
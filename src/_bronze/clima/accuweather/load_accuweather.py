@@ -5,6 +5,7 @@ import psycopg2
 from psycopg2.extras import execute_batch
 
 from src.common.settings import settings
+from src._bronze.clima.forecast_hash import skip_unchanged
 
 LOGGER = logging.getLogger(__name__)
 TABLE = '_bronze.scraping_clima_raw'
@@ -21,7 +22,7 @@ def _connect():
     )
 
 
-def load_accuweather(rows: list[dict]) -> int:
+def load_accuweather(rows: list[dict], ingestion_type: str = "scrape_run") -> int:
     if not rows:
         LOGGER.warning("[AccuWeather] Nenhuma linha para inserir.")
         return 0
@@ -49,13 +50,16 @@ def load_accuweather(rows: list[dict]) -> int:
     now = datetime.now(UTC)
     for r in rows:
         r["ingested_at"] = now
-        r["ingestion_type"] = "scrape_run"
+        r["ingestion_type"] = ingestion_type
 
     conn = _connect()
     try:
         with conn.cursor() as cur:
-            # Mais eficiente e confiável que executemany em grandes lotes
-            execute_batch(cur, sql, rows, page_size=200)
+            if settings.clima_skip_unchanged:
+                rows = skip_unchanged(cur, rows)
+            if rows:
+                # Mais eficiente e confiável que executemany em grandes lotes
+                execute_batch(cur, sql, rows, page_size=200)
         conn.commit()
     except Exception:
         conn.rollback()
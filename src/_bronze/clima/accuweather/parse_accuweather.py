@@ -0,0 +1,154 @@
+import logging
+from datetime import datetime, timedelta
+
+import lxml.html
+from bs4 import BeautifulSoup
+
+from src._bronze.clima.xpath import has_class
+
+LOGGER = logging.getLogger(__name__)
+
+# Parsers da página diária do AccuWeather (um por backend, mesma saída).
+# Escolha do backend: src/_bronze/clima/parser_backends.py (CLIMA_PARSER_BACKEND).
+
+
+def _temp(txt: str | None) -> int | None:
+    if not txt:
+        return None
+    # o AccuWeather às vezes vem como "/20" ou " / 20° "
+    txt = txt.strip().replace("°", "").replace("/", "").strip()
+    # extrai apenas dígitos (e sinal, se existir)
+    digits = "".join(ch for ch in txt if ch.isdigit() or ch == "-")
+    return int(digits) if digits else None
+
+
+def accuweather_row(
+    scraped_at: datetime,
+    cidade: str,
+    total_dias: int,
+    idx: int,
+    temp_min: int | None,
+    temp_max: int | None,
+    campos: dict[str, str],
+) -> dict:
+    return {
+        "data_scrap": scraped_at.date().isoformat(),
+        "hora_scrap": scraped_at.time().strftime("%H:%M:%S"),
+        "origem": "AccuWeather",
+        "cidade": cidade,
+        "total_dias": total_dias,
+        "bloco": idx,
+        "data_previsao": (scraped_at + timedelta(days=idx)).date().isoformat(),
+        "tempmin": temp_min,
+        "tempmax": temp_max,
+        "sensacao_termica": campos["sensacao_termica"],
+        "sensacao_sombra": campos["sensacao_sombra"],
+        "ind_max_uv": campos["ind_max_uv"],
+        "vento": campos["vento"],
+        "probab_chuva": campos["probab_chuva"],
+        "relatorio": campos["relatorio"],
+    }
+
+
+def _panel_field(txt: str) -> str | None:
+    if "RealFeel®" in txt:
+        return "sensacao_termica"
+    if "RealFeel Shade™" in txt:
+        return "sensacao_sombra"
+    if "UV" in txt:
+        return "ind_max_uv"
+    if "Vento" in txt:
+        return "vento"
+    return None
+
+
+def _campos_vazios() -> dict[str, str]:
+    return dict.fromkeys(
+        ("probab_chuva", "relatorio", "sensacao_termica", "sensacao_sombra", "ind_max_uv", "vento"), "N/A"
+    )
+
+
+def parse_accuweather_bs4(html: str, cidade: str, scraped_at: datetime, features: str = "html.parser") -> list[dict]:
+    """
+    Linhas da bronze a partir do HTML da página diária (BeautifulSoup).
+    """
+    results: list[dict] = []
+    soup = BeautifulSoup(html, features)
+    blocos = soup.find_all("div", class_="daily-wrapper")
+
+    for idx, bloco in enumerate(blocos):
+        try:
+            temp_max = None
+            temp_min = None
+            try:
+                temp_max = _temp(span.text if (span := bloco.find("span", "high")) else None)
+                temp_min = _temp(span.text if (span := bloco.find("span", "low")) else None)
+            except Exception:
+                LOGGER.warning(f"[AccuWeather] Falha ao ler temperaturas ({cidade} bloco {idx})", exc_info=True)
+
+            campos = _campos_vazios()
+            if (p := bloco.find("div", class_="precip")):
+                campos["probab_chuva"] = p.text.strip()
+            if (r := bloco.find("div", class_="phrase")):
+                campos["relatorio"] = r.text.strip()
+            if (panels := bloco.find("div", class_="panels")):
+                for el in panels.find_all("p", class_="panel-item"):
+                    if (campo := _panel_field(el.text)):
+                        campos[campo] = el.find("span", "value").text
+
+            results.append(accuweather_row(scraped_at, cidade, len(blocos), idx, temp_min, temp_max, campos))
+
+        except Exception as e:
+            LOGGER.exception(f"[AccuWeather] Erro no bloco {idx} ({cidade}): {e}")
+
+    return results
+
+
+_BLOCOS_XP = f"//div[{has_class('daily-wrapper')}]"
+_HIGH_XP = f"(.//span[{has_class('high')}])[1]"
+_LOW_XP = f"(.//span[{has_class('low')}])[1]"
+_PRECIP_XP = f"(.//div[{has_class('precip')}])[1]"
+_PHRASE_XP = f"(.//div[{has_class('phrase')}])[1]"
+_PANELS_XP = f"(.//div[{has_class('panels')}])[1]"
+_PANEL_ITEM_XP = f".//p[{has_class('panel-item')}]"
+_VALUE_XP = f"(.//span[{has_class('value')}])[1]"
+
+
+def _first(el, xpath: str):
+    found = el.xpath(xpath)
+    return found[0] if found else None
+
+
+def parse_accuweather_lxml(html: str, cidade: str, scraped_at: datetime) -> list[dict]:
+    """
+    Mesma saída de parse_accuweather_bs4, com lxml + XPath (sem árvore bs4).
+    """
+    results: list[dict] = []
+    blocos = lxml.html.fromstring(html).xpath(_BLOCOS_XP)
+
+    for idx, bloco in enumerate(blocos):
+        try:
+            temp_max = None
+            temp_min = None
+            try:
+                temp_max = _temp(span.text_content() if (span := _first(bloco, _HIGH_XP)) is not None else None)
+                temp_min = _temp(span.text_content() if (span := _first(bloco, _LOW_XP)) is not None else None)
+            except Exception:
+                LOGGER.warning(f"[AccuWeather] Falha ao ler temperaturas ({cidade} bloco {idx})", exc_info=True)
+
+            campos = _campos_vazios()
+            if (p := _first(bloco, _PRECIP_XP)) is not None:
+                campos["probab_chuva"] = p.text_content().strip()
+            if (r := _first(bloco, _PHRASE_XP)) is not None:
+                campos["relatorio"] = r.text_content().strip()
+            if (panels := _first(bloco, _PANELS_XP)) is not None:
+                for el in panels.xpath(_PANEL_ITEM_XP):
+                    if (campo := _panel_field(el.text_content())):
+                        campos[campo] = _first(el, _VALUE_XP).text_content()
+
+            results.append(accuweather_row(scraped_at, cidade, len(blocos), idx, temp_min, temp_max, campos))
+
+        except Exception as e:
+            LOGGER.exception(f"[AccuWeather] Erro no bloco {idx} ({cidade}): {e}")
+
+    return results
@@ -0,0 +1,92 @@
+import logging
+from dataclasses import dataclass
+
+from selenium import webdriver
+
+from src.common.settings import settings
+
+LOGGER = logging.getLogger(__name__)
+
+# Perfis de navegação do scraping de clima.
+#
+# full: carrega a página inteira (comportamento original).
+# lean: bloqueia imagens, fontes, mídia e domínios de anúncio/tracking via CDP
+#       (Network.setBlockedURLs) e usa pageLoadStrategy=eager: o get() volta no
+#       DOMContentLoaded e a prontidão fica com o poll de readiness.py.
+#
+# O perfil é escolhido por provedor em CLIMA_LEAN_PROVIDERS. A estratégia de
+# carga é da sessão, então o pool mantém drivers separados por perfil; o
+# bloqueio de URLs é reaplicado a cada tarefa.
+#
+# page_metrics() lê o Navigation/Resource Timing da página para comparar os
+# perfis (tempo de carga e bytes). transferSize de recursos de terceiros sem
+# Timing-Allow-Origin vem 0, então os bytes são um piso.
+
+FULL = "full"
+LEAN = "lean"
+
+LEAN_BLOCKED_URLS = (
+    # imagens / fontes / mídia
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.mp4", "*.webm", "*.m3u8", "*.mp3",
+    # anúncios / tracking
+    "*doubleclick.net*", "*googlesyndication.com*", "*googleadservices.com*",
+    "*google-analytics.com*", "*googletagmanager.com*", "*googletagservices.com*",
+    "*adservice.google.*", "*amazon-adsystem.com*", "*adnxs.com*", "*criteo.*",
+    "*taboola.com*", "*outbrain.com*", "*scorecardresearch.com*", "*facebook.net*",
+    "*hotjar.com*", "*pubmatic.com*", "*rubiconproject.com*", "*openx.net*",
+)
+
+# o buffer padrão de Resource Timing (250) estoura nessas páginas
+_TIMING_BUFFER_JS = "performance.setResourceTimingBufferSize(2000);"
+
+_METRICS_JS = """
+const nav = performance.getEntriesByType('navigation')[0];
+let bytes = nav ? nav.transferSize : 0;
+const res = performance.getEntriesByType('resource');
+for (const r of res) bytes += r.transferSize || 0;
+return {
+  dom_ms: nav ? nav.domContentLoadedEventEnd : null,
+  load_ms: nav && nav.loadEventEnd ? nav.loadEventEnd : performance.now(),
+  bytes: bytes,
+  resources: res.length
+};
+"""
+
+
+@dataclass(frozen=True)
+class BrowserProfile:
+    name: str
+    blocked_urls: tuple[str, ...]
+    page_load_strategy: str
+
+
+PROFILES = {
+    FULL: BrowserProfile(FULL, (), "normal"),
+    LEAN: BrowserProfile(LEAN, LEAN_BLOCKED_URLS, "eager"),
+}
+
+
+def profile_for(provider: str) -> str:
+    lean = {p.strip().lower() for p in settings.clima_lean_providers.split(",") if p.strip()}
+    return LEAN if provider.lower() in lean else FULL
+
+
+def prepare_driver(driver: webdriver.Chrome) -> None:
+    """
+    Uma vez por driver: habilita o domínio Network e aumenta o buffer de timing.
+    """
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": _TIMING_BUFFER_JS})
+
+
+def apply_profile(driver: webdriver.Chrome, profile: str) -> None:
+    """
+    Antes de cada página: lista de bloqueio do perfil (vazia no full).
+    """
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": list(PROFILES[profile].blocked_urls)})
+
+
+def page_metrics(driver: webdriver.Chrome) -> dict:
+    return driver.execute_script(_METRICS_JS)
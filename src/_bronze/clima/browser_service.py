@@ -0,0 +1,336 @@
+import fcntl
+import json
+import logging
+import os
+import shutil
+import signal
+import subprocess
+import time
+import urllib.request
+from dataclasses import dataclass
+from pathlib import Path
+
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+
+from src.common.settings import settings
+from src._bronze.clima.browser_profile import FULL, PROFILES, prepare_driver
+
+LOGGER = logging.getLogger(__name__)
+
+# Serviço local de Chromes "quentes" para o scraping de clima.
+#
+# run_browser_service.py mantém CLIMA_BROWSER_SLOTS Chromes headless vivos, cada
+# um com --remote-debugging-port (CLIMA_BROWSER_BASE_PORT + slot). Os scrapers
+# pegam um slot livre com flock em <CLIMA_BROWSER_STATE_DIR>/slot<N>.lock e se
+# conectam via debugger_address: só sobe o chromedriver (leve), o Chrome já
+# está carregado. Sem slot livre/saudável (ou com o serviço desligado:
+# CLIMA_BROWSER_SLOTS=0) cai no Chrome frio de build_driver().
+#
+# Cada slot conta as páginas servidas em slot<N>.json; o serviço recicla
+# (mata e sobe de novo) o Chrome quando passa de CLIMA_BROWSER_RECYCLE_PAGES,
+# quando o health check (/json/version) falha ou quando um cliente marca o
+# slot como quebrado. A reciclagem só acontece com o slot livre (mesmo flock).
+
+CHROMEDRIVER_PATH = "/usr/bin/chromedriver"
+USER_AGENT = (
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/143.0.0.0 Safari/537.36"
+)
+CHROME_ARGUMENTS = (
+    "--headless=new",
+    "--no-sandbox",
+    "--disable-dev-shm-usage",
+    "--window-size=1920,1080",
+    "--disable-gpu",
+    "--lang=pt-BR",
+    f"--user-agent={USER_AGENT}",
+    "--disable-blink-features=AutomationControlled",
+)
+
+HEALTH_TIMEOUT_S = 2
+HEALTH_INTERVAL_S = 15
+STARTUP_TIMEOUT_S = 30
+
+
+def _configure(driver: webdriver.Chrome) -> webdriver.Chrome:
+    driver.set_page_load_timeout(60)
+    driver.implicitly_wait(10)
+    prepare_driver(driver)
+    return driver
+
+
+def build_driver(profile: str = FULL) -> webdriver.Chrome:
+    """
+    Chrome frio: sobe Chrome + chromedriver novos (fechados no quit()).
+    """
+    options = webdriver.ChromeOptions()
+    for arg in CHROME_ARGUMENTS:
+        options.add_argument(arg)
+    options.page_load_strategy = PROFILES[profile].page_load_strategy
+    return _configure(webdriver.Chrome(service=Service(CHROMEDRIVER_PATH), options=options))
+
+
+@dataclass
+class _Lease:
+    slot: int
+    lock_fd: int
+    pages: int = 0
+
+
+# id(driver) -> lease do slot quente (drivers frios não aparecem aqui)
+_LEASES: dict[int, _Lease] = {}
+
+
+def _state_dir() -> Path:
+    path = Path(settings.clima_browser_state_dir)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def _port(slot: int) -> int:
+    return settings.clima_browser_base_port + slot
+
+
+def _read_state(slot: int) -> dict:
+    path = _state_dir() / f"slot{slot}.json"
+    try:
+        return json.loads(path.read_text())
+    except (FileNotFoundError, ValueError):
+        return {"pid": None, "pages": 0, "broken": False}
+
+
+def _write_state(slot: int, state: dict) -> None:
+    path = _state_dir() / f"slot{slot}.json"
+    tmp = path.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps(state))
+    os.replace(tmp, path)
+
+
+def _try_lock(slot: int) -> int | None:
+    fd = os.open(_state_dir() / f"slot{slot}.lock", os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        os.close(fd)
+        return None
+    return fd
+
+
+def _unlock(fd: int) -> None:
+    fcntl.flock(fd, fcntl.LOCK_UN)
+    os.close(fd)
+
+
+def is_healthy(slot: int) -> bool:
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{_port(slot)}/json/version", timeout=HEALTH_TIMEOUT_S) as resp:
+            return resp.status == 200
+    except Exception:
+        return False
+
+
+def _attach(slot: int, profile: str) -> webdriver.Chrome:
+    options = webdriver.ChromeOptions()
+    options.debugger_address = f"127.0.0.1:{_port(slot)}"
+    options.page_load_strategy = PROFILES[profile].page_load_strategy
+    return _configure(webdriver.Chrome(service=Service(CHROMEDRIVER_PATH), options=options))
+
+
+def open_driver(profile: str = FULL) -> webdriver.Chrome:
+    """
+    Driver para o pool: slot quente livre e saudável, senão Chrome frio.
+    """
+    for slot in range(settings.clima_browser_slots):
+        fd = _try_lock(slot)
+        if fd is None:
+            continue
+        state = _read_state(slot)
+        if state["broken"] or state["pages"] >= settings.clima_browser_recycle_pages or not is_healthy(slot):
+            # aguardando reciclagem pelo serviço
+            _unlock(fd)
+            continue
+        try:
+            driver = _attach(slot, profile)
+        except Exception:
+            LOGGER.warning(f"[Clima] Falha ao conectar no Chrome quente (slot {slot})", exc_info=True)
+            _unlock(fd)
+            continue
+        _LEASES[id(driver)] = _Lease(slot, fd)
+        LOGGER.info(f"[Clima] Chrome quente: slot {slot} (porta {_port(slot)})")
+        return driver
+
+    if settings.clima_browser_slots:
+        LOGGER.info("[Clima] Nenhum Chrome quente livre; subindo Chrome frio")
+    return build_driver(profile)
+
+
+def note_page(driver: webdriver.Chrome) -> None:
+    """
+    Conta uma página servida pelo driver (reciclagem do slot quente).
+    """
+    if (lease := _LEASES.get(id(driver))) is not None:
+        lease.pages += 1
+
+
+def close_driver(driver: webdriver.Chrome, broken: bool = False) -> None:
+    """
+    Devolve o slot quente (o Chrome continua vivo; só o chromedriver sai) ou
+    fecha o Chrome frio. broken=True pede a reciclagem do slot.
+    """
+    lease = _LEASES.pop(id(driver), None)
+    if lease is None:
+        driver.quit()
+        return
+
+    try:
+        if not broken:
+            # não deixa a página anterior rodando JS no Chrome quente
+            driver.get("about:blank")
+    except Exception:
+        broken = True
+    finally:
+        try:
+            # conectado via debugger_address: quit() encerra a sessão/chromedriver, não o Chrome
+            driver.quit()
+        except Exception:
+            broken = True
+        state = _read_state(lease.slot)
+        state["pages"] = state.get("pages", 0) + lease.pages
+        state["broken"] = state.get("broken", False) or broken
+        _write_state(lease.slot, state)
+        _unlock(lease.lock_fd)
+
+
+# ---------------------------------------------------------------------------
+# Processo do serviço (run_browser_service.py)
+# ---------------------------------------------------------------------------
+
+
+# pid -> processo do Chrome iniciado por este serviço (para reaproveitar o wait)
+_PROCS: dict[int, subprocess.Popen] = {}
+
+
+def _kill(pid: int | None) -> None:
+    if not pid:
+        return
+    try:
+        os.killpg(pid, signal.SIGTERM)
+    except ProcessLookupError:
+        _PROCS.pop(pid, None)
+        return
+
+    proc = _PROCS.pop(pid, None)
+    if proc is not None:
+        try:
+            proc.wait(timeout=5)
+            return
+        except subprocess.TimeoutExpired:
+            pass
+    else:
+        # pid de uma execução anterior (não é filho deste processo)
+        for _ in range(20):
+            try:
+                os.kill(pid, 0)
+            except ProcessLookupError:
+                return
+            time.sleep(0.25)
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+    if proc is not None:
+        proc.wait()
+
+
+def _start_chrome(slot: int) -> int:
+    profile = _state_dir() / f"profile{slot}"
+    shutil.rmtree(profile, ignore_errors=True)
+    proc = subprocess.Popen(
+        [
+            settings.clima_chrome_bin,
+            *CHROME_ARGUMENTS,
+            f"--remote-debugging-port={_port(slot)}",
+            "--remote-debugging-address=127.0.0.1",
+            f"--user-data-dir={profile}",
+            "about:blank",
+        ],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,  # grupo próprio: o kill leva os processos filhos do Chrome
+    )
+    _PROCS[proc.pid] = proc
+    fim = time.monotonic() + STARTUP_TIMEOUT_S
+    while time.monotonic() < fim:
+        if is_healthy(slot):
+            return proc.pid
+        if proc.poll() is not None:
+            break
+        time.sleep(0.5)
+    _kill(proc.pid)
+    raise RuntimeError(f"[Clima] Chrome do slot {slot} não respondeu na porta {_port(slot)}")
+
+
+def _check_slot(slot: int) -> None:
+    fd = _try_lock(slot)
+    if fd is None:
+        return  # em uso por um scraper: checa na próxima volta
+    try:
+        state = _read_state(slot)
+        motivo = None
+        if state["pid"] is None:
+            motivo = "início"
+        elif state["broken"]:
+            motivo = "marcado como quebrado"
+        elif state["pages"] >= settings.clima_browser_recycle_pages:
+            motivo = f"{state['pages']} páginas"
+        elif not is_healthy(slot):
+            motivo = "health check falhou"
+        if motivo is None:
+            return
+
+        LOGGER.info(f"[Clima][Browser] Reciclando slot {slot} ({motivo})")
+        _kill(state["pid"])
+        pid = _start_chrome(slot)
+        _write_state(slot, {"pid": pid, "pages": 0, "broken": False})
+    except Exception:
+        LOGGER.exception(f"[Clima][Browser] Falha ao subir o slot {slot}")
+        _write_state(slot, {"pid": None, "pages": 0, "broken": False})
+    finally:
+        _unlock(fd)
+
+
+def serve_forever() -> None:
+    """
+    Mantém os slots vivos até SIGTERM/SIGINT; ao sair, fecha os Chromes.
+    """
+    slots = range(settings.clima_browser_slots)
+    if not slots:
+        raise RuntimeError("CLIMA_BROWSER_SLOTS=0: serviço de Chrome quente desligado")
+
+    parar = False
+
+    def _stop(*_):
+        nonlocal parar
+        parar = True
+
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, _stop)
+
+    # descarta estado de uma execução anterior (pids antigos)
+    for slot in slots:
+        _kill(_read_state(slot)["pid"])
+        _write_state(slot, {"pid": None, "pages": 0, "broken": False})
+
+    LOGGER.info(f"[Clima][Browser] {len(slots)} slot(s) a partir da porta {settings.clima_browser_base_port}")
+    while not parar:
+        for slot in slots:
+            _check_slot(slot)
+        for _ in range(HEALTH_INTERVAL_S * 4):
+            if parar:
+                break
+            time.sleep(0.25)
+
+    for slot in slots:
+        _kill(_read_state(slot)["pid"])
+        _write_state(slot, {"pid": None, "pages": 0, "broken": False})
+    LOGGER.info("[Clima][Browser] Serviço encerrado")
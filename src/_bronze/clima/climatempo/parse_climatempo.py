@@ -0,0 +1,134 @@
+import logging
+from datetime import datetime, timedelta
+
+import lxml.html
+from bs4 import BeautifulSoup
+
+from src._bronze.clima.xpath import has_class, strip_text
+
+LOGGER = logging.getLogger(__name__)
+
+# Parsers da previsão de 15 dias do Climatempo (um por backend, mesma saída).
+# Escolha do backend: src/_bronze/clima/parser_backends.py (CLIMA_PARSER_BACKEND).
+
+BLOCK_SELECTOR = 'div[data-visualization-content="list"] section.accordion-card'
+
+
+def _safe_int(text: str | None) -> int | None:
+    if not text:
+        return None
+    s = text.strip().replace("°", "").replace("/", "")
+    digits = "".join(ch for ch in s if ch.isdigit() or ch == "-")
+    return int(digits) if digits else None
+
+
+def climatempo_row(
+    scraped_at: datetime,
+    cidade: str,
+    total_dias: int,
+    idx: int,
+    temps: list[str],
+    prob_chuva: str,
+    vento: str,
+    relatorio: str,
+) -> dict:
+    return {
+        "data_scrap": scraped_at.date().isoformat(),
+        "hora_scrap": scraped_at.time().strftime("%H:%M:%S"),
+        "origem": "Climatempo",
+        "cidade": cidade,
+        "total_dias": total_dias,
+        "bloco": idx,
+        "data_previsao": (scraped_at + timedelta(days=idx)).date().isoformat(),
+        "tempmin": _safe_int(temps[0]) if len(temps) > 0 else None,
+        "tempmax": _safe_int(temps[1]) if len(temps) > 1 else None,
+        "sensacao_termica": "não informado",
+        "sensacao_sombra": "não informado",
+        "ind_max_uv": "não informado",
+        "vento": vento,
+        "probab_chuva": prob_chuva,
+        "relatorio": relatorio,
+    }
+
+
+def parse_climatempo_bs4(html: str, cidade: str, scraped_at: datetime, features: str = "html.parser") -> list[dict]:
+    """
+    Linhas da bronze a partir do HTML da previsão de 15 dias (BeautifulSoup).
+    """
+    results: list[dict] = []
+    soup = BeautifulSoup(html, features)
+    blocos = soup.select(BLOCK_SELECTOR)
+    total_dias = len(blocos)
+
+    for idx, bloco in enumerate(blocos):
+        try:
+            temps = [
+                t.get_text(strip=True)
+                for t in bloco.select("div._flex._flex-column._margin-r-15._margin-l-20 span.-gray")
+            ]
+
+            chuva_elem = bloco.select_one("div._margin-l-5 span._margin-l-5")
+            prob_chuva = chuva_elem.get_text(strip=True) if chuva_elem else "N/A"
+
+            vento = "N/A"
+            for div in bloco.select("div.variable-card._flex._align-center"):
+                if "Vento" in div.get_text(" ", strip=True):
+                    vento_info = div.select_one("div._margin-l-5 div")
+                    vento = vento_info.get_text(" ", strip=True) if vento_info else "N/A"
+                    break
+
+            relatorio_elem = bloco.select_one("p.-gray.-line-height-22")
+            relatorio = relatorio_elem.get_text(" ", strip=True) if relatorio_elem else "N/A"
+
+            results.append(climatempo_row(scraped_at, cidade, total_dias, idx, temps, prob_chuva, vento, relatorio))
+
+        except Exception as e:
+            LOGGER.exception(f"[Climatempo] Erro no bloco {idx} ({cidade}): {e}")
+
+    return results
+
+
+_BLOCOS_XP = f"//div[@data-visualization-content='list']//section[{has_class('accordion-card')}]"
+_TEMPS_XP = f".//div[{has_class('_flex', '_flex-column', '_margin-r-15', '_margin-l-20')}]//span[{has_class('-gray')}]"
+_CHUVA_XP = f"(.//div[{has_class('_margin-l-5')}]//span[{has_class('_margin-l-5')}])[1]"
+_VARIAVEIS_XP = f".//div[{has_class('variable-card', '_flex', '_align-center')}]"
+_VENTO_INFO_XP = f"(.//div[{has_class('_margin-l-5')}]//div)[1]"
+_RELATORIO_XP = f"(.//p[{has_class('-gray', '-line-height-22')}])[1]"
+
+
+def _first(el, xpath: str):
+    found = el.xpath(xpath)
+    return found[0] if found else None
+
+
+def parse_climatempo_lxml(html: str, cidade: str, scraped_at: datetime) -> list[dict]:
+    """
+    Mesma saída de parse_climatempo_bs4, com lxml + XPath (sem árvore bs4).
+    """
+    results: list[dict] = []
+    blocos = lxml.html.fromstring(html).xpath(_BLOCOS_XP)
+    total_dias = len(blocos)
+
+    for idx, bloco in enumerate(blocos):
+        try:
+            temps = [strip_text(t) for t in bloco.xpath(_TEMPS_XP)]
+
+            chuva_elem = _first(bloco, _CHUVA_XP)
+            prob_chuva = strip_text(chuva_elem) if chuva_elem is not None else "N/A"
+
+            vento = "N/A"
+            for div in bloco.xpath(_VARIAVEIS_XP):
+                if "Vento" in strip_text(div, " "):
+                    vento_info = _first(div, _VENTO_INFO_XP)
+                    vento = strip_text(vento_info, " ") if vento_info is not None else "N/A"
+                    break
+
+            relatorio_elem = _first(bloco, _RELATORIO_XP)
+            relatorio = strip_text(relatorio_elem, " ") if relatorio_elem is not None else "N/A"
+
+            results.append(climatempo_row(scraped_at, cidade, total_dias, idx, temps, prob_chuva, vento, relatorio))
+
+        except Exception as e:
+            LOGGER.exception(f"[Climatempo] Erro no bloco {idx} ({cidade}): {e}")
+
+    return results
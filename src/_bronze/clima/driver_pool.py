@@ -0,0 +1,299 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Iterator
+
+from selenium import webdriver
+
+from src.common.settings import settings
+from src._bronze.clima.browser_profile import FULL, PROFILES, apply_profile, page_metrics
+from src._bronze.clima.browser_service import USER_AGENT, close_driver, note_page, open_driver
+from src._bronze.clima.http_fetch import fetch_html, validate_rows
+
+LOGGER = logging.getLogger(__name__)
+
+# Pool limitado de Chrome headless para o scraping de clima.
+#
+# Cada tarefa (provedor, cidade) pega um driver livre do pool, faz a página e
+# devolve o driver; até max_drivers páginas rodam em paralelo. Drivers são
+# criados sob demanda (nunca mais que max_drivers) e fechados no fim.
+# Tempo total ~ a página mais lenta (quando tarefas <= max_drivers), em vez da soma.
+#
+# Com CLIMA_HTTP_FIRST=true, tarefas que têm parse tentam antes um GET simples
+# (http_fetch); o Chrome só é aberto para as cidades cujo HTML não validou.
+#
+# Os drivers vêm de browser_service.open_driver: Chrome quente do serviço local
+# quando houver slot livre, senão Chrome frio. Cada tarefa roda no perfil do
+# seu provedor (browser_profile: full | lean, CLIMA_LEAN_PROVIDERS).
+
+@dataclass(frozen=True)
+class ScrapeTask:
+    provider: str
+    cidade: str
+    url: str
+    # (driver, url, cidade) -> HTML da página pronta (Chrome)
+    render: Callable[[webdriver.Chrome, str, str], str]
+    # (html, cidade, scraped_at) -> linhas da bronze (Chrome e HTTP)
+    parse: Callable[[str, str, datetime], list[dict]]
+    # mínimo de blocos para aceitar o resultado do caminho HTTP
+    min_blocks: int = 1
+    # perfil de navegação (browser_profile): full | lean
+    profile: str = FULL
+
+
+@dataclass(frozen=True)
+class ProviderLimit:
+    # páginas simultâneas do provedor (HTTP ou Chrome)
+    max_parallel: int
+    # intervalo mínimo entre inícios de página do provedor (rate limit)
+    min_interval_s: float = 0.0
+
+
+class _ProviderGate:
+    def __init__(self, limit: ProviderLimit) -> None:
+        self._sem = threading.Semaphore(max(1, limit.max_parallel))
+        self._interval = limit.min_interval_s
+        self._lock = threading.Lock()
+        self._proximo = 0.0
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        with self._sem:
+            with self._lock:
+                espera = self._proximo - time.monotonic()
+                self._proximo = max(self._proximo, time.monotonic()) + self._interval
+            if espera > 0:
+                time.sleep(espera)
+            yield
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    # HTML efetivamente parseado numa tarefa (arquivo de HTML: html_archive.py)
+    provider: str
+    cidade: str
+    url: str
+    scraped_at: datetime
+    via: str  # http | chrome
+    html: str
+    linhas: int
+
+
+class DriverPool:
+    def __init__(
+        self,
+        max_drivers: int,
+        factory: Callable[[str], webdriver.Chrome] = open_driver,
+        closer: Callable[..., None] = close_driver,
+    ) -> None:
+        if max_drivers < 1:
+            raise ValueError("max_drivers deve ser >= 1")
+        self.max_drivers = max_drivers
+        self._factory = factory
+        self._closer = closer
+        # drivers livres por perfil (a estratégia de carga é da sessão)
+        self._idle: dict[str, queue.Queue] = {p: queue.Queue() for p in PROFILES}
+        self._all: list[webdriver.Chrome] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def driver(self, profile: str = FULL) -> Iterator[webdriver.Chrome]:
+        drv = self._acquire(profile)
+        broken = False
+        try:
+            apply_profile(drv, profile)
+            yield drv
+            note_page(drv)
+        except Exception:
+            # sessão pode ter ficado num estado ruim (timeout, crash do renderer)
+            broken = True
+            raise
+        finally:
+            if broken:
+                self._discard(drv)
+            else:
+                self._idle[profile].put(drv)
+
+    def _idle_other(self, profile: str) -> webdriver.Chrome | None:
+        for other, idle in self._idle.items():
+            if other == profile:
+                continue
+            try:
+                return idle.get_nowait()
+            except queue.Empty:
+                pass
+        return None
+
+    def _acquire(self, profile: str) -> webdriver.Chrome:
+        while True:
+            try:
+                return self._idle[profile].get_nowait()
+            except queue.Empty:
+                pass
+            with self._lock:
+                if len(self._all) < self.max_drivers:
+                    # reserva a vaga antes de subir o Chrome (que demora)
+                    self._all.append(None)
+                    break
+            # pool cheio: troca um driver livre de outro perfil por um deste
+            if (other := self._idle_other(profile)) is not None:
+                self._retire(other)
+                continue
+            # senão espera um driver voltar (ou uma vaga abrir por descarte)
+            try:
+                return self._idle[profile].get(timeout=1)
+            except queue.Empty:
+                continue
+        try:
+            drv = self._factory(profile)
+        except Exception:
+            with self._lock:
+                self._all.remove(None)
+            raise
+        with self._lock:
+            self._all[self._all.index(None)] = drv
+        return drv
+
+    def _retire(self, drv: webdriver.Chrome, broken: bool = False) -> None:
+        with self._lock:
+            if drv in self._all:
+                self._all.remove(drv)
+        try:
+            self._closer(drv, broken=broken)
+        except Exception:
+            LOGGER.warning("[Clima] Falha ao fechar driver", exc_info=True)
+
+    def _discard(self, drv: webdriver.Chrome) -> None:
+        self._retire(drv, broken=True)
+
+    def close(self) -> None:
+        with self._lock:
+            drivers = [d for d in self._all if d is not None]
+            self._all.clear()
+        for drv in drivers:
+            try:
+                self._closer(drv)
+            except Exception:
+                LOGGER.warning("[Clima] Falha ao fechar driver", exc_info=True)
+
+    def __enter__(self) -> "DriverPool":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def fetch_http(task: ScrapeTask, scraped_at: datetime) -> tuple[list[dict], str] | None:
+    """
+    Caminho leve: GET + parse. Retorna None (com o motivo no log) quando o
+    resultado não valida e a tarefa deve ir para o Chrome.
+    """
+    inicio = time.monotonic()
+    try:
+        html = fetch_html(task.url, USER_AGENT)
+        rows = task.parse(html, task.cidade, scraped_at)
+    except Exception as exc:
+        LOGGER.info(f"[{task.provider}] {task.cidade}: HTTP falhou ({exc!r}); usando Chrome")
+        return None
+
+    motivo = validate_rows(rows, task.min_blocks)
+    if motivo:
+        LOGGER.info(f"[{task.provider}] {task.cidade}: HTTP rejeitado ({motivo}); usando Chrome")
+        return None
+    LOGGER.info(f"[{task.provider}] {task.cidade}: {len(rows)} blocos via HTTP em {time.monotonic() - inicio:.1f}s")
+    return rows, html
+
+
+def scrape_concurrently(
+    tasks: list[ScrapeTask],
+    max_drivers: int,
+    scraped_at: datetime,
+    http_first: bool | None = None,
+    snapshots: list[Snapshot] | None = None,
+    limits: dict[str, ProviderLimit] | None = None,
+) -> list[tuple[ScrapeTask, list[dict] | Exception]]:
+    """
+    Executa as tarefas no pool (até max_drivers Chromes). Falha de uma
+    cidade não derruba as demais: o resultado traz a exceção no lugar das linhas.
+    Com snapshots, o HTML de cada página parseada é acrescentado à lista.
+    limits: paralelismo / intervalo mínimo por provedor (padrão: max_drivers, sem intervalo).
+    """
+    if not tasks:
+        return []
+    http_first = settings.clima_http_first if http_first is None else http_first
+
+    limits = limits or {}
+    por_provedor: dict[str, int] = {}
+    for task in tasks:
+        por_provedor[task.provider] = por_provedor.get(task.provider, 0) + 1
+    gates = {p: _ProviderGate(limits.get(p, ProviderLimit(max_drivers))) for p in por_provedor}
+    # um worker por página simultânea permitida (o HTTP não ocupa Chrome)
+    workers = sum(min(max(1, limits.get(p, ProviderLimit(max_drivers)).max_parallel), n) for p, n in por_provedor.items())
+
+    def _snapshot(task: ScrapeTask, via: str, html: str, rows: list[dict]) -> None:
+        if snapshots is not None:
+            snapshots.append(Snapshot(task.provider, task.cidade, task.url, scraped_at, via, html, len(rows)))
+
+    # os Chromes são criados sob demanda: se o HTTP resolver tudo, nenhum sobe
+    with DriverPool(min(max_drivers, len(tasks))) as pool:
+
+        def _run(task: ScrapeTask) -> list[dict] | Exception:
+            with gates[task.provider].slot():
+                return _scrape(task)
+
+        def _scrape(task: ScrapeTask) -> list[dict] | Exception:
+            if http_first:
+                if (http := fetch_http(task, scraped_at)) is not None:
+                    rows, html = http
+                    _snapshot(task, "http", html, rows)
+                    return rows
+
+            inicio = time.monotonic()
+            try:
+                with pool.driver(task.profile) as drv:
+                    html = task.render(drv, task.url, task.cidade)
+                    try:
+                        m = page_metrics(drv)
+                        carga = f"carga {m['load_ms'] / 1000:.1f}s, {m['bytes'] / 1024:.0f} KB em {m['resources']} recursos"
+                    except Exception:
+                        carga = "métricas indisponíveis"
+                rows = task.parse(html, task.cidade, scraped_at)
+                _snapshot(task, "chrome", html, rows)
+                LOGGER.info(
+                    f"[{task.provider}] {task.cidade}: {len(rows)} blocos em {time.monotonic() - inicio:.1f}s "
+                    f"(perfil {task.profile}; {carga})"
+                )
+                return rows
+            except Exception as exc:
+                LOGGER.exception(f"[{task.provider}] Falha no scraping: {task.cidade}")
+                return exc
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="clima") as executor:
+            results = list(executor.map(_run, tasks))
+
+    return list(zip(tasks, results))
+
+
+def collect_rows(provider: str, resultados: list[tuple[ScrapeTask, list[dict] | Exception]]) -> list[dict]:
+    """
+    Junta as linhas das cidades que deram certo. Só propaga a falha se
+    nenhuma cidade do provedor funcionou.
+    """
+    rows: list[dict] = []
+    erros: list[Exception] = []
+    for _, res in resultados:
+        if isinstance(res, Exception):
+            erros.append(res)
+        else:
+            rows.extend(res)
+
+    if erros and not rows:
+        raise erros[0]
+    if erros:
+        LOGGER.warning(f"[{provider}] {len(erros)} cidade(s) com falha; seguindo com as demais")
+    return rows
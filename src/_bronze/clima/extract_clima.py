@@ -0,0 +1,56 @@
+import logging
+from datetime import datetime, UTC
+
+from src.common.settings import settings
+from src._bronze.clima.driver_pool import Snapshot, collect_rows, scrape_concurrently
+from src._bronze.clima.html_archive import archive_snapshots
+from src._bronze.clima.targets import TASK_BUILDERS, build_tasks, load_targets
+
+LOGGER = logging.getLogger(__name__)
+
+PROVIDERS = tuple(TASK_BUILDERS)
+
+
+def extract_clima(max_drivers: int | None = None) -> tuple[dict[str, list[dict]], list[str]]:
+    """
+    Scraping dos alvos habilitados em _control.clima_targets (targets.py)
+    num único pool de Chromes (até max_drivers simultâneos; padrão
+    CLIMA_MAX_DRIVERS), respeitando os limites por provedor.
+
+    Com CLIMA_HTML_ARCHIVE=true o HTML de cada página vai para o arquivo
+    (html_archive.py). Retorna (linhas por provedor, provedores que falharam
+    por completo).
+    """
+    targets, limits = load_targets()
+    LOGGER.info(f"[Clima] {len(targets)} alvo(s) habilitado(s) no cadastro")
+
+    scraped_at = datetime.now(UTC)
+    snapshots: list[Snapshot] = []
+    resultados = scrape_concurrently(
+        build_tasks(targets),
+        max_drivers or settings.clima_max_drivers,
+        scraped_at,
+        snapshots=snapshots,
+        limits=limits,
+    )
+
+    if settings.clima_html_archive:
+        # arquivo do HTML é auxiliar: falha aqui não derruba a carga da bronze
+        try:
+            archive_snapshots(snapshots)
+        except Exception:
+            LOGGER.exception("[Clima][HTML] Falha ao arquivar o HTML das páginas")
+
+    rows: dict[str, list[dict]] = {}
+    falhas: list[str] = []
+    for provider in PROVIDERS:
+        if not any(t.provider == provider for t in targets):
+            rows[provider] = []  # provedor sem alvo habilitado: não é falha
+            continue
+        try:
+            rows[provider] = collect_rows(provider, [(t, r) for t, r in resultados if t.provider == provider])
+        except Exception:
+            LOGGER.exception(f"[{provider}] Nenhuma cidade extraída")
+            rows[provider] = []
+            falhas.append(provider)
+    return rows, falhas
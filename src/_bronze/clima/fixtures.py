@@ -0,0 +1,15 @@
+import re
+import unicodedata
+from pathlib import Path
+
+# Fixtures de HTML do scraping de clima (uma página por provedor/cidade),
+# usadas pela checagem/benchmark dos parsers e exportadas pelo re-parse do
+# arquivo de HTML (run_reparse_clima_html.py --fixtures).
+
+FIXTURES_DIR = Path(__file__).resolve().parents[2] / "scripts" / "testes" / "fixtures" / "clima"
+
+
+def fixture_path(provider: str, cidade: str) -> Path:
+    slug = unicodedata.normalize("NFKD", cidade).encode("ascii", "ignore").decode()
+    slug = re.sub(r"[^a-z0-9]+", "_", slug.lower()).strip("_")
+    return FIXTURES_DIR / f"{provider.lower()}_{slug}.html"
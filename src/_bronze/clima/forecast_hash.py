@@ -0,0 +1,147 @@
+import hashlib
+import json
+import logging
+import re
+from datetime import datetime, UTC
+
+LOGGER = logging.getLogger(__name__)
+
+# Curto-circuito de previsões inalteradas no scraping de clima.
+#
+# Para cada (origem, cidade) de um scraping, as linhas (blocos) são
+# normalizadas e viram um sha256. Se o hash for igual ao último registrado em
+# _control.clima_forecast_hash, as linhas não entram na bronze: só
+# last_seen_at é atualizado. Os campos do instante do scraping (data/hora,
+# ingested_at) ficam fora do hash; data_previsao entra, então a virada do dia
+# sempre gera linhas novas.
+#
+# Roda na mesma transação do INSERT da bronze (loaders), então o hash só avança
+# se a carga for confirmada.
+#
+# O hash guarda o instante do scraping (scraped_at) e só avança para um
+# scraping mais recente. Um scraping igual ou mais antigo que o registrado
+# (re-parse do arquivo de HTML, run_reparse_clima_html.py --load) entra
+# sempre na bronze e não mexe no hash.
+
+HASH_FIELDS = (
+    "total_dias",
+    "bloco",
+    "data_previsao",
+    "tempmin",
+    "tempmax",
+    "sensacao_termica",
+    "sensacao_sombra",
+    "ind_max_uv",
+    "vento",
+    "probab_chuva",
+    "relatorio",
+)
+
+HASH_DDL = """
+create table if not exists _control.clima_forecast_hash (
+    origem        text        not null,
+    cidade        text        not null,
+    forecast_hash text        not null,
+    linhas        integer     not null,
+    first_seen_at timestamptz not null,
+    last_seen_at  timestamptz not null,
+    scraped_at    timestamp,
+    primary key (origem, cidade)
+);
+
+alter table _control.clima_forecast_hash add column if not exists scraped_at timestamp;
+"""
+
+CURRENT_HASHES_SQL = """
+select origem, cidade, forecast_hash, scraped_at
+from _control.clima_forecast_hash
+where origem = any(%s);
+"""
+
+UPSERT_HASH_SQL = """
+insert into _control.clima_forecast_hash as h (
+    origem, cidade, forecast_hash, linhas, first_seen_at, last_seen_at, scraped_at
+)
+values (%(origem)s, %(cidade)s, %(hash)s, %(linhas)s, %(agora)s, %(agora)s, %(scraped_at)s)
+on conflict (origem, cidade) do update set
+    forecast_hash = excluded.forecast_hash,
+    linhas        = excluded.linhas,
+    first_seen_at = excluded.first_seen_at,
+    last_seen_at  = excluded.last_seen_at,
+    scraped_at    = excluded.scraped_at
+where h.scraped_at is null
+   or h.scraped_at < excluded.scraped_at;
+"""
+
+TOUCH_HASH_SQL = """
+update _control.clima_forecast_hash
+set last_seen_at = %(agora)s,
+    scraped_at   = %(scraped_at)s
+where origem = %(origem)s
+  and cidade = %(cidade)s
+  and (scraped_at is null or scraped_at < %(scraped_at)s);
+"""
+
+_ESPACOS = re.compile(r"\s+")
+
+
+def _normalize(value):
+    if isinstance(value, str):
+        return _ESPACOS.sub(" ", value).strip()
+    return value
+
+
+def forecast_hash(rows: list[dict]) -> str:
+    """
+    sha256 dos blocos normalizados (ordem de bloco, espaços colapsados).
+    """
+    blocos = [[_normalize(r.get(f)) for f in HASH_FIELDS] for r in sorted(rows, key=lambda r: r["bloco"])]
+    return hashlib.sha256(json.dumps(blocos, ensure_ascii=False, default=str).encode("utf-8")).hexdigest()
+
+
+def skip_unchanged(cur, rows: list[dict]) -> list[dict]:
+    """
+    Remove de rows os scrapings (origem, cidade, data/hora do scraping) cujo
+    conteúdo não mudou desde o último hash. Scrapings não mais recentes que o
+    registrado passam direto. Não faz commit.
+    """
+    if not rows:
+        return rows
+
+    grupos: dict[tuple, list[dict]] = {}
+    for r in rows:
+        grupos.setdefault((r["data_scrap"], r["hora_scrap"], r["origem"], r["cidade"]), []).append(r)
+
+    cur.execute(HASH_DDL)
+    cur.execute(CURRENT_HASHES_SQL, (sorted({k[2] for k in grupos}),))
+    atual = {(origem, cidade): (h, visto) for origem, cidade, h, visto in cur.fetchall()}
+
+    agora = datetime.now(UTC)
+    mantidas: list[dict] = []
+    # em ordem de scraping: um re-parse com vários horários compara cada um com o anterior
+    for (data_scrap, hora_scrap, origem, cidade), linhas in sorted(grupos.items(), key=lambda kv: kv[0]):
+        scraped_at = datetime.fromisoformat(f"{data_scrap} {hora_scrap}")
+        h_atual, visto = atual.get((origem, cidade), (None, None))
+        if visto is not None and scraped_at <= visto:
+            # re-parse de um scraping antigo: não compara nem volta o hash
+            mantidas.extend(linhas)
+            continue
+
+        h = forecast_hash(linhas)
+        params = {
+            "origem": origem,
+            "cidade": cidade,
+            "hash": h,
+            "linhas": len(linhas),
+            "agora": agora,
+            "scraped_at": scraped_at,
+        }
+        if h_atual == h:
+            cur.execute(TOUCH_HASH_SQL, params)
+            atual[(origem, cidade)] = (h, scraped_at)
+            LOGGER.info(f"[{origem}] {cidade}: previsão inalterada, {len(linhas)} linhas puladas")
+            continue
+        cur.execute(UPSERT_HASH_SQL, params)
+        atual[(origem, cidade)] = (h, scraped_at)
+        mantidas.extend(linhas)
+    return mantidas
@@ -0,0 +1,155 @@
+import hashlib
+import logging
+from datetime import date, UTC
+from typing import Iterator
+
+import psycopg2
+import zstandard
+from psycopg2.extras import execute_batch
+
+from src.common.settings import settings
+from src._bronze.clima.driver_pool import Snapshot
+from src._bronze.clima.parser_backends import get_parser
+
+LOGGER = logging.getLogger(__name__)
+
+# Arquivo do HTML bruto do scraping de clima (para re-parse sem novo scraping).
+#
+# _bronze.scraping_clima_html guarda cada HTML distinto uma vez (chave sha256
+# do texto, corpo comprimido com zstd); _bronze.scraping_clima_fetch registra
+# cada página parseada (provedor, cidade, scraped_at, via http/chrome, backend
+# e linhas geradas) apontando para o hash. O re-parse reconstrói as linhas da
+# bronze a partir daqui com o parser atual, usando o scraped_at original.
+
+ZSTD_LEVEL = 10
+
+ARCHIVE_DDL = """
+create table if not exists _bronze.scraping_clima_html (
+    sha256        text        primary key,
+    html_zstd     bytea       not null,
+    bytes_html    integer     not null,
+    first_seen_at timestamptz not null default now()
+);
+
+create table if not exists _bronze.scraping_clima_fetch (
+    fetch_id       bigserial   primary key,
+    origem         text        not null,
+    cidade         text        not null,
+    url            text        not null,
+    scraped_at     timestamptz not null,
+    via            text        not null,
+    parser_backend text        not null,
+    linhas         integer     not null,
+    sha256         text        not null references _bronze.scraping_clima_html (sha256)
+);
+
+create index if not exists ix_scraping_clima_fetch_scraped_at
+    on _bronze.scraping_clima_fetch (scraped_at);
+"""
+
+INSERT_HTML_SQL = """
+insert into _bronze.scraping_clima_html (sha256, html_zstd, bytes_html)
+values (%s, %s, %s)
+on conflict (sha256) do nothing;
+"""
+
+INSERT_FETCH_SQL = """
+insert into _bronze.scraping_clima_fetch (
+    origem, cidade, url, scraped_at, via, parser_backend, linhas, sha256
+)
+values (%s, %s, %s, %s, %s, %s, %s, %s);
+"""
+
+SNAPSHOTS_SQL = """
+select f.origem, f.cidade, f.scraped_at, h.html_zstd
+from _bronze.scraping_clima_fetch f
+join _bronze.scraping_clima_html h on h.sha256 = f.sha256
+where (f.scraped_at at time zone %(tz)s)::date between %(inicio)s and %(fim)s
+  and (%(origem)s is null or f.origem = %(origem)s)
+order by f.scraped_at, f.origem, f.cidade;
+"""
+
+
+def _connect():
+    return psycopg2.connect(
+        host=settings.pg_host,
+        port=settings.pg_port,
+        user=settings.pg_user,
+        password=settings.pg_password,
+        dbname=settings.pg_db,
+    )
+
+
+def archive_snapshots(snapshots: list[Snapshot]) -> int:
+    """
+    Grava os HTMLs (dedup por sha256) e o log das páginas. Retorna quantos
+    HTMLs novos entraram no arquivo.
+    """
+    if not snapshots:
+        return 0
+
+    compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL)
+    backend = settings.clima_parser_backend
+    htmls: dict[str, tuple[bytes, int]] = {}
+    fetches = []
+    for snap in snapshots:
+        raw = snap.html.encode("utf-8")
+        digest = hashlib.sha256(raw).hexdigest()
+        if digest not in htmls:
+            htmls[digest] = (compressor.compress(raw), len(raw))
+        fetches.append((snap.provider, snap.cidade, snap.url, snap.scraped_at, snap.via, backend, snap.linhas, digest))
+
+    novos = 0
+    conn = _connect()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(ARCHIVE_DDL)
+            for digest, (blob, tamanho) in htmls.items():
+                cur.execute(INSERT_HTML_SQL, (digest, psycopg2.Binary(blob), tamanho))
+                novos += cur.rowcount
+            execute_batch(cur, INSERT_FETCH_SQL, fetches, page_size=200)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    LOGGER.info(f"[Clima][HTML] {len(fetches)} páginas registradas, {novos} HTML(s) novo(s) no arquivo")
+    return novos
+
+
+def iter_snapshots(inicio: date, fim: date, provider: str | None = None) -> Iterator[tuple[str, str, object, str]]:
+    """
+    (origem, cidade, scraped_at, html) das páginas arquivadas entre inicio e fim
+    (dias no fuso app_tz). scraped_at volta em UTC, como no scraping ao vivo
+    (datetime.now(UTC)): os parsers tiram data/hora do scraping dele.
+    """
+    decompressor = zstandard.ZstdDecompressor()
+    conn = _connect()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(SNAPSHOTS_SQL, {"tz": settings.app_tz, "inicio": inicio, "fim": fim, "origem": provider})
+            for origem, cidade, scraped_at, blob in cur:
+                # timestamptz vem no TimeZone da sessão; normaliza para UTC
+                yield origem, cidade, scraped_at.astimezone(UTC), decompressor.decompress(bytes(blob)).decode("utf-8")
+    finally:
+        conn.close()
+
+
+def reparse_html_archive(
+    inicio: date,
+    fim: date,
+    provider: str | None = None,
+    backend: str | None = None,
+) -> dict[str, list[dict]]:
+    """
+    Reconstrói as linhas da bronze a partir do HTML arquivado, com o parser
+    atual (ou o backend indicado). Retorna as linhas por provedor.
+    """
+    rows: dict[str, list[dict]] = {}
+    for origem, cidade, scraped_at, html in iter_snapshots(inicio, fim, provider):
+        linhas = get_parser(origem, backend)(html, cidade, scraped_at)
+        LOGGER.info(f"[Clima][Reparse] {origem} {cidade} {scraped_at:%Y-%m-%d %H:%M}: {len(linhas)} blocos")
+        rows.setdefault(origem, []).extend(linhas)
+    return rows
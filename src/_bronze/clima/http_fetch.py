@@ -0,0 +1,45 @@
+import gzip
+import logging
+import urllib.request
+from urllib.parse import quote
+
+LOGGER = logging.getLogger(__name__)
+
+# Caminho leve do scraping de clima: baixa o HTML com urllib (sem Chrome) e
+# reaproveita o mesmo parser do caminho Selenium. O resultado só é aceito se
+# passar em validate_rows; senão o pool cai para o Chrome (driver_pool).
+
+HTTP_TIMEOUT_S = 20
+
+
+def fetch_html(url: str, user_agent: str, timeout: float = HTTP_TIMEOUT_S) -> str:
+    """
+    GET simples com cabeçalhos de navegador (pt-BR). URLs com acento são
+    percent-encoded (ex.: são-paulo).
+    """
+    req = urllib.request.Request(
+        quote(url, safe=":/?&=%#"),
+        headers={
+            "User-Agent": user_agent,
+            "Accept": "text/html,application/xhtml+xml;q=0.9,*/*;q=0.8",
+            "Accept-Language": "pt-BR,pt;q=0.9",
+            "Accept-Encoding": "gzip",
+        },
+    )
+    with urllib.request.urlopen(req, timeout=timeout) as resp:
+        data = resp.read()
+        if resp.headers.get("Content-Encoding") == "gzip":
+            data = gzip.decompress(data)
+        charset = resp.headers.get_content_charset() or "utf-8"
+    return data.decode(charset, errors="replace")
+
+
+def validate_rows(rows: list[dict], min_blocks: int) -> str | None:
+    """
+    Retorna o motivo da rejeição, ou None se as linhas servem.
+    """
+    if len(rows) < min_blocks:
+        return f"{len(rows)} blocos (esperado >= {min_blocks})"
+    if not any(r.get("tempmax") is not None or r.get("tempmin") is not None for r in rows):
+        return "nenhuma temperatura nos blocos"
+    return None
@@ -0,0 +1,42 @@
+from datetime import datetime
+from functools import partial
+from typing import Callable
+
+from src.common.settings import settings
+from src._bronze.clima.accuweather.parse_accuweather import parse_accuweather_bs4, parse_accuweather_lxml
+from src._bronze.clima.climatempo.parse_climatempo import parse_climatempo_bs4, parse_climatempo_lxml
+
+# Backends de parsing do HTML de clima: (provedor, backend) -> parse(html, cidade, scraped_at).
+#
+# bs4       BeautifulSoup + html.parser (comportamento original)
+# bs4-lxml  BeautifulSoup com o tree builder do lxml (mesmo código, árvore mais rápida)
+# lxml      lxml.html + XPath direto, sem árvore bs4
+#
+# Todos devolvem as mesmas linhas; bench_clima_parsers.py mede tempo/CPU por
+# página sobre as fixtures e confere a saída contra o bs4.
+
+Parser = Callable[[str, str, datetime], list[dict]]
+
+DEFAULT_BACKEND = "bs4"
+
+PARSERS: dict[str, dict[str, Parser]] = {
+    "AccuWeather": {
+        "bs4": parse_accuweather_bs4,
+        "bs4-lxml": partial(parse_accuweather_bs4, features="lxml"),
+        "lxml": parse_accuweather_lxml,
+    },
+    "Climatempo": {
+        "bs4": parse_climatempo_bs4,
+        "bs4-lxml": partial(parse_climatempo_bs4, features="lxml"),
+        "lxml": parse_climatempo_lxml,
+    },
+}
+
+BACKENDS = tuple(PARSERS["AccuWeather"])
+
+
+def get_parser(provider: str, backend: str | None = None) -> Parser:
+    backend = backend or settings.clima_parser_backend or DEFAULT_BACKEND
+    if backend not in PARSERS[provider]:
+        raise ValueError(f"CLIMA_PARSER_BACKEND inválido: {backend!r} (use {', '.join(BACKENDS)})")
+    return PARSERS[provider][backend]
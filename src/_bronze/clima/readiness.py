@@ -0,0 +1,112 @@
+import logging
+import time
+from dataclasses import dataclass
+
+from selenium import webdriver
+from selenium.common.exceptions import TimeoutException
+
+LOGGER = logging.getLogger(__name__)
+
+# Detecção de "página pronta" para o scraping de clima, no lugar de sleeps fixos.
+#
+# A página é considerada pronta quando, numa mesma leitura:
+# - document.readyState == "complete" ("interactive" basta com pageLoadStrategy=eager)
+# - há pelo menos min_blocks blocos do seletor
+# - a rede está ociosa (nenhum recurso terminou nos últimos idle_ms)
+# e a contagem de blocos fica estável por stable_s segundos.
+# O poll é limitado por timeout; se estourar com blocos na tela, segue com o
+# que renderizou (aviso no log); sem nenhum bloco, levanta TimeoutException.
+#
+# O estado é lido num único execute_script (querySelectorAll), sem passar pelo
+# implicitly_wait do driver.
+
+POLL_INTERVAL_S = 0.25
+STABLE_S = 1.0
+NETWORK_IDLE_MS = 500
+
+_PAGE_STATE_JS = """
+const entries = performance.getEntriesByType('resource');
+let lastEnd = 0;
+for (const e of entries) { if (e.responseEnd > lastEnd) lastEnd = e.responseEnd; }
+return {
+  ready: document.readyState,
+  blocks: document.querySelectorAll(arguments[0]).length,
+  idle_ms: performance.now() - lastEnd
+};
+"""
+
+
+@dataclass(frozen=True)
+class PageReady:
+    blocks: int
+    elapsed_s: float
+    complete: bool  # False => timeout com render parcial
+
+
+def page_state(driver: webdriver.Chrome, selector: str) -> dict:
+    return driver.execute_script(_PAGE_STATE_JS, selector)
+
+
+def wait_until_ready(
+    driver: webdriver.Chrome,
+    selector: str,
+    min_blocks: int,
+    timeout: float,
+    stable_s: float = STABLE_S,
+    idle_ms: float = NETWORK_IDLE_MS,
+) -> PageReady:
+    """
+    Poll até a página ficar pronta (ver critérios acima) ou o timeout.
+    """
+    # pageLoadStrategy=eager (perfil lean): recursos bloqueados/atrasados podem
+    # segurar o "complete"; o DOM interativo + blocos estáveis + rede ociosa basta
+    if driver.capabilities.get("pageLoadStrategy") == "eager":
+        ready_states = ("interactive", "complete")
+    else:
+        ready_states = ("complete",)
+
+    inicio = time.monotonic()
+    ultimo = -1
+    estavel_desde = inicio
+    blocks = 0
+
+    while True:
+        agora = time.monotonic()
+        state = page_state(driver, selector)
+        blocks = int(state["blocks"])
+
+        if blocks != ultimo:
+            ultimo = blocks
+            estavel_desde = agora
+
+        if (
+            state["ready"] in ready_states
+            and blocks >= min_blocks
+            and state["idle_ms"] >= idle_ms
+            and agora - estavel_desde >= stable_s
+        ):
+            return PageReady(blocks, agora - inicio, True)
+
+        if agora - inicio >= timeout:
+            if blocks > 0:
+                LOGGER.warning(
+                    f"[Clima] Página não estabilizou em {timeout:.0f}s "
+                    f"({blocks} blocos de {selector!r}, esperado >= {min_blocks}); seguindo com o render parcial"
+                )
+                return PageReady(blocks, agora - inicio, False)
+            raise TimeoutException(f"Nenhum bloco {selector!r} em {timeout:.0f}s")
+
+        time.sleep(POLL_INTERVAL_S)
+
+
+def wait_for_more_blocks(driver: webdriver.Chrome, selector: str, anterior: int, timeout: float) -> int:
+    """
+    Depois de um clique de "carregar mais": espera a contagem passar de
+    anterior. Retorna a contagem final (igual a anterior se nada mudou).
+    """
+    fim = time.monotonic() + timeout
+    while True:
+        blocks = int(page_state(driver, selector)["blocks"])
+        if blocks > anterior or time.monotonic() >= fim:
+            return blocks
+        time.sleep(POLL_INTERVAL_S)
@@ -0,0 +1,169 @@
+import logging
+from dataclasses import dataclass
+
+import psycopg2
+from psycopg2.extras import execute_batch
+
+from src.common.settings import settings
+from src._bronze.clima.driver_pool import ProviderLimit, ScrapeTask
+from src._bronze.clima.accuweather.extract_accuweather import URLS as ACCUWEATHER_URLS, accuweather_task
+from src._bronze.clima.climatempo.extract_climatempo import URLS as CLIMATEMPO_URLS, climatempo_task
+
+LOGGER = logging.getLogger(__name__)
+
+# Cadastro de cidades/provedores do scraping de clima (sem mudar código).
+#
+# _control.clima_targets: uma linha por (provedor, url); enabled liga/desliga,
+# priority ordena (menor primeiro). cidade sai como "Cidade, UF" quando uf está
+# preenchida (a silver separa a UF); as cidades originais entram com uf nula
+# para manter as chaves já existentes na silver/gold.
+#
+# _control.clima_provider_limits: páginas simultâneas e intervalo mínimo entre
+# páginas por provedor. Sem linha, o provedor usa CLIMA_MAX_DRIVERS, sem intervalo.
+#
+# Na criação, o cadastro de cada provedor é semeado com as URLS do código, que
+# continuam como fallback se o banco não responder.
+
+TARGETS_DDL = """
+create table if not exists _control.clima_targets (
+    provider   text        not null,
+    city       text        not null,
+    uf         text,
+    url        text        not null,
+    enabled    boolean     not null default true,
+    priority   integer     not null default 100,
+    updated_at timestamptz not null default now(),
+    primary key (provider, url)
+);
+
+create table if not exists _control.clima_provider_limits (
+    provider       text    primary key,
+    max_parallel   integer not null default 1 check (max_parallel >= 1),
+    min_interval_s numeric not null default 0 check (min_interval_s >= 0)
+);
+"""
+
+SEEDED_PROVIDERS_SQL = """
+select distinct provider
+from _control.clima_targets;
+"""
+
+SEED_SQL = """
+insert into _control.clima_targets (provider, city, url)
+values (%(provider)s, %(city)s, %(url)s)
+on conflict (provider, url) do nothing;
+"""
+
+TARGETS_SQL = """
+select provider, city, uf, url, priority
+from _control.clima_targets
+where enabled
+order by priority, provider, city;
+"""
+
+LIMITS_SQL = """
+select provider, max_parallel, min_interval_s
+from _control.clima_provider_limits;
+"""
+
+TASK_BUILDERS = {
+    "AccuWeather": accuweather_task,
+    "Climatempo": climatempo_task,
+}
+
+CODE_URLS = {
+    "AccuWeather": ACCUWEATHER_URLS,
+    "Climatempo": CLIMATEMPO_URLS,
+}
+
+
+@dataclass(frozen=True)
+class Target:
+    provider: str
+    cidade: str  # "Cidade" ou "Cidade, UF"
+    url: str
+    priority: int
+
+
+def _connect():
+    return psycopg2.connect(
+        host=settings.pg_host,
+        port=settings.pg_port,
+        user=settings.pg_user,
+        password=settings.pg_password,
+        dbname=settings.pg_db,
+    )
+
+
+def _code_targets() -> list[Target]:
+    return [
+        Target(provider, cidade, url, 100)
+        for provider, urls in CODE_URLS.items()
+        for url, cidade in urls
+    ]
+
+
+def load_targets() -> tuple[list[Target], dict[str, ProviderLimit]]:
+    """
+    Alvos habilitados + limites por provedor. Se o banco falhar, usa as URLS
+    do código sem limites específicos.
+    """
+    try:
+        conn = _connect()
+    except Exception:
+        LOGGER.warning("[Clima] Cadastro de alvos indisponível; usando as URLS do código", exc_info=True)
+        return _code_targets(), {}
+
+    try:
+        with conn.cursor() as cur:
+            cur.execute(TARGETS_DDL)
+            # "provedor vazio?" decidido antes dos inserts: semeia todas as URLS dele
+            cur.execute(SEEDED_PROVIDERS_SQL)
+            semeados = {r[0] for r in cur.fetchall()}
+            seed = [
+                {"provider": provider, "city": cidade, "url": url}
+                for provider, urls in CODE_URLS.items()
+                if provider not in semeados
+                for url, cidade in urls
+            ]
+            if seed:
+                execute_batch(cur, SEED_SQL, seed)
+
+            cur.execute(TARGETS_SQL)
+            targets = []
+            for provider, city, uf, url, priority in cur.fetchall():
+                if provider not in TASK_BUILDERS:
+                    LOGGER.warning(f"[Clima] Provedor sem scraper no cadastro: {provider} ({city})")
+                    continue
+                cidade = f"{city}, {uf}" if uf else city
+                targets.append(Target(provider, cidade, url, priority))
+
+            cur.execute(LIMITS_SQL)
+            limits = {
+                provider: ProviderLimit(int(max_parallel), float(min_interval_s))
+                for provider, max_parallel, min_interval_s in cur.fetchall()
+            }
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        LOGGER.warning("[Clima] Falha ao ler o cadastro de alvos; usando as URLS do código", exc_info=True)
+        return _code_targets(), {}
+    finally:
+        conn.close()
+
+    return targets, limits
+
+
+def build_tasks(targets: list[Target]) -> list[ScrapeTask]:
+    """
+    Tarefas na ordem de prioridade, intercalando provedores dentro da mesma
+    prioridade (um provedor com limite baixo não segura os workers dos outros).
+    """
+    posicao: dict[tuple[int, str], int] = {}
+    ordenados = []
+    for t in sorted(targets, key=lambda t: t.priority):
+        chave = (t.priority, t.provider)
+        posicao[chave] = posicao.get(chave, 0) + 1
+        ordenados.append(((t.priority, posicao[chave]), t))
+    ordenados.sort(key=lambda x: x[0])
+    return [TASK_BUILDERS[t.provider](t.url, t.cidade) for _, t in ordenados]
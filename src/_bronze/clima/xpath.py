@@ -0,0 +1,15 @@
+# Helpers de XPath para os parsers lxml do scraping de clima.
+
+
+def has_class(*names: str) -> str:
+    """
+    Predicado XPath equivalente a .a.b em CSS (todas as classes no atributo).
+    """
+    return " and ".join(f"contains(concat(' ', normalize-space(@class), ' '), ' {n} ')" for n in names)
+
+
+def strip_text(el, sep: str = "") -> str:
+    """
+    Equivalente lxml de Tag.get_text(sep, strip=True) do bs4.
+    """
+    return sep.join(s.strip() for s in el.itertext() if s.strip())
@@ -0,0 +1,347 @@
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta
+from typing import Iterable
+from zoneinfo import ZoneInfo
+
+from psycopg import Cursor, sql
+from psycopg import connect as pg_connect
+from psycopg.rows import tuple_row
+
+from src.common.settings import settings
+
+# Layout "partitioned" (zero-copy):
+#   _gold.fato_acessos passa a ser uma tabela PARTITION BY LIST (origem)
+#   cujas partições SÃO as fatos de contexto. Nada é copiado para a gold:
+#   o que o contexto insere já aparece na gold.
+#
+# Layout "copy" (padrão): _gold.fato_acessos é uma tabela física alimentada
+# por silver_contexto_to_gold_fato_acessos().
+#
+# Layout "monthly": igual ao copy, mas a tabela física é PARTITION BY RANGE
+# (dt_entrada) com uma partição por mês (+ default). Consultas do BI filtradas
+# por dt_entrada leem só a(s) partição(ões) do período; meses antigos saem
+# com DETACH PARTITION, sem DELETE. Linhas com dt_entrada nulo caem na
+# partição default, onde um índice único (origem, id_acesso) próprio mantém a
+# deduplicação (a chave da tabela pai inclui dt_entrada e NULL não conflita).
+
+LAYOUT_COPY = "copy"
+LAYOUT_PARTITIONED = "partitioned"
+LAYOUT_MONTHLY = "monthly"
+
+# origem -> fato de contexto que vira partição
+PARTITION_ORIGENS = {
+    "LIMBER": ("_silver-contexto", "fato_acesso_limber"),
+    "QUALITY": ("_silver-contexto", "fato_acesso_quality"),
+}
+
+# Tabela física antiga fica preservada (rollback / conferência)
+GOLD_COPY_TABLE = "fato_acessos_copy"
+GOLD_HEAP_TABLE = "fato_acessos_heap"
+
+# Chave única da partição default (layout monthly)
+DEFAULT_KEY_INDEX = "ux_fato_acessos_default_origem_id_acesso"
+
+DEDUP_DEFAULT_SQL = """
+delete from _gold.fato_acessos_default a
+using _gold.fato_acessos_default b
+where a.origem = b.origem
+  and a.id_acesso = b.id_acesso
+  and a.ctid > b.ctid;
+"""
+
+GOLD_PARTSTRAT_SQL = """
+select pt.partstrat
+from pg_partitioned_table pt
+join pg_class c on c.oid = pt.partrelid
+join pg_namespace n on n.oid = c.relnamespace
+where n.nspname = '_gold' and c.relname = 'fato_acessos';
+"""
+
+
+def _qualified(schema: str, table: str) -> sql.Identifier:
+    return sql.Identifier(schema, table)
+
+
+def gold_layout(cur: Cursor) -> str:
+    """
+    Detecta o layout pelo catálogo: LIST por origem => zero-copy,
+    RANGE (dt_entrada) => mensal, tabela comum => copy.
+    """
+    cur.execute(GOLD_PARTSTRAT_SQL)
+    row = cur.fetchone()
+    if row is None:
+        return LAYOUT_COPY
+    if row[0] == "l":
+        return LAYOUT_PARTITIONED
+    return LAYOUT_MONTHLY
+
+
+def month_partition_name(month: date) -> str:
+    return f"fato_acessos_p{month:%Y%m}"
+
+
+def ensure_month_partitions(cur: Cursor, months: Iterable[date]) -> None:
+    """
+    Cria (se faltar) a partição mensal de cada mês informado, sempre junto com
+    o mês corrente e o seguinte, para que dados novos nunca caiam na default
+    (uma partição não pode ser criada se a default já tiver linhas daquele mês).
+    Os índices da tabela pai são criados automaticamente em cada partição nova.
+    """
+    today = datetime.now(ZoneInfo(settings.app_tz)).date().replace(day=1)
+    wanted = {m.replace(day=1) for m in months}
+    wanted.update({today, (today + timedelta(days=32)).replace(day=1)})
+
+    for start in sorted(wanted):
+        end = (start + timedelta(days=32)).replace(day=1)
+        cur.execute(
+            sql.SQL(
+                "create table if not exists {} partition of _gold.fato_acessos for values from ({}) to ({})"
+            ).format(
+                sql.Identifier("_gold", month_partition_name(start)),
+                sql.Literal(start),
+                sql.Literal(end),
+            )
+        )
+
+
+def ensure_default_partition_key(cur: Cursor) -> None:
+    """
+    Layout monthly: índice único (origem, id_acesso) na partição default, para
+    o ON CONFLICT DO NOTHING dos loaders também barrar linhas com dt_entrada
+    nulo. Instalações anteriores podem ter duplicatas: removidas uma vez antes
+    de criar o índice.
+    """
+    cur.execute("select to_regclass(%s)", (f"_gold.{DEFAULT_KEY_INDEX}",))
+    if cur.fetchone()[0] is not None:
+        return
+    cur.execute(DEDUP_DEFAULT_SQL)
+    if cur.rowcount:
+        print(f"[GOLD][LAYOUT] Duplicatas removidas da partição default: {cur.rowcount}")
+    cur.execute(f"create unique index {DEFAULT_KEY_INDEX} on _gold.fato_acessos_default (origem, id_acesso)")
+
+
+def attach_origem_partition(cur: Cursor, origem: str, schema: str, table: str) -> None:
+    """
+    Anexa uma fato de contexto como partição de _gold.fato_acessos.
+
+    - cria a coluna origem (default = a própria origem) se ainda não existir
+    - CHECK (origem = ...) permite ao ATTACH pular o scan de validação
+    - índice único (origem, id_acesso) é reaproveitado pelo índice da gold
+    Novas origens entram chamando esta função com a fato delas.
+    """
+    target = _qualified(schema, table)
+    check_name = f"ck_{table}_origem"
+
+    # DDL não aceita parâmetros do servidor: literais via psycopg.sql
+    cur.execute(
+        sql.SQL("alter table {} add column if not exists origem text not null default {}").format(
+            target, sql.Literal(origem)
+        )
+    )
+    cur.execute(
+        "select 1 from pg_constraint where conname = %(name)s and conrelid = %(rel)s::regclass",
+        {"name": check_name, "rel": target.as_string(cur)},
+    )
+    if cur.fetchone() is None:
+        cur.execute(
+            sql.SQL("alter table {} add constraint {} check (origem = {})").format(
+                target, sql.Identifier(check_name), sql.Literal(origem)
+            )
+        )
+    cur.execute(
+        sql.SQL("create unique index if not exists {} on {} (origem, id_acesso)").format(
+            sql.Identifier(f"ux_{table}_origem_id_acesso"), target
+        )
+    )
+    cur.execute(
+        sql.SQL("alter table _gold.fato_acessos attach partition {} for values in ({})").format(
+            target, sql.Literal(origem)
+        )
+    )
+
+
+def migrate_gold_fato_acessos_to_partitioned() -> None:
+    """
+    copy -> partitioned, em uma única transação (DDL transacional):
+    1) renomeia a gold física para _gold.fato_acessos_copy
+    2) cria _gold.fato_acessos PARTITION BY LIST (origem) com as colunas da fato Limber
+    3) anexa fato_acesso_limber e fato_acesso_quality como partições
+
+    As fatos de contexto precisam ter exatamente as mesmas colunas/tipos
+    (regra do ATTACH PARTITION); se não tiverem, nada é alterado.
+    """
+    with pg_connect(settings.pg_dsn(), row_factory=tuple_row) as conn:
+        with conn.cursor() as cur:
+            layout = gold_layout(cur)
+            if layout != LAYOUT_COPY:
+                print(f"[GOLD][LAYOUT] _gold.fato_acessos está no layout {layout}; migração exige copy.")
+                return
+
+            cur.execute(f"alter table _gold.fato_acessos rename to {GOLD_COPY_TABLE}")
+            cur.execute(
+                "alter index if exists _gold.ux_fato_acessos_origem_id_acesso "
+                f"rename to ux_{GOLD_COPY_TABLE}_origem_id_acesso"
+            )
+
+            schema, table = PARTITION_ORIGENS["LIMBER"]
+            cur.execute(
+                sql.SQL("alter table {} add column if not exists origem text not null default 'LIMBER'").format(
+                    _qualified(schema, table)
+                )
+            )
+            cur.execute(
+                sql.SQL("create table _gold.fato_acessos (like {}) partition by list (origem)").format(
+                    _qualified(schema, table)
+                )
+            )
+            cur.execute(
+                "create unique index ux_fato_acessos_origem_id_acesso "
+                "on _gold.fato_acessos (origem, id_acesso)"
+            )
+
+            for origem, (schema, table) in PARTITION_ORIGENS.items():
+                attach_origem_partition(cur, origem, schema, table)
+        conn.commit()
+
+    print("[GOLD][LAYOUT] _gold.fato_acessos agora é LIST (origem) sobre as fatos de contexto.")
+
+
+def migrate_gold_fato_acessos_to_copy() -> None:
+    """
+    Volta ao layout copy.
+
+    partitioned -> copy: desanexa as partições (as fatos de contexto continuam
+    intactas), remove a tabela particionada e restaura _gold.fato_acessos_copy.
+    As linhas que chegaram depois da migração entram no próximo heal da gold.
+
+    monthly -> copy: ver _monthly_to_copy.
+    """
+    with pg_connect(settings.pg_dsn(), row_factory=tuple_row) as conn:
+        with conn.cursor() as cur:
+            layout = gold_layout(cur)
+            if layout == LAYOUT_COPY:
+                print("[GOLD][LAYOUT] _gold.fato_acessos já está no layout copy.")
+                return
+            if layout == LAYOUT_MONTHLY:
+                _monthly_to_copy(cur)
+                conn.commit()
+                print("[GOLD][LAYOUT] _gold.fato_acessos voltou ao layout copy.")
+                return
+
+            for schema, table in PARTITION_ORIGENS.values():
+                cur.execute(
+                    sql.SQL("alter table _gold.fato_acessos detach partition {}").format(_qualified(schema, table))
+                )
+            cur.execute("drop table _gold.fato_acessos")
+            cur.execute(f"alter table _gold.{GOLD_COPY_TABLE} rename to fato_acessos")
+            cur.execute(
+                f"alter index if exists _gold.ux_{GOLD_COPY_TABLE}_origem_id_acesso "
+                "rename to ux_fato_acessos_origem_id_acesso"
+            )
+        conn.commit()
+
+    print("[GOLD][LAYOUT] _gold.fato_acessos voltou ao layout copy.")
+
+
+def _monthly_to_copy(cur: Cursor) -> None:
+    """
+    monthly -> copy, na transação do chamador: copia as partições anexadas
+    para uma tabela física nova (mesmas colunas, chave (origem, id_acesso)),
+    confere a contagem e remove a tabela particionada com suas partições.
+    Partições já desanexadas (detach) ficam de fora e não são tocadas.
+    A _gold.fato_acessos_heap da migração anterior é antiga: remova-a antes
+    de migrar para monthly de novo.
+    """
+    cur.execute("alter table _gold.fato_acessos rename to fato_acessos_monthly")
+    cur.execute("create table _gold.fato_acessos (like _gold.fato_acessos_monthly including defaults)")
+    # (origem, id_acesso) volta a ser a chave: dt_entrada nulo pode ter repetido
+    cur.execute(
+        "insert into _gold.fato_acessos "
+        "select distinct on (origem, id_acesso) * from _gold.fato_acessos_monthly "
+        "order by origem, id_acesso, ingested_at"
+    )
+    copiadas = cur.rowcount
+    cur.execute("select count(distinct (origem, id_acesso)) from _gold.fato_acessos_monthly")
+    esperadas = cur.fetchone()[0]
+    if copiadas != esperadas:
+        raise RuntimeError(f"[GOLD][LAYOUT] monthly -> copy: {copiadas} linhas copiadas, esperado {esperadas}")
+    print(f"[GOLD][LAYOUT] Linhas migradas: {copiadas}")
+
+    cur.execute("drop table _gold.fato_acessos_monthly")
+    cur.execute(
+        "create unique index ux_fato_acessos_origem_id_acesso "
+        "on _gold.fato_acessos (origem, id_acesso)"
+    )
+
+
+def migrate_gold_fato_acessos_to_monthly() -> None:
+    """
+    copy -> monthly, em uma única transação:
+    1) renomeia a gold física para _gold.fato_acessos_heap (preservada)
+    2) cria _gold.fato_acessos PARTITION BY RANGE (dt_entrada) + partição default
+    3) cria uma partição por mês existente (+ mês corrente e seguinte)
+    4) copia os dados e só então cria os índices (propagados a cada partição)
+
+    Em tabela particionada a chave única precisa conter a coluna de partição:
+    passa a ser (origem, id_acesso, dt_entrada). O dt_entrada de um acesso
+    não muda, então a garantia é a mesma da chave (origem, id_acesso); as
+    linhas sem dt_entrada (partição default) têm o índice único próprio.
+    """
+    with pg_connect(settings.pg_dsn(), row_factory=tuple_row) as conn:
+        with conn.cursor() as cur:
+            layout = gold_layout(cur)
+            if layout != LAYOUT_COPY:
+                print(f"[GOLD][LAYOUT] _gold.fato_acessos está no layout {layout}; migração exige copy.")
+                return
+
+            cur.execute(f"alter table _gold.fato_acessos rename to {GOLD_HEAP_TABLE}")
+            cur.execute(
+                "alter index if exists _gold.ux_fato_acessos_origem_id_acesso "
+                f"rename to ux_{GOLD_HEAP_TABLE}_origem_id_acesso"
+            )
+            cur.execute(
+                f"create table _gold.fato_acessos (like _gold.{GOLD_HEAP_TABLE} including defaults) "
+                "partition by range (dt_entrada)"
+            )
+            cur.execute("create table _gold.fato_acessos_default partition of _gold.fato_acessos default")
+
+            cur.execute(
+                f"select distinct date_trunc('month', dt_entrada)::date from _gold.{GOLD_HEAP_TABLE} "
+                "where dt_entrada is not null"
+            )
+            ensure_month_partitions(cur, [r[0] for r in cur.fetchall()])
+
+            cur.execute(f"insert into _gold.fato_acessos select * from _gold.{GOLD_HEAP_TABLE}")
+            print(f"[GOLD][LAYOUT] Linhas migradas: {cur.rowcount}")
+
+            cur.execute(
+                "create unique index ux_fato_acessos_origem_id_acesso_dt "
+                "on _gold.fato_acessos (origem, id_acesso, dt_entrada)"
+            )
+            cur.execute("create index ix_fato_acessos_dt_entrada on _gold.fato_acessos (dt_entrada)")
+            ensure_default_partition_key(cur)
+        conn.commit()
+
+    print("[GOLD][LAYOUT] _gold.fato_acessos agora é RANGE (dt_entrada) mensal.")
+
+
+def detach_month_partition(month: date) -> str:
+    """
+    Desanexa a partição do mês (ex.: para arquivar com pg_dump e depois dropar).
+    A tabela continua existindo como _gold.fato_acessos_pYYYYMM, fora da gold.
+    """
+    name = month_partition_name(month.replace(day=1))
+    with pg_connect(settings.pg_dsn(), row_factory=tuple_row) as conn:
+        with conn.cursor() as cur:
+            if gold_layout(cur) != LAYOUT_MONTHLY:
+                raise RuntimeError("_gold.fato_acessos não está no layout monthly.")
+            cur.execute(
+                sql.SQL("alter table _gold.fato_acessos detach partition {}").format(
+                    sql.Identifier("_gold", name)
+                )
+            )
+        conn.commit()
+
+    print(f"[GOLD][LAYOUT] Partição _gold.{name} desanexada.")
+    return name
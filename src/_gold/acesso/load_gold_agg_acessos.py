@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+
+from psycopg import Cursor
+from psycopg import connect as pg_connect
+from psycopg.rows import tuple_row
+
+from src.common.settings import settings
+
+# Cubos agregados de _gold.fato_acessos para o BI.
+#
+# Mantidos por delta-merge: a cada execução da gold, as linhas realmente
+# inseridas (tabela temporária gold_fato_acessos_delta, criada pelo loader da
+# gold na mesma transação) são agrupadas e somadas às contagens existentes.
+# O BI lê alguns milhares de linhas pré-agregadas em vez de milhões de fatos.
+#
+# Recálculo completo a partir da fato (rebuild_gold_agg_acessos): na primeira
+# execução (cubos vazios, o histórico anterior ainda não está neles) e sob
+# demanda (run_gold_agg_acessos.py --rebuild [inicio fim]). O heal da gold
+# continua no delta-merge (as linhas que ele insere também vão para o delta).
+#
+# Chaves nulas viram valores fixos (PK não aceita NULL):
+#   hora sem hr_entrada => -1 | terminal_entrada nulo => 'N/I' | tipo_publico nulo => 'CHECK'
+
+AGG_ACESSOS_DDL = """
+create table if not exists _gold.agg_acessos_hora (
+    dt_entrada       date        not null,
+    hora             smallint    not null,
+    origem           text        not null,
+    terminal_entrada text        not null,
+    tipo_publico     text        not null,
+    qtd_acessos      bigint      not null,
+    updated_at       timestamptz not null default now(),
+    primary key (dt_entrada, hora, origem, terminal_entrada, tipo_publico)
+);
+
+create table if not exists _gold.agg_acessos_dia (
+    dt_entrada       date        not null,
+    origem           text        not null,
+    terminal_entrada text        not null,
+    tipo_publico     text        not null,
+    qtd_acessos      bigint      not null,
+    updated_at       timestamptz not null default now(),
+    primary key (dt_entrada, origem, terminal_entrada, tipo_publico)
+);
+"""
+
+_SELECT_HORA = """
+select
+    f.dt_entrada,
+    coalesce(extract(hour from f.hr_entrada)::smallint, -1) as hora,
+    f.origem,
+    coalesce(f.terminal_entrada, 'N/I') as terminal_entrada,
+    coalesce(f.tipo_publico, 'CHECK') as tipo_publico,
+    count(*) as qtd_acessos,
+    now() as updated_at
+from {fonte} f
+where f.dt_entrada is not null
+  {filtro}
+group by 1, 2, 3, 4, 5
+"""
+
+_SELECT_DIA = """
+select
+    f.dt_entrada,
+    f.origem,
+    coalesce(f.terminal_entrada, 'N/I') as terminal_entrada,
+    coalesce(f.tipo_publico, 'CHECK') as tipo_publico,
+    count(*) as qtd_acessos,
+    now() as updated_at
+from {fonte} f
+where f.dt_entrada is not null
+  {filtro}
+group by 1, 2, 3, 4
+"""
+
+_INSERT_HORA = """
+insert into _gold.agg_acessos_hora as a (
+    dt_entrada, hora, origem, terminal_entrada, tipo_publico, qtd_acessos, updated_at
+)
+"""
+
+_INSERT_DIA = """
+insert into _gold.agg_acessos_dia as a (
+    dt_entrada, origem, terminal_entrada, tipo_publico, qtd_acessos, updated_at
+)
+"""
+
+DELTA_TABLE = "pg_temp.gold_fato_acessos_delta"
+
+MERGE_AGG_HORA_SQL = _INSERT_HORA + _SELECT_HORA.format(fonte=DELTA_TABLE, filtro="") + """
+on conflict (dt_entrada, hora, origem, terminal_entrada, tipo_publico)
+do update set
+    qtd_acessos = a.qtd_acessos + excluded.qtd_acessos,
+    updated_at = excluded.updated_at;
+"""
+
+MERGE_AGG_DIA_SQL = _INSERT_DIA + _SELECT_DIA.format(fonte=DELTA_TABLE, filtro="") + """
+on conflict (dt_entrada, origem, terminal_entrada, tipo_publico)
+do update set
+    qtd_acessos = a.qtd_acessos + excluded.qtd_acessos,
+    updated_at = excluded.updated_at;
+"""
+
+# Recalcula a partir da fato (todos os dias, ou só os dias informados)
+_FILTRO_DIAS = "and (%(dias)s::date[] is null or f.dt_entrada = any(%(dias)s::date[]))"
+
+REBUILD_AGG_HORA_SQL = _INSERT_HORA + _SELECT_HORA.format(fonte="_gold.fato_acessos", filtro=_FILTRO_DIAS) + ";"
+REBUILD_AGG_DIA_SQL = _INSERT_DIA + _SELECT_DIA.format(fonte="_gold.fato_acessos", filtro=_FILTRO_DIAS) + ";"
+
+DELETE_AGG_SQL = """
+delete from {agg}
+where (%(dias)s::date[] is null or dt_entrada = any(%(dias)s::date[]));
+"""
+
+
+AGG_VAZIO_SQL = """
+select not exists (select 1 from _gold.agg_acessos_dia);
+"""
+
+
+def ensure_gold_agg_acessos(cur: Cursor) -> bool:
+    """
+    Cria os cubos se não existirem. Retorna True quando estão vazios (recém
+    criados): o chamador deve fazer o recálculo completo em vez do delta-merge.
+    """
+    cur.execute(AGG_ACESSOS_DDL)
+    cur.execute(AGG_VAZIO_SQL)
+    return cur.fetchone()[0]
+
+
+def merge_gold_agg_acessos(cur: Cursor) -> int:
+    """
+    Soma o delta da execução corrente da gold aos cubos hora/dia.
+    Deve rodar na mesma transação que preencheu gold_fato_acessos_delta.
+    Retorna quantas chaves do cubo por hora foram tocadas.
+    """
+    cur.execute(MERGE_AGG_HORA_SQL)
+    touched = cur.rowcount
+    cur.execute(MERGE_AGG_DIA_SQL)
+    return touched
+
+
+def rebuild_gold_agg_acessos(cur: Cursor, dias: list[date] | None = None) -> int:
+    """
+    Recalcula os cubos a partir de _gold.fato_acessos.
+    dias=None => recálculo completo; senão só os dias informados
+    (ex.: dias afetados por uma reclassificação de tipo_publico).
+    """
+    params = {"dias": dias}
+    for agg in ("_gold.agg_acessos_hora", "_gold.agg_acessos_dia"):
+        cur.execute(DELETE_AGG_SQL.format(agg=agg), params)
+    cur.execute(REBUILD_AGG_HORA_SQL, params)
+    rebuilt = cur.rowcount
+    cur.execute(REBUILD_AGG_DIA_SQL, params)
+    return rebuilt
+
+
+def reconstruir_gold_agg_acessos(inicio: date | None = None, fim: date | None = None) -> int:
+    """
+    Recalcula os cubos a partir de _gold.fato_acessos entre inicio e fim
+    (inclusive); sem datas, o histórico inteiro. Retorna as chaves/hora gravadas.
+    """
+    dias = None
+    if inicio is not None and fim is not None:
+        dias = [inicio + timedelta(days=i) for i in range((fim - inicio).days + 1)]
+
+    with pg_connect(settings.pg_dsn(), row_factory=tuple_row) as conn:
+        with conn.cursor() as cur:
+            ensure_gold_agg_acessos(cur)
+            rebuilt = rebuild_gold_agg_acessos(cur, dias)
+        conn.commit()
+    return rebuilt
@@ -1,11 +1,68 @@
 from __future__ import annotations
 
+from datetime import datetime
+
 from psycopg import connect as pg_connect
 from psycopg.rows import tuple_row
 
 from src.common.settings import settings
+from src.common.watermark import get_ts_watermark, set_ts_watermark
+from src._gold.acesso.layout_gold_fato_acessos import (
+    LAYOUT_COPY,
+    LAYOUT_MONTHLY,
+    LAYOUT_PARTITIONED,
+    ensure_default_partition_key,
+    ensure_month_partitions,
+    gold_layout,
+)
+from src._gold.acesso.load_gold_agg_acessos import (
+    ensure_gold_agg_acessos,
+    merge_gold_agg_acessos,
+    rebuild_gold_agg_acessos,
+)
+from src._gold.acesso.load_gold_hll_visitantes import (
+    backfill_gold_hll_visitantes,
+    ensure_gold_hll_visitantes,
+    merge_gold_hll_visitantes,
+)
+
+# Colunas devolvidas pelos inserts da gold para a tabela de delta da execução
+_RETURNING_DELTA = """
+returning
+    origem,
+    id_acesso,
+    num_ingresso,
+    tipo_ingresso,
+    terminal_entrada,
+    dt_entrada,
+    hr_entrada,
+    tipo_publico,
+    ingested_at
+)
+insert into pg_temp.gold_fato_acessos_delta
+select * from ins;
+"""
+
+# Delta da execução corrente: só as linhas inseridas agora (consumido pelos
+# agregados da gold na mesma transação)
+DELTA_TABLE_DDL = """
+create temp table gold_fato_acessos_delta on commit drop as
+select
+    origem,
+    id_acesso,
+    num_ingresso,
+    tipo_ingresso,
+    terminal_entrada,
+    dt_entrada,
+    hr_entrada,
+    tipo_publico,
+    ingested_at
+from _gold.fato_acessos
+with no data;
+"""
 
 SILVER_TO_GOLD_SQL = """
+with ins as (
 insert into _gold.fato_acessos (
     origem,
     id_acesso,
@@ -61,26 +118,191 @@ from (
     from "_silver-contexto".fato_acesso_quality
 ) f
 left join _gold.fato_acessos g
-  on g.id_acesso = f.id_acesso
-where g.id_acesso is null;
+  on g.origem = f.origem
+ and g.id_acesso = f.id_acesso
+where g.id_acesso is null
+on conflict do nothing
+""" + _RETURNING_DELTA
+
+# Chave natural da gold: o mesmo id_acesso pode existir no LIMBER e no QUALITY.
+GOLD_UNIQUE_KEY_INDEX = "ux_fato_acessos_origem_id_acesso"
+
+GOLD_UNIQUE_KEY_DDL = """
+create unique index if not exists ux_fato_acessos_origem_id_acesso
+    on _gold.fato_acessos (origem, id_acesso);
+"""
+
+# Fatos de contexto por origem (cada uma com seu high-water mark de ingested_at)
+GOLD_ORIGENS = {
+    "LIMBER": '"_silver-contexto".fato_acesso_limber',
+    "QUALITY": '"_silver-contexto".fato_acesso_quality',
+}
+
+SILVER_TO_GOLD_INCREMENTAL_SQL = """
+with ins as (
+insert into _gold.fato_acessos (
+    origem,
+    id_acesso,
+    num_ingresso,
+    tipo_ingresso,
+    terminal_entrada,
+    dt_entrada,
+    hr_entrada,
+    tipo_publico,
+    source_file,
+    ingested_at
+)
+select
+    %(origem)s::text as origem,
+    f.id_acesso,
+    f.num_ingresso,
+    f.tipo_ingresso,
+    f.terminal_entrada,
+    f.dt_entrada,
+    f.hr_entrada,
+    f.tipo_publico,
+    f.source_file,
+    f.ingested_at
+from {contexto} f
+where (%(since)s::timestamptz is null or f.ingested_at > %(since)s)
+  and f.ingested_at <= %(until)s
+on conflict do nothing
+""" + _RETURNING_DELTA
+
+# Layout zero-copy: nada a copiar, mas a janela nova do contexto alimenta o delta
+CONTEXTO_TO_DELTA_SQL = """
+insert into pg_temp.gold_fato_acessos_delta
+select
+    %(origem)s::text as origem,
+    f.id_acesso,
+    f.num_ingresso,
+    f.tipo_ingresso,
+    f.terminal_entrada,
+    f.dt_entrada,
+    f.hr_entrada,
+    f.tipo_publico,
+    f.ingested_at
+from {contexto} f
+where (%(since)s::timestamptz is null or f.ingested_at > %(since)s)
+  and f.ingested_at <= %(until)s;
 """
 
+# Meses presentes na janela (layout monthly: partições criadas antes do insert)
+CONTEXTO_MONTHS_SQL = """
+select distinct date_trunc('month', f.dt_entrada)::date
+from {contexto} f
+where f.dt_entrada is not null
+  and (%(since)s::timestamptz is null or f.ingested_at > %(since)s)
+  and f.ingested_at <= %(until)s;
+"""
+
+CONTEXTO_MAX_INGESTED_AT_SQL = """
+select max(f.ingested_at)
+from {contexto} f
+where (%(since)s::timestamptz is null or f.ingested_at > %(since)s);
+"""
+
+
+def _watermark_args(origem: str) -> tuple[str, str, str]:
+    return (origem.lower(), "gold_fato_acessos", "ingested_at")
 
-def silver_contexto_to_gold_fato_acessos() -> int:
+
+def silver_contexto_to_gold_fato_acessos(heal: bool = False) -> int:
     """
     Incremental e idempotente:
-    Insere na gold apenas id_acesso que ainda não existe.
+    Insere na gold apenas (origem, id_acesso) que ainda não existe.
 
     Estratégia:
-    - UNION ALL das fatos Limber + Quality
-    - LEFT JOIN contra a gold
-    - Insere apenas novos acessos
+    - heal=False: por origem, copia só as linhas da fato de contexto com
+      ingested_at acima do high-water mark da origem (LIMBER e QUALITY separados)
+    - heal=True: UNION ALL das fatos Limber + Quality com anti-join contra a gold
+      (reconciliação diária)
+    - ON CONFLICT DO NOTHING nos dois modos, sobre a chave única do layout
+      ((origem, id_acesso) no copy; (origem, id_acesso, dt_entrada) no monthly,
+      mais (origem, id_acesso) na partição default, onde caem os dt_entrada nulos)
+    - as linhas inseridas vão para gold_fato_acessos_delta e atualizam os
+      agregados (_gold.agg_acessos_*) e os sketches de visitantes distintos
+      (_gold.hll_visitantes_dia) na mesma transação
+    - com os cubos vazios (primeira execução) os agregados são recalculados
+      da fato inteira em vez do delta-merge; no heal as linhas inseridas pelo
+      anti-join também passam pelo delta (recálculo completo só sob demanda:
+      run_gold_agg_acessos.py --rebuild)
+    - sketches: backfill dia a dia da fato na primeira execução (tabela vazia);
+      no heal, backfill dos dias sem sketch além do delta
+
+    No layout zero-copy (LIST por origem, ver layout_gold_fato_acessos) as
+    partições já são as fatos de contexto: não há cópia a fazer, só o delta
+    dos agregados. O delta vem sempre da janela acima do watermark (no heal
+    também: o contexto inteiro seria re-hasheado a cada execução).
+    No layout monthly as partições dos meses da janela são criadas antes do insert.
     """
+    inserted = 0
+    untils: dict[str, datetime] = {}
+
     with pg_connect(settings.pg_dsn(), row_factory=tuple_row) as conn:
         with conn.cursor() as cur:
-            print("[GOLD] SQL preview:\n", SILVER_TO_GOLD_SQL[:800])
-            cur.execute(SILVER_TO_GOLD_SQL)
-            inserted = cur.rowcount
+            layout = gold_layout(cur)
+            if layout == LAYOUT_COPY:
+                # o "if not exists" só é checado depois do lock da tabela: não
+                # roda o DDL a cada tick se o índice já existe
+                cur.execute("select to_regclass(%s)", (f"_gold.{GOLD_UNIQUE_KEY_INDEX}",))
+                if cur.fetchone()[0] is None:
+                    cur.execute(GOLD_UNIQUE_KEY_DDL)
+            elif layout == LAYOUT_MONTHLY:
+                ensure_default_partition_key(cur)
+            # cubos vazios: o histórico da fato ainda não está neles
+            rebuild_agg = ensure_gold_agg_acessos(cur)
+            # tabela de sketches vazia: backfill do histórico da fato
+            backfill_hll = ensure_gold_hll_visitantes(cur)
+            cur.execute(DELTA_TABLE_DDL)
+
+            for origem, contexto in GOLD_ORIGENS.items():
+                # zero-copy: não há o que copiar no heal; o delta fica na janela nova
+                full = heal and layout != LAYOUT_PARTITIONED
+                since = None if full else get_ts_watermark(*_watermark_args(origem))
+                cur.execute(CONTEXTO_MAX_INGESTED_AT_SQL.format(contexto=contexto), {"since": since})
+                until = cur.fetchone()[0]
+                if until is None:
+                    continue
+                untils[origem] = until
+                params = {"origem": origem, "since": since, "until": until}
+
+                if layout == LAYOUT_MONTHLY:
+                    cur.execute(CONTEXTO_MONTHS_SQL.format(contexto=contexto), params)
+                    ensure_month_partitions(cur, [r[0] for r in cur.fetchall()])
+
+                if layout == LAYOUT_PARTITIONED:
+                    cur.execute(CONTEXTO_TO_DELTA_SQL.format(contexto=contexto), params)
+                    print(f"[GOLD] {origem}: zero-copy, delta={cur.rowcount}")
+                elif not heal:
+                    cur.execute(SILVER_TO_GOLD_INCREMENTAL_SQL.format(contexto=contexto), params)
+                    print(f"[GOLD] {origem}: +{cur.rowcount}")
+                    inserted += cur.rowcount
+
+            if heal and layout != LAYOUT_PARTITIONED:
+                cur.execute(SILVER_TO_GOLD_SQL)
+                inserted = cur.rowcount
+
+            if rebuild_agg:
+                # depois dos inserts: a fato já contém as linhas desta execução
+                rebuilt = rebuild_gold_agg_acessos(cur)
+                print(f"[GOLD] Agregados recalculados da fato: {rebuilt} chaves/hora")
+            else:
+                touched = merge_gold_agg_acessos(cur)
+                print(f"[GOLD] Agregados delta-merge: {touched} chaves/hora")
+
+            if backfill_hll:
+                # depois dos inserts: a fato já contém as linhas desta execução
+                sketches = backfill_gold_hll_visitantes(cur)
+                print(f"[GOLD] Sketches HLL de visitantes (backfill): {sketches}")
+            else:
+                sketches = merge_gold_hll_visitantes(cur)
+                if heal:
+                    sketches += backfill_gold_hll_visitantes(cur)
+                print(f"[GOLD] Sketches HLL de visitantes atualizados: {sketches}")
         conn.commit()
 
+    for origem, until in untils.items():
+        set_ts_watermark(*_watermark_args(origem), until)
+
     return inserted
@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+from datetime import date
+
+from psycopg import Cursor
+from psycopg import connect as pg_connect
+from psycopg.rows import tuple_row
+
+from src.common.hll import DEFAULT_PRECISION, HyperLogLog, merge_sketches
+from src.common.settings import settings
+
+# Visitantes distintos por dia e origem como sketches HyperLogLog (bytea).
+#
+# COUNT(DISTINCT ...) sobre a fato inteira não soma entre períodos; os sketches
+# diários sim: semana/mês = merge dos sketches do intervalo (milissegundos).
+#
+# Chave do visitante:
+# - num_ingresso quando existir
+# - QUALITY sem ingresso (sócio) => 'E:' || id_emp_relac da s_quality_acesso
+# Mantido pelo loader da gold a partir de gold_fato_acessos_delta (mesma
+# transação). Como adicionar a mesma chave de novo não altera o sketch,
+# reprocessar linhas é seguro.
+#
+# Backfill por dia a partir de _gold.fato_acessos (sketch refeito do zero):
+# na primeira execução (tabela vazia), no heal só para os dias sem sketch e
+# sob demanda (run_gold_visitantes_distintos.py --backfill [inicio fim]).
+
+HLL_VISITANTES_DDL = """
+create table if not exists _gold.hll_visitantes_dia (
+    dt_entrada  date        not null,
+    origem      text        not null,
+    precisao    smallint    not null,
+    sketch      bytea       not null,
+    updated_at  timestamptz not null default now(),
+    primary key (dt_entrada, origem)
+);
+"""
+
+_VISITANTES_SQL = """
+with q as materialized (
+    select d.*
+    from {fonte} d
+    where d.origem = 'QUALITY'
+      {filtro}
+)
+select d.dt_entrada, d.origem, nullif(trim(d.num_ingresso), '') as visitante
+from {fonte} d
+where d.origem <> 'QUALITY'
+  and d.dt_entrada is not null
+  {filtro}
+union all
+select
+    q.dt_entrada,
+    q.origem,
+    coalesce(nullif(trim(q.num_ingresso), ''), 'E:' || s.id_emp_relac::text) as visitante
+from q
+left join "_silver-transacional".s_quality_acesso s
+  on s.id_acesso = q.id_acesso::bigint
+where q.dt_entrada is not null;
+"""
+
+DELTA_VISITANTES_SQL = _VISITANTES_SQL.format(fonte="pg_temp.gold_fato_acessos_delta", filtro="")
+
+# Backfill: um dia inteiro da fato (no layout monthly o filtro poda as partições)
+FATO_VISITANTES_DIA_SQL = _VISITANTES_SQL.format(fonte="_gold.fato_acessos", filtro="and d.dt_entrada = %(dia)s")
+
+DIAS_BACKFILL_SQL = """
+select distinct f.dt_entrada
+from _gold.fato_acessos f
+where f.dt_entrada is not null
+  and (%(inicio)s::date is null or f.dt_entrada >= %(inicio)s)
+  and (%(fim)s::date is null or f.dt_entrada <= %(fim)s)
+  and (
+    not %(faltantes)s
+    or not exists (
+        select 1
+        from _gold.hll_visitantes_dia h
+        where h.dt_entrada = f.dt_entrada
+          and h.origem = f.origem
+    )
+  )
+order by 1;
+"""
+
+HLL_VAZIO_SQL = """
+select not exists (select 1 from _gold.hll_visitantes_dia);
+"""
+
+SKETCHES_SQL = """
+select dt_entrada, origem, sketch
+from _gold.hll_visitantes_dia
+where (dt_entrada, origem) in (select unnest(%(dias)s::date[]), unnest(%(origens)s::text[]));
+"""
+
+UPSERT_SKETCH_SQL = """
+insert into _gold.hll_visitantes_dia (dt_entrada, origem, precisao, sketch, updated_at)
+values (%s, %s, %s, %s, now())
+on conflict (dt_entrada, origem)
+do update set
+    precisao = excluded.precisao,
+    sketch = excluded.sketch,
+    updated_at = excluded.updated_at;
+"""
+
+SKETCHES_PERIODO_SQL = """
+select sketch
+from _gold.hll_visitantes_dia
+where dt_entrada between %(inicio)s and %(fim)s
+  and (%(origem)s::text is null or origem = %(origem)s);
+"""
+
+
+def ensure_gold_hll_visitantes(cur: Cursor) -> bool:
+    """
+    Cria a tabela de sketches se não existir. Retorna True quando está vazia
+    (recém criada): o chamador deve fazer o backfill a partir da fato.
+    """
+    cur.execute(HLL_VISITANTES_DDL)
+    cur.execute(HLL_VAZIO_SQL)
+    return cur.fetchone()[0]
+
+
+def _visitantes(cur: Cursor) -> dict[tuple[date, str], list[str]]:
+    # (dt_entrada, origem) -> visitantes, a partir do select já executado
+    visitantes: dict[tuple[date, str], list[str]] = {}
+    for dt_entrada, origem, visitante in cur.fetchall():
+        if visitante is None:
+            continue
+        visitantes.setdefault((dt_entrada, origem), []).append(visitante)
+    return visitantes
+
+
+def merge_gold_hll_visitantes(cur: Cursor) -> int:
+    """
+    Adiciona os visitantes do delta da execução aos sketches (dia, origem).
+    Deve rodar na mesma transação que preencheu gold_fato_acessos_delta.
+    Retorna quantos sketches foram regravados.
+    """
+    cur.execute(DELTA_VISITANTES_SQL)
+    novos = _visitantes(cur)
+
+    if not novos:
+        return 0
+
+    chaves = list(novos)
+    cur.execute(
+        SKETCHES_SQL,
+        {"dias": [k[0] for k in chaves], "origens": [k[1] for k in chaves]},
+    )
+    sketches = {(d, o): HyperLogLog.from_bytes(bytes(s)) for d, o, s in cur.fetchall()}
+
+    linhas = []
+    for chave, visitantes in novos.items():
+        sketch = sketches.get(chave) or HyperLogLog(DEFAULT_PRECISION)
+        sketch.update(visitantes)
+        linhas.append((chave[0], chave[1], sketch.precision, sketch.to_bytes()))
+
+    cur.executemany(UPSERT_SKETCH_SQL, linhas)
+    return len(linhas)
+
+
+def sketch_dia_gold_hll_visitantes(cur: Cursor, dia: date) -> int:
+    """
+    Refaz do zero os sketches de um dia (todas as origens) a partir de
+    _gold.fato_acessos. Retorna quantos sketches foram gravados.
+    """
+    cur.execute(FATO_VISITANTES_DIA_SQL, {"dia": dia})
+    linhas = []
+    for (dt_entrada, origem), visitantes in _visitantes(cur).items():
+        sketch = HyperLogLog(DEFAULT_PRECISION)
+        sketch.update(visitantes)
+        linhas.append((dt_entrada, origem, sketch.precision, sketch.to_bytes()))
+    if linhas:
+        cur.executemany(UPSERT_SKETCH_SQL, linhas)
+    return len(linhas)
+
+
+def dias_backfill_gold_hll_visitantes(
+    cur: Cursor,
+    inicio: date | None = None,
+    fim: date | None = None,
+    somente_faltantes: bool = True,
+) -> list[date]:
+    """
+    Dias da fato entre inicio e fim (sem limite quando None); com
+    somente_faltantes, só os que têm alguma origem sem sketch.
+    """
+    cur.execute(DIAS_BACKFILL_SQL, {"inicio": inicio, "fim": fim, "faltantes": somente_faltantes})
+    return [r[0] for r in cur.fetchall()]
+
+
+def backfill_gold_hll_visitantes(cur: Cursor, somente_faltantes: bool = True) -> int:
+    """
+    Backfill dia a dia na transação do chamador (loader da gold): memória
+    limitada a um dia de fato. Retorna quantos sketches foram gravados.
+    """
+    return sum(
+        sketch_dia_gold_hll_visitantes(cur, dia)
+        for dia in dias_backfill_gold_hll_visitantes(cur, somente_faltantes=somente_faltantes)
+    )
+
+
+def reconstruir_gold_hll_visitantes(inicio: date | None = None, fim: date | None = None) -> int:
+    """
+    Backfill sob demanda, um commit por dia. Com inicio/fim refaz todos os
+    dias do intervalo; sem datas, só os dias do histórico sem sketch.
+    """
+    faltantes = inicio is None and fim is None
+    total = 0
+    with pg_connect(settings.pg_dsn(), row_factory=tuple_row) as conn:
+        with conn.cursor() as cur:
+            ensure_gold_hll_visitantes(cur)
+            conn.commit()
+            for dia in dias_backfill_gold_hll_visitantes(cur, inicio, fim, somente_faltantes=faltantes):
+                total += sketch_dia_gold_hll_visitantes(cur, dia)
+                conn.commit()
+    return total
+
+
+def contar_visitantes_distintos(inicio: date, fim: date, origem: str | None = None) -> int:
+    """
+    Visitantes distintos (aproximado, ~0,8%) entre inicio e fim (inclusive),
+    unindo os sketches diários. origem=None => LIMBER + QUALITY.
+    """
+    with pg_connect(settings.pg_dsn(), row_factory=tuple_row) as conn:
+        with conn.cursor() as cur:
+            cur.execute(SKETCHES_PERIODO_SQL, {"inicio": inicio, "fim": fim, "origem": origem})
+            merged = merge_sketches(r[0] for r in cur.fetchall())
+    return 0 if merged is None else merged.count()
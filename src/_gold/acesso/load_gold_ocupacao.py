@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+from datetime import date, datetime, time
+
+import numpy as np
+from psycopg import Cursor
+from psycopg import connect as pg_connect
+from psycopg.rows import tuple_row
+
+from src.common.settings import settings
+from src.common.watermark import get_ts_watermark, set_ts_watermark
+
+# Ocupação do parque (pessoas dentro) por minuto e terminal de entrada,
+# a partir de dt_hr_entrada / dt_hr_saida do Quality.
+#
+# Em vez de um range join (cada minuto x cada acesso, quadrático), cada acesso
+# vira dois eventos (+1 na entrada, -1 na saída); os eventos são ordenados e
+# acumulados (cumsum) e a ocupação de cada minuto é lida por busca binária.
+# Custo O(n log n) por dia/terminal.
+#
+# Regras:
+# - saída nula => pessoa considerada dentro até o fim do dia
+# - saída anterior à entrada (dado inconsistente) => saída = entrada
+# - só minutos com ocupação > 0 são gravados (ausente = 0)
+
+MINUTOS_DIA = 24 * 60
+
+OCUPACAO_DDL = """
+create table if not exists _gold.ocupacao_minuto (
+    dt_entrada       date        not null,
+    minuto           time        not null,
+    terminal_entrada text        not null,
+    ocupacao         integer     not null,
+    updated_at       timestamptz not null default now(),
+    primary key (dt_entrada, minuto, terminal_entrada)
+);
+"""
+
+# Dias tocados pela última carga da silver-trans Quality
+DIAS_TOCADOS_SQL = """
+select distinct s.dt_entrada
+from "_silver-transacional".s_quality_acesso s
+where s.dt_entrada is not null
+  and (%(since)s::timestamptz is null or s.bronze_extracted_at > %(since)s)
+  and s.bronze_extracted_at <= %(until)s;
+"""
+
+MAX_EXTRACTED_AT_SQL = """
+select max(s.bronze_extracted_at)
+from "_silver-transacional".s_quality_acesso s
+where (%(since)s::timestamptz is null or s.bronze_extracted_at > %(since)s);
+"""
+
+ACESSOS_DIA_SQL = """
+select
+    coalesce(s.terminal_entrada, 'N/I') as terminal_entrada,
+    s.dt_hr_entrada,
+    s.dt_hr_saida
+from "_silver-transacional".s_quality_acesso s
+where s.dt_entrada = %(dia)s
+  and s.dt_hr_entrada is not null;
+"""
+
+DELETE_DIA_SQL = """
+delete from _gold.ocupacao_minuto
+where dt_entrada = %(dia)s;
+"""
+
+WATERMARK_ARGS = ("quality", "gold_ocupacao_minuto", "bronze_extracted_at")
+
+
+def ocupacao_por_minuto(entradas: np.ndarray, saidas: np.ndarray) -> np.ndarray:
+    """
+    Sweep de eventos ordenados.
+
+    entradas/saidas: minutos desde 00:00 do dia (float, mesmo tamanho; saída
+    NaN = fim do dia). Retorna um array de MINUTOS_DIA posições com quantas
+    pessoas estavam dentro em cada minuto (entrada <= t < saída).
+    """
+    saidas = np.where(np.isnan(saidas), MINUTOS_DIA, saidas)
+    saidas = np.maximum(saidas, entradas)
+
+    instantes = np.concatenate([entradas, saidas])
+    deltas = np.concatenate([np.ones(len(entradas), dtype=np.int64), -np.ones(len(saidas), dtype=np.int64)])
+
+    ordem = np.argsort(instantes, kind="stable")
+    instantes = instantes[ordem]
+    acumulado = np.cumsum(deltas[ordem])
+
+    minutos = np.arange(MINUTOS_DIA, dtype=np.float64)
+    # posição do último evento com instante <= minuto
+    idx = np.searchsorted(instantes, minutos, side="right") - 1
+    return np.where(idx >= 0, acumulado[np.maximum(idx, 0)], 0)
+
+
+def _minutos_desde(dia: date, valores: list[datetime | None]) -> np.ndarray:
+    inicio = datetime.combine(dia, time(0, 0))
+    return np.array(
+        [np.nan if v is None else (v - inicio).total_seconds() / 60.0 for v in valores],
+        dtype=np.float64,
+    )
+
+
+def rebuild_ocupacao_dia(cur: Cursor, dia: date) -> int:
+    """
+    Recalcula a ocupação de um dia (todos os terminais) e regrava o dia.
+    Retorna quantas linhas (minuto x terminal) foram gravadas.
+    """
+    cur.execute(ACESSOS_DIA_SQL, {"dia": dia})
+    por_terminal: dict[str, tuple[list, list]] = {}
+    for terminal, dt_hr_entrada, dt_hr_saida in cur.fetchall():
+        entradas, saidas = por_terminal.setdefault(terminal, ([], []))
+        entradas.append(dt_hr_entrada)
+        saidas.append(dt_hr_saida)
+
+    cur.execute(DELETE_DIA_SQL, {"dia": dia})
+
+    gravadas = 0
+    with cur.copy(
+        "copy _gold.ocupacao_minuto (dt_entrada, minuto, terminal_entrada, ocupacao) from stdin"
+    ) as copy:
+        for terminal, (entradas, saidas) in por_terminal.items():
+            ocupacao = ocupacao_por_minuto(_minutos_desde(dia, entradas), _minutos_desde(dia, saidas))
+            for minuto in np.flatnonzero(ocupacao > 0):
+                copy.write_row((dia, time(int(minuto) // 60, int(minuto) % 60), terminal, int(ocupacao[minuto])))
+                gravadas += 1
+    return gravadas
+
+
+def load_gold_ocupacao(dias: list[date] | None = None) -> int:
+    """
+    Incremental: recalcula só os dias tocados pelas linhas da s_quality_acesso
+    com bronze_extracted_at acima do high-water mark.
+    dias informados => recalcula exatamente esses dias (sem mexer no watermark).
+    """
+    until = None
+    with pg_connect(settings.pg_dsn(), row_factory=tuple_row) as conn:
+        with conn.cursor() as cur:
+            cur.execute(OCUPACAO_DDL)
+
+            if dias is None:
+                since = get_ts_watermark(*WATERMARK_ARGS)
+                cur.execute(MAX_EXTRACTED_AT_SQL, {"since": since})
+                until = cur.fetchone()[0]
+                if until is None:
+                    return 0
+                cur.execute(DIAS_TOCADOS_SQL, {"since": since, "until": until})
+                dias = [r[0] for r in cur.fetchall()]
+
+            gravadas = 0
+            for dia in sorted(dias):
+                n = rebuild_ocupacao_dia(cur, dia)
+                print(f"[GOLD][OCUPACAO] {dia.isoformat()}: {n} minutos x terminal")
+                gravadas += n
+        conn.commit()
+
+    if until is not None:
+        set_ts_watermark(*WATERMARK_ARGS, until)
+    return gravadas
@@ -4,9 +4,10 @@ from psycopg import connect as pg_connect
 from psycopg.rows import tuple_row
 
 from common.settings import settings
+from common.watermark import get_ts_watermark, set_ts_watermark
 
 
-SILVER_TRANS_TO_CONTEXTO_SQL = """
+_INSERT_SELECT_SQL = """
 insert into "_silver-contexto".fato_acesso_limber (
   id_acesso,
   num_ingresso,
@@ -41,21 +42,69 @@ from "_silver-transacional".s_limber_acesso s
 left join "_silver-contexto".dim_depara_tipo_publico_limber dp
   on dp.tipo_ingresso = s.tipo_ingresso
  and dp.active = true
+"""
+
+# Reconciliação (1x por dia): anti-join completo silver-trans x fato.
+SILVER_TRANS_TO_CONTEXTO_SQL = _INSERT_SELECT_SQL + """
 left join "_silver-contexto".fato_acesso_limber f
   on f.id_acesso = s.id_acesso
 where f.id_acesso is null
-  and (dp.tipo_publico IS NULL OR dp.tipo_publico <> 'OUTROS');;
+  and (dp.tipo_publico IS NULL OR dp.tipo_publico <> 'OUTROS');
+"""
+
+# Incremental: só as linhas da silver-trans na janela (since, until] de bronze_extracted_at.
+SILVER_TRANS_TO_CONTEXTO_INCREMENTAL_SQL = _INSERT_SELECT_SQL + """
+where (%(since)s::timestamptz is null or s.bronze_extracted_at > %(since)s)
+  and s.bronze_extracted_at <= %(until)s
+  and not exists (
+    select 1
+    from "_silver-contexto".fato_acesso_limber f
+    where f.id_acesso = s.id_acesso
+  )
+  and (dp.tipo_publico IS NULL OR dp.tipo_publico <> 'OUTROS');
+"""
+
+SILVER_TRANS_MAX_EXTRACTED_AT_SQL = """
+select max(s.bronze_extracted_at)
+from "_silver-transacional".s_limber_acesso s
+where (%(since)s::timestamptz is null or s.bronze_extracted_at > %(since)s);
 """
 
+WATERMARK_ARGS = ("limber", "fato_acesso_limber", "bronze_extracted_at")
+
 
-def silver_trans_to_silver_contexto_fato_limber(source_file: str = "firebird:limber") -> int:
+def silver_trans_to_silver_contexto_fato_limber(
+    source_file: str = "firebird:limber",
+    heal: bool = False,
+) -> int:
     """
     Incremental e idempotente:
     insere na fato apenas id_acesso que ainda não existe.
+
+    - heal=False: classifica só as linhas novas da s_limber_acesso
+      (bronze_extracted_at acima do high-water mark).
+    - heal=True: reconciliação completa (anti-join), cobre linhas que chegaram
+      na silver-trans fora de ordem (ex.: heal da bronze) ou sem bronze_extracted_at.
     """
+    since = None if heal else get_ts_watermark(*WATERMARK_ARGS)
+
     with pg_connect(settings.pg_dsn(), row_factory=tuple_row) as conn:
         with conn.cursor() as cur:
-            cur.execute(SILVER_TRANS_TO_CONTEXTO_SQL, {"source_file": source_file})
+            cur.execute(SILVER_TRANS_MAX_EXTRACTED_AT_SQL, {"since": since})
+            until = cur.fetchone()[0]
+
+            if heal:
+                cur.execute(SILVER_TRANS_TO_CONTEXTO_SQL, {"source_file": source_file})
+            elif until is not None:
+                cur.execute(
+                    SILVER_TRANS_TO_CONTEXTO_INCREMENTAL_SQL,
+                    {"source_file": source_file, "since": since, "until": until},
+                )
+            else:
+                return 0
             inserted = cur.rowcount
         conn.commit()
+
+    if until is not None:
+        set_ts_watermark(*WATERMARK_ARGS, until)
     return inserted
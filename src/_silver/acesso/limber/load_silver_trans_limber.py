@@ -4,9 +4,11 @@ from psycopg import connect as pg_connect
 from psycopg.rows import tuple_row
 
 from common.settings import settings
+from common.watermark import get_ts_watermark, set_ts_watermark
+from _bronze.acesso.layout_bronze_acessos import has_typed_columns
 
 
-BRONZE_TO_SILVER_SQL = """
+_INSERT_SELECT_SQL = """
 insert into "_silver-transacional".s_limber_acesso (
   id_acesso,
   dt_acesso_sys,
@@ -43,17 +45,17 @@ select
 
   nullif(b.payload->>'DATA_ACESSO','')::date as dt_acesso_sys,
 
-  nullif(b.payload->>'DT_HR_VOUCHER','')::timestamp as dt_hr_voucher,
-  (nullif(b.payload->>'DT_HR_VOUCHER','')::timestamp)::date as dt_voucher,
-  (nullif(b.payload->>'DT_HR_VOUCHER','')::timestamp)::time as hr_voucher,
+  {dt_hr_voucher} as dt_hr_voucher,
+  ({dt_hr_voucher})::date as dt_voucher,
+  ({dt_hr_voucher})::time as hr_voucher,
 
   b.payload->>'QRCODE' as num_ingresso,
 
-  nullif(b.payload->>'DTBAIXA','')::timestamp as dt_hr_baixa,
+  {dt_hr_baixa} as dt_hr_baixa,
 
   -- regra escolhida: acesso = baixa
-  (nullif(b.payload->>'DTBAIXA','')::timestamp)::date as dt_entrada,
-  (nullif(b.payload->>'DTBAIXA','')::timestamp)::time as hr_entrada,
+  ({dt_hr_baixa})::date as dt_entrada,
+  ({dt_hr_baixa})::time as hr_entrada,
 
   b.payload->>'PONTO_VENDA' as terminal_entrada,
   b.payload->>'CODIGO_GRUPO' as cod_grupo,
@@ -65,26 +67,91 @@ select
   b.payload->>'CATEGORIA' as categoria,
   b.payload->>'TIPO' as tipo,
 
-  nullif(b.payload->>'QTDE','')::numeric as qtd,
-  nullif(b.payload->>'VLR_UNITARIO','')::numeric as vlr_unit,
+  {qtd} as qtd,
+  {vlr_unit} as vlr_unit,
 
   b.nrvoucher as src_nrvoucher,
   b.extracted_at as bronze_extracted_at,
   b.payload as payload
 from _bronze.limber_acessos_raw b
+"""
+
+# Campos quentes: lidos do JSONB ou, quando a bronze já tem as colunas
+# tipadas (_bronze.acesso.layout_bronze_acessos), direto das colunas.
+# No modo landing as colunas são regulares e linhas antigas podem estar nulas:
+# o coalesce só parseia o payload nesses casos.
+_PAYLOAD_EXPR = {
+    "dt_hr_voucher": "nullif(b.payload->>'DT_HR_VOUCHER','')::timestamp",
+    "dt_hr_baixa": "nullif(b.payload->>'DTBAIXA','')::timestamp",
+    "qtd": "nullif(b.payload->>'QTDE','')::numeric",
+    "vlr_unit": "nullif(b.payload->>'VLR_UNITARIO','')::numeric",
+}
+_TYPED_EXPR = {col: f"coalesce(b.{col}, {expr})" for col, expr in _PAYLOAD_EXPR.items()}
+
+# Modo "heal" (noturno): anti-join da bronze inteira contra a silver inteira.
+# Recupera qualquer linha que o incremental tenha perdido.
+_HEAL_WHERE = """
 left join "_silver-transacional".s_limber_acesso s
   on s.id_acesso = b.nrvoucher
 where s.id_acesso is null;
 """
 
-def bronze_to_silver_trans_limber() -> int:
+# Modo incremental (a cada tick): lê só a janela (since, until] de extracted_at.
+# O NOT EXISTS roda apenas para as linhas da janela (lookup pontual por id_acesso).
+_INCREMENTAL_WHERE = """
+where (%(since)s::timestamptz is null or b.extracted_at > %(since)s)
+  and b.extracted_at <= %(until)s
+  and not exists (
+    select 1
+    from "_silver-transacional".s_limber_acesso s
+    where s.id_acesso = b.nrvoucher
+  );
+"""
+
+BRONZE_TO_SILVER_SQL = _INSERT_SELECT_SQL.format(**_PAYLOAD_EXPR) + _HEAL_WHERE
+BRONZE_TO_SILVER_INCREMENTAL_SQL = _INSERT_SELECT_SQL.format(**_PAYLOAD_EXPR) + _INCREMENTAL_WHERE
+BRONZE_TO_SILVER_TYPED_SQL = _INSERT_SELECT_SQL.format(**_TYPED_EXPR) + _HEAL_WHERE
+BRONZE_TO_SILVER_TYPED_INCREMENTAL_SQL = _INSERT_SELECT_SQL.format(**_TYPED_EXPR) + _INCREMENTAL_WHERE
+
+BRONZE_MAX_EXTRACTED_AT_SQL = """
+select max(b.extracted_at)
+from _bronze.limber_acessos_raw b
+where (%(since)s::timestamptz is null or b.extracted_at > %(since)s);
+"""
+
+WATERMARK_ARGS = ("limber", "s_limber_acesso", "bronze_extracted_at")
+
+
+def bronze_to_silver_trans_limber(heal: bool = False) -> int:
     """
     Incremental e idempotente:
     Insere na silver-transacional apenas NRVOUCHER que ainda não existe em s_limber_acesso.
+
+    - heal=False: processa só a bronze com extracted_at acima do high-water mark
+      (_control.etl_watermark), custo proporcional às linhas novas.
+    - heal=True: anti-join completo bronze x silver (rodar 1x por dia).
+    Em ambos os modos o watermark avança para o maior extracted_at visto.
     """
+    since = None if heal else get_ts_watermark(*WATERMARK_ARGS)
+
     with pg_connect(settings.pg_dsn(), row_factory=tuple_row) as conn:
         with conn.cursor() as cur:
-            cur.execute(BRONZE_TO_SILVER_SQL)
+            cur.execute(BRONZE_MAX_EXTRACTED_AT_SQL, {"since": since})
+            until = cur.fetchone()[0]
+            if until is None:
+                return 0
+
+            typed = has_typed_columns(cur, "limber_acessos_raw")
+            if heal:
+                cur.execute(BRONZE_TO_SILVER_TYPED_SQL if typed else BRONZE_TO_SILVER_SQL)
+            else:
+                cur.execute(
+                    BRONZE_TO_SILVER_TYPED_INCREMENTAL_SQL if typed else BRONZE_TO_SILVER_INCREMENTAL_SQL,
+                    {"since": since, "until": until},
+                )
             inserted = cur.rowcount
         conn.commit()
+
+    # Atualiza watermark apenas após commit bem-sucedido
+    set_ts_watermark(*WATERMARK_ARGS, until)
     return inserted
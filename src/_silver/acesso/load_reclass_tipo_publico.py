@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+from psycopg import Cursor
+from psycopg import connect as pg_connect
+from psycopg.rows import tuple_row
+
+from src.common.settings import settings
+from src._gold.acesso.layout_gold_fato_acessos import LAYOUT_PARTITIONED, gold_layout
+from src._gold.acesso.load_gold_agg_acessos import ensure_gold_agg_acessos, rebuild_gold_agg_acessos
+
+# Reclassificação de tipo_publico quando o de/para muda.
+#
+# As fatos de contexto gravam tipo_publico = 'CHECK' quando o de/para não tem
+# o tipo_ingresso, e os loaders só inserem id_acesso novo: sem este job, essas
+# linhas nunca seriam corrigidas depois que alguém cadastra o mapeamento.
+#
+# Detecção: o mapeamento efetivo (linhas ativas) de cada origem é comparado
+# com a última versão aplicada (_control.depara_tipo_publico_snapshot).
+# Só os tipo_ingresso alterados/incluídos/removidos são reprocessados:
+# - novo valor 'OUTROS'  => linhas saem do contexto e da gold (regra dos loaders)
+# - mapeamento removido  => volta para 'CHECK'
+# - demais               => UPDATE só das linhas com tipo_publico diferente
+# Os agregados da gold são recalculados apenas nos dias afetados.
+# Primeira execução (snapshot vazio para a origem): as fatos já foram gravadas
+# com o de/para atual pelos loaders, então o snapshot só é semeado, sem
+# reprocessar nada (senão todo tipo_ingresso contaria como alterado).
+# Linhas que eram 'OUTROS' (nunca inseridas) entram no próximo heal do contexto/gold.
+
+DEPARA_ORIGENS = {
+    "LIMBER": {
+        "depara": '"_silver-contexto".dim_depara_tipo_publico_limber',
+        "ativo": "active",
+        "fato": '"_silver-contexto".fato_acesso_limber',
+    },
+    "QUALITY": {
+        "depara": '"_silver-contexto".dim_depara_tipo_publico_quality',
+        "ativo": "ativo",
+        "fato": '"_silver-contexto".fato_acesso_quality',
+    },
+}
+
+SNAPSHOT_DDL = """
+create table if not exists _control.depara_tipo_publico_snapshot (
+    origem        text        not null,
+    tipo_ingresso text        not null,
+    tipo_publico  text,
+    updated_at    timestamptz not null default now(),
+    primary key (origem, tipo_ingresso)
+);
+"""
+
+_ATUAL_SQL = """
+select dp.tipo_ingresso, min(dp.tipo_publico) as tipo_publico
+from {depara} dp
+where dp.{ativo} = true
+  and dp.tipo_ingresso is not null
+group by dp.tipo_ingresso
+"""
+
+DIFF_SQL = """
+with atual as (""" + _ATUAL_SQL + """),
+snap as (
+    select tipo_ingresso, tipo_publico
+    from _control.depara_tipo_publico_snapshot
+    where origem = %(origem)s
+)
+select
+    coalesce(a.tipo_ingresso, s.tipo_ingresso) as tipo_ingresso,
+    coalesce(a.tipo_publico, 'CHECK') as tipo_publico_novo
+from atual a
+full join snap s
+  on s.tipo_ingresso = a.tipo_ingresso
+where a.tipo_publico is distinct from s.tipo_publico;
+"""
+
+UPDATE_FATO_SQL = """
+update {fato} f
+set tipo_publico = m.tipo_publico
+from (
+    select unnest(%(tipos)s::text[]) as tipo_ingresso,
+           unnest(%(novos)s::text[]) as tipo_publico
+) m
+where f.tipo_ingresso = m.tipo_ingresso
+  and f.tipo_publico is distinct from m.tipo_publico
+  {filtro}
+returning f.dt_entrada;
+"""
+
+DELETE_FATO_SQL = """
+delete from {fato} f
+where f.tipo_ingresso = any(%(tipos)s::text[])
+  {filtro}
+returning f.dt_entrada;
+"""
+
+SNAPSHOT_VAZIO_SQL = """
+select not exists (
+    select 1 from _control.depara_tipo_publico_snapshot where origem = %(origem)s
+);
+"""
+
+SNAPSHOT_REPLACE_SQL = """
+delete from _control.depara_tipo_publico_snapshot where origem = %(origem)s;
+
+insert into _control.depara_tipo_publico_snapshot (origem, tipo_ingresso, tipo_publico, updated_at)
+select %(origem)s, a.tipo_ingresso, a.tipo_publico, now()
+from (""" + _ATUAL_SQL + """) a;
+"""
+
+
+def _aplicar(cur: Cursor, fato: str, filtro: str, origem: str, mudancas: dict[str, str]) -> set:
+    """
+    Aplica as mudanças em uma fato e devolve os dt_entrada afetados.
+    """
+    outros = [t for t, novo in mudancas.items() if novo == "OUTROS"]
+    demais = {t: novo for t, novo in mudancas.items() if novo != "OUTROS"}
+    params = {"origem": origem}
+    dias = set()
+
+    if demais:
+        cur.execute(
+            UPDATE_FATO_SQL.format(fato=fato, filtro=filtro),
+            {**params, "tipos": list(demais), "novos": list(demais.values())},
+        )
+        dias.update(r[0] for r in cur.fetchall())
+    if outros:
+        cur.execute(DELETE_FATO_SQL.format(fato=fato, filtro=filtro), {**params, "tipos": outros})
+        dias.update(r[0] for r in cur.fetchall())
+    return dias
+
+
+def reclassificar_tipo_publico() -> int:
+    """
+    Detecta mudanças no de/para de tipo_publico (Limber e Quality) e corrige
+    somente as fatos dos tipo_ingresso afetados, no contexto e na gold.
+    Retorna o total de tipo_ingresso reprocessados.
+    """
+    total = 0
+    with pg_connect(settings.pg_dsn(), row_factory=tuple_row) as conn:
+        with conn.cursor() as cur:
+            cur.execute(SNAPSHOT_DDL)
+            agg_vazio = ensure_gold_agg_acessos(cur)
+            zero_copy = gold_layout(cur) == LAYOUT_PARTITIONED
+
+            dias_gold: set = set()
+            for origem, cfg in DEPARA_ORIGENS.items():
+                cur.execute(SNAPSHOT_VAZIO_SQL, {"origem": origem})
+                if cur.fetchone()[0]:
+                    cur.execute(
+                        SNAPSHOT_REPLACE_SQL.format(depara=cfg["depara"], ativo=cfg["ativo"]),
+                        {"origem": origem},
+                    )
+                    print(f"[RECLASS][{origem}] Snapshot do de/para semeado (primeira execução, nada reprocessado)")
+                    continue
+
+                diff_sql = DIFF_SQL.format(depara=cfg["depara"], ativo=cfg["ativo"])
+                cur.execute(diff_sql, {"origem": origem})
+                mudancas = {tipo: novo for tipo, novo in cur.fetchall()}
+                if not mudancas:
+                    continue
+
+                dias_ctx = _aplicar(cur, cfg["fato"], "", origem, mudancas)
+                if zero_copy:
+                    # a gold é a própria fato de contexto
+                    dias_gold.update(dias_ctx)
+                else:
+                    dias_gold.update(
+                        _aplicar(cur, "_gold.fato_acessos", "and f.origem = %(origem)s", origem, mudancas)
+                    )
+
+                cur.execute(
+                    SNAPSHOT_REPLACE_SQL.format(depara=cfg["depara"], ativo=cfg["ativo"]),
+                    {"origem": origem},
+                )
+                print(f"[RECLASS][{origem}] tipo_ingresso reprocessados: {len(mudancas)} | dias afetados: {len(dias_ctx)}")
+                total += len(mudancas)
+
+            dias = sorted(d for d in dias_gold if d is not None)
+            if agg_vazio:
+                rebuild_gold_agg_acessos(cur)
+                print("[RECLASS] Agregados da gold recalculados (cubos vazios)")
+            elif dias:
+                rebuild_gold_agg_acessos(cur, dias)
+                print(f"[RECLASS] Agregados da gold recalculados em {len(dias)} dia(s)")
+        conn.commit()
+
+    return total
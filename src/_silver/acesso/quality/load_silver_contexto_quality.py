@@ -4,9 +4,10 @@ from psycopg import connect as pg_connect
 from psycopg.rows import tuple_row
 
 from common.settings import settings
+from common.watermark import get_ts_watermark, set_ts_watermark
 
 
-SILVER_TRANS_TO_CONTEXTO_QUALITY_SQL = """
+_INSERT_SELECT_QUALITY_SQL = """
 insert into "_silver-contexto".fato_acesso_quality (
   id_acesso,
   num_ingresso,
@@ -37,6 +38,10 @@ from "_silver-transacional".s_quality_acesso s
 left join "_silver-contexto".dim_depara_tipo_publico_quality dp
   on dp.tipo_ingresso = s.tipo_ingresso
  and dp.ativo = true
+"""
+
+# Reconciliação (1x por dia): anti-join completo silver-trans x fato.
+SILVER_TRANS_TO_CONTEXTO_QUALITY_SQL = _INSERT_SELECT_QUALITY_SQL + """
 left join "_silver-contexto".fato_acesso_quality f
   on f.id_acesso = s.id_acesso::text
 where f.id_acesso is null
@@ -46,11 +51,57 @@ where f.id_acesso is null
 ;
 """
 
+# Incremental: só a janela (since, until] de bronze_extracted_at da silver-trans.
+SILVER_TRANS_TO_CONTEXTO_QUALITY_INCREMENTAL_SQL = _INSERT_SELECT_QUALITY_SQL + """
+where (%(since)s::timestamptz is null or s.bronze_extracted_at > %(since)s)
+  and s.bronze_extracted_at <= %(until)s
+  and not exists (
+    select 1
+    from "_silver-contexto".fato_acesso_quality f
+    where f.id_acesso = s.id_acesso::text
+  )
+  -- não inserir OUTROS
+  and s.tipo_ingresso <> 'OUTROS'
+  and coalesce(dp.tipo_publico, 'CHECK') <> 'OUTROS'
+;
+"""
+
+SILVER_TRANS_MAX_EXTRACTED_AT_QUALITY_SQL = """
+select max(s.bronze_extracted_at)
+from "_silver-transacional".s_quality_acesso s
+where (%(since)s::timestamptz is null or s.bronze_extracted_at > %(since)s);
+"""
+
+WATERMARK_ARGS = ("quality", "fato_acesso_quality", "bronze_extracted_at")
+
+
+def silver_trans_to_silver_contexto_fato_quality(
+    source_file: str = "sqlserver:quality",
+    heal: bool = False,
+) -> int:
+    """
+    - heal=False: incremental pelo high-water mark de bronze_extracted_at.
+    - heal=True: reconciliação completa (anti-join).
+    """
+    since = None if heal else get_ts_watermark(*WATERMARK_ARGS)
 
-def silver_trans_to_silver_contexto_fato_quality(source_file: str = "sqlserver:quality") -> int:
     with pg_connect(settings.pg_dsn(), row_factory=tuple_row) as conn:
         with conn.cursor() as cur:
-            cur.execute(SILVER_TRANS_TO_CONTEXTO_QUALITY_SQL, {"source_file": source_file})
+            cur.execute(SILVER_TRANS_MAX_EXTRACTED_AT_QUALITY_SQL, {"since": since})
+            until = cur.fetchone()[0]
+
+            if heal:
+                cur.execute(SILVER_TRANS_TO_CONTEXTO_QUALITY_SQL, {"source_file": source_file})
+            elif until is not None:
+                cur.execute(
+                    SILVER_TRANS_TO_CONTEXTO_QUALITY_INCREMENTAL_SQL,
+                    {"source_file": source_file, "since": since, "until": until},
+                )
+            else:
+                return 0
             inserted = cur.rowcount
         conn.commit()
+
+    if until is not None:
+        set_ts_watermark(*WATERMARK_ARGS, until)
     return inserted
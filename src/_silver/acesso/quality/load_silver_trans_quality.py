@@ -4,9 +4,16 @@ from psycopg import connect as pg_connect
 from psycopg.rows import tuple_row
 
 from common.settings import settings
+from common.watermark import get_ts_watermark, set_ts_watermark
+from _bronze.acesso.layout_bronze_acessos import (
+    backfill_categoria_columns,
+    ensure_categoria_functions,
+    has_typed_columns,
+    is_typed_landing,
+)
 
 
-BRONZE_TO_SILVER_QUALITY_SQL = """
+_INSERT_SELECT_QUALITY_SQL = """
 insert into "_silver-transacional".s_quality_acesso (
   id_acesso,
 
@@ -42,13 +49,13 @@ insert into "_silver-transacional".s_quality_acesso (
 select
   (b."idacesso")::bigint as id_acesso,
 
-  nullif(b.payload->>'data_hora_entrada','')::timestamp as dt_hr_entrada,
-  (nullif(b.payload->>'data_hora_entrada','')::timestamp)::date as dt_entrada,
-  (nullif(b.payload->>'data_hora_entrada','')::timestamp)::time as hr_entrada,
+  {dt_hr_entrada} as dt_hr_entrada,
+  ({dt_hr_entrada})::date as dt_entrada,
+  ({dt_hr_entrada})::time as hr_entrada,
 
-  nullif(b.payload->>'data_hora_saida','')::timestamp as dt_hr_saida,
-  (nullif(b.payload->>'data_hora_saida','')::timestamp)::date as dt_saida,
-  (nullif(b.payload->>'data_hora_saida','')::timestamp)::time as hr_saida,
+  {dt_hr_saida} as dt_hr_saida,
+  ({dt_hr_saida})::date as dt_saida,
+  ({dt_hr_saida})::time as hr_saida,
 
   nullif(b.payload->>'terminal_entrada','') as terminal_entrada,
   nullif(b.payload->>'terminal_saida','') as terminal_saida,
@@ -58,26 +65,11 @@ select
 
   nullif(b.payload->>'categoria_tipo_ingresso','') as id_desc_tipo_ingresso,
 
-  -- id_tipo_ingresso: só converte se a parte antes do " - " for numérica
-  case
-    when position(' - ' in coalesce(b.payload->>'categoria_tipo_ingresso','')) > 0
-     and regexp_replace(trim(split_part(b.payload->>'categoria_tipo_ingresso', ' - ', 1)), '\\s+', '', 'g') ~ '^\\d+$'
-      then regexp_replace(trim(split_part(b.payload->>'categoria_tipo_ingresso', ' - ', 1)), '\\s+', '', 'g')::bigint
-    else null
-  end as id_tipo_ingresso,
-
-  -- tipo_ingresso (desc) com regra OUTROS se inválido/nulo/sem delimitador
-  case
-    when b.payload->>'categoria_tipo_ingresso' is null then 'OUTROS'
-    when trim(b.payload->>'categoria_tipo_ingresso') = '' then 'OUTROS'
-    when position(' - ' in b.payload->>'categoria_tipo_ingresso') = 0 then 'OUTROS'
-    when not (regexp_replace(trim(split_part(b.payload->>'categoria_tipo_ingresso', ' - ', 1)), '\\s+', '', 'g') ~ '^\\d+$')
-      then 'OUTROS'
-    else nullif(trim(split_part(b.payload->>'categoria_tipo_ingresso', ' - ', 2)), '')
-  end as tipo_ingresso,
+  {id_tipo_ingresso} as id_tipo_ingresso,
+  {tipo_ingresso} as tipo_ingresso,
 
   nullif(b.payload->>'numero_ingresso','') as num_ingresso,
-  nullif(b.payload->>'idEmpresaRelacionamento','')::bigint as id_emp_relac,
+  {id_emp_relac} as id_emp_relac,
 
   nullif(b.payload->>'email','') as email,
   nullif(b.payload->>'telefone','') as telefone,
@@ -87,17 +79,98 @@ select
   b.extracted_at as bronze_extracted_at,
   b.payload as payload
 from _bronze.quality_acessos_raw b
+"""
+
+# Campos quentes: lidos do JSONB ou, quando a bronze já tem as colunas
+# tipadas (_bronze.acesso.layout_bronze_acessos), direto das colunas.
+# No modo landing as colunas de data/empresa são regulares e linhas antigas
+# podem estar nulas: o coalesce só lê o payload nesses casos.
+# Tipo de ingresso: regras só nas funções _bronze.categoria_*; com as colunas
+# tipadas (geradas, ou preenchidas pelo loader / backfill_categoria_columns)
+# a silver só projeta b.id_tipo_ingresso / b.tipo_ingresso.
+_CATEGORIA = "b.payload->>'categoria_tipo_ingresso'"
+_PAYLOAD_EXPR = {
+    "dt_hr_entrada": "nullif(b.payload->>'data_hora_entrada','')::timestamp",
+    "dt_hr_saida": "nullif(b.payload->>'data_hora_saida','')::timestamp",
+    "id_emp_relac": "nullif(b.payload->>'idEmpresaRelacionamento','')::bigint",
+    "id_tipo_ingresso": f"_bronze.categoria_id_tipo_ingresso({_CATEGORIA})",
+    "tipo_ingresso": f"_bronze.categoria_tipo_ingresso({_CATEGORIA})",
+}
+_TYPED_EXPR = {
+    "dt_hr_entrada": f"coalesce(b.dt_hr_entrada, {_PAYLOAD_EXPR['dt_hr_entrada']})",
+    "dt_hr_saida": f"coalesce(b.dt_hr_saida, {_PAYLOAD_EXPR['dt_hr_saida']})",
+    "id_emp_relac": f"coalesce(b.id_emp_relac, {_PAYLOAD_EXPR['id_emp_relac']})",
+    "id_tipo_ingresso": "b.id_tipo_ingresso",
+    "tipo_ingresso": "b.tipo_ingresso",
+}
+
+# Modo "heal" (noturno): anti-join completo bronze x silver.
+_HEAL_WHERE = """
 left join "_silver-transacional".s_quality_acesso s
   on s.id_acesso = (b."idacesso")::bigint
 where s.id_acesso is null
 ;
 """
 
+# Modo incremental: só a janela (since, until] de extracted_at da bronze.
+_INCREMENTAL_WHERE = """
+where (%(since)s::timestamptz is null or b.extracted_at > %(since)s)
+  and b.extracted_at <= %(until)s
+  and not exists (
+    select 1
+    from "_silver-transacional".s_quality_acesso s
+    where s.id_acesso = (b."idacesso")::bigint
+  )
+;
+"""
+
+BRONZE_TO_SILVER_QUALITY_SQL = _INSERT_SELECT_QUALITY_SQL.format(**_PAYLOAD_EXPR) + _HEAL_WHERE
+BRONZE_TO_SILVER_QUALITY_INCREMENTAL_SQL = _INSERT_SELECT_QUALITY_SQL.format(**_PAYLOAD_EXPR) + _INCREMENTAL_WHERE
+BRONZE_TO_SILVER_QUALITY_TYPED_SQL = _INSERT_SELECT_QUALITY_SQL.format(**_TYPED_EXPR) + _HEAL_WHERE
+BRONZE_TO_SILVER_QUALITY_TYPED_INCREMENTAL_SQL = (
+    _INSERT_SELECT_QUALITY_SQL.format(**_TYPED_EXPR) + _INCREMENTAL_WHERE
+)
+
+BRONZE_MAX_EXTRACTED_AT_QUALITY_SQL = """
+select max(b.extracted_at)
+from _bronze.quality_acessos_raw b
+where (%(since)s::timestamptz is null or b.extracted_at > %(since)s);
+"""
+
+WATERMARK_ARGS = ("quality", "s_quality_acesso", "bronze_extracted_at")
+
+
+def bronze_to_silver_trans_quality(heal: bool = False) -> int:
+    """
+    - heal=False: incremental pelo high-water mark de extracted_at.
+    - heal=True: anti-join completo (rodar 1x por dia).
+    """
+    since = None if heal else get_ts_watermark(*WATERMARK_ARGS)
 
-def bronze_to_silver_trans_quality() -> int:
     with pg_connect(settings.pg_dsn(), row_factory=tuple_row) as conn:
         with conn.cursor() as cur:
-            cur.execute(BRONZE_TO_SILVER_QUALITY_SQL)
+            cur.execute(BRONZE_MAX_EXTRACTED_AT_QUALITY_SQL, {"since": since})
+            until = cur.fetchone()[0]
+            if until is None:
+                return 0
+
+            typed = has_typed_columns(cur, "quality_acessos_raw")
+            if not typed:
+                ensure_categoria_functions(cur)
+            elif is_typed_landing(cur, "quality_acessos_raw"):
+                # landing: linhas gravadas sem as colunas derivadas (BRONZE_TYPED=false)
+                preenchidas = backfill_categoria_columns(cur, since, None if heal else until)
+                if preenchidas:
+                    print(f"[QUALITY] Categorias preenchidas na bronze: {preenchidas}")
+            if heal:
+                cur.execute(BRONZE_TO_SILVER_QUALITY_TYPED_SQL if typed else BRONZE_TO_SILVER_QUALITY_SQL)
+            else:
+                cur.execute(
+                    BRONZE_TO_SILVER_QUALITY_TYPED_INCREMENTAL_SQL if typed else BRONZE_TO_SILVER_QUALITY_INCREMENTAL_SQL,
+                    {"since": since, "until": until},
+                )
             inserted = cur.rowcount
         conn.commit()
+
+    set_ts_watermark(*WATERMARK_ARGS, until)
     return inserted
@@ -6,6 +6,7 @@ import psycopg2
 from psycopg2.extras import execute_values
 
 from src.common.settings import settings
+from src.common.watermark import get_watermark, set_watermark
 
 LOGGER = logging.getLogger(__name__)
 
@@ -26,12 +27,66 @@ def _connect():
     )
 
 
-def load_silver_trans_clima(since_ingested_at: datetime | None = None) -> int:
-    where = ""
+# High-water mark: maior bronze_id já levado para a silver (bronze_id é bigserial)
+WATERMARK_ARGS = ("clima", "s_clima", "bronze_id")
+
+UNIQUE_INDEX = "ux_s_clima_bronze_id"
+
+BRONZE_MAX_ID_SQL = f"SELECT max(bronze_id) FROM {BRONZE_TABLE}"
+
+UNIQUE_INDEX_VALID_SQL = """
+    SELECT i.indisvalid
+    FROM pg_index i
+    JOIN pg_class c ON c.oid = i.indexrelid
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE n.nspname = '_silver-transacional'
+      AND c.relname = %s
+"""
+
+# mantém a linha mais recente (maior id_silver) de cada bronze_id repetido
+DEDUP_BRONZE_ID_SQL = f"""
+    DELETE FROM {SILVER_TABLE} a
+    USING {SILVER_TABLE} b
+    WHERE a.bronze_id = b.bronze_id
+      AND a.id_silver < b.id_silver
+"""
+
+
+def ensure_bronze_id_unique(cur) -> None:
+    """
+    O upsert precisa do índice único em bronze_id. Cargas antigas (sem ON
+    CONFLICT) deixaram bronze_id repetido, o que impede o índice
+    (common/schema.py só reporta): remove as duplicatas e cria o índice uma vez.
+    """
+    cur.execute(UNIQUE_INDEX_VALID_SQL, (UNIQUE_INDEX,))
+    row = cur.fetchone()
+    if row is not None and row[0]:
+        return
+    if row is not None:
+        cur.execute(f'DROP INDEX "_silver-transacional".{UNIQUE_INDEX}')
+
+    cur.execute(DEDUP_BRONZE_ID_SQL)
+    LOGGER.info(f"[Silver Trans Clima] {cur.rowcount} duplicata(s) de bronze_id removida(s)")
+    cur.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS {UNIQUE_INDEX} ON {SILVER_TABLE} (bronze_id)")
+
+
+def load_silver_trans_clima(since_ingested_at: datetime | None = None, heal: bool = False) -> int:
+    """
+    Bronze clima -> s_clima, idempotente (upsert por bronze_id).
+
+    - padrão: só bronze_id acima do high-water mark (_control.etl_watermark),
+      custo proporcional às linhas novas; o watermark avança após o commit.
+    - since_ingested_at: janela explícita por ingested_at (não mexe no watermark).
+    - heal=True: reprocessa a bronze inteira (upsert) e avança o watermark.
+    """
     params = {}
-    if since_ingested_at is not None:
+    use_watermark = since_ingested_at is None
+    if not use_watermark:
         where = "WHERE ingested_at > %(since)s"
         params["since"] = since_ingested_at
+    else:
+        where = "WHERE bronze_id > %(since_id)s AND bronze_id <= %(until_id)s"
+        params["since_id"] = 0 if heal else int(get_watermark(*WATERMARK_ARGS))
 
     sql_select = f"""
         SELECT
@@ -56,7 +111,7 @@ def load_silver_trans_clima(since_ingested_at: datetime | None = None) -> int:
             ingestion_batch
         FROM {BRONZE_TABLE}
         {where}
-        ORDER BY ingested_at ASC
+        ORDER BY bronze_id ASC
     """
 
     def _parse_date_any(d: str | None):
@@ -110,11 +165,20 @@ def load_silver_trans_clima(since_ingested_at: datetime | None = None) -> int:
     conn = _connect()
     try:
         with conn.cursor() as cur:
+            if use_watermark:
+                cur.execute(BRONZE_MAX_ID_SQL)
+                params["until_id"] = cur.fetchone()[0]
+                if params["until_id"] is None or params["until_id"] <= params["since_id"]:
+                    LOGGER.info("[Silver Trans Clima] Nenhuma linha nova na Bronze.")
+                    return 0
+
             cur.execute(sql_select, params)
             rows = cur.fetchall()
 
             if not rows:
                 LOGGER.info("[Silver Trans Clima] Nenhuma linha nova na Bronze.")
+                if use_watermark:
+                    set_watermark(*WATERMARK_ARGS, str(params["until_id"]))
                 return 0
 
             payload = []
@@ -173,6 +237,9 @@ def load_silver_trans_clima(since_ingested_at: datetime | None = None) -> int:
 
             if not payload:
                 LOGGER.warning("[Silver Trans Clima] Nenhuma linha válida para inserir.")
+                # linhas inválidas não voltam a ser lidas a cada execução
+                if use_watermark:
+                    set_watermark(*WATERMARK_ARGS, str(params["until_id"]))
                 return 0
 
             sql_insert = f"""
@@ -198,16 +265,33 @@ def load_silver_trans_clima(since_ingested_at: datetime | None = None) -> int:
                     uf
                 )
                 VALUES %s
-                -- Se existir UNIQUE (ex.: unique(bronze_id)), habilite:
-                -- ON CONFLICT (bronze_id) DO NOTHING
+                ON CONFLICT (bronze_id) DO UPDATE SET
+                    origem_dado = EXCLUDED.origem_dado,
+                    cidade = EXCLUDED.cidade,
+                    dt_hr_scraping = EXCLUDED.dt_hr_scraping,
+                    dt_forecast = EXCLUDED.dt_forecast,
+                    ttl_dias = EXCLUDED.ttl_dias,
+                    bloco = EXCLUDED.bloco,
+                    temp_min_c = EXCLUDED.temp_min_c,
+                    temp_max_c = EXCLUDED.temp_max_c,
+                    sensacao_termica = EXCLUDED.sensacao_termica,
+                    sensacao_termica_sombra = EXCLUDED.sensacao_termica_sombra,
+                    uv_index_max = EXCLUDED.uv_index_max,
+                    vento = EXCLUDED.vento,
+                    probabilidade_chuva = EXCLUDED.probabilidade_chuva,
+                    relato = EXCLUDED.relato,
+                    ingested_at = EXCLUDED.ingested_at,
+                    ingestion_type = EXCLUDED.ingestion_type,
+                    ingestion_batch = EXCLUDED.ingestion_batch,
+                    uf = EXCLUDED.uf
             """
 
+            ensure_bronze_id_unique(cur)
             execute_values(cur, sql_insert, payload, page_size=5000)
 
         conn.commit()
         inserted = len(payload)
-        LOGGER.info(f"[Silver Trans Clima] Inseridas {inserted} linhas.")
-        return inserted
+        LOGGER.info(f"[Silver Trans Clima] Upsert de {inserted} linhas.")
 
     except Exception:
         conn.rollback()
@@ -216,3 +300,8 @@ def load_silver_trans_clima(since_ingested_at: datetime | None = None) -> int:
     finally:
         conn.close()
 
+    # Atualiza watermark apenas após commit bem-sucedido
+    if use_watermark:
+        set_watermark(*WATERMARK_ARGS, str(params["until_id"]))
+    return inserted
+
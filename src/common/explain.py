@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+from typing import Any, Iterator
+
+from psycopg import Cursor
+
+# Captura de planos (EXPLAIN ANALYZE) e detecção de regressões no SQL do pipeline.
+#
+# EXPLAIN ANALYZE executa o statement de verdade (inclusive INSERT): quem chama
+# decide se a transação é confirmada (benchmark que alimenta a etapa seguinte)
+# ou desfeita.
+#
+# Regressões sinalizadas:
+# - Seq Scan que examina >= SEQ_SCAN_MIN_ROWS linhas em relação não esperada
+# - tempo > RUNTIME_GROWTH_LIMIT x o da última captura (mesma etapa e volume)
+# - crescimento entre volumes acima do esperado (incremental deve ficar ~constante,
+#   heal no máximo proporcional ao volume; ver scaling_flags)
+
+SEQ_SCAN_MIN_ROWS = 10_000
+RUNTIME_GROWTH_LIMIT = 1.5
+RUNTIME_MIN_DIFF_MS = 50.0
+INCREMENTAL_SCALING_LIMIT = 3.0
+HEAL_SCALING_FACTOR = 2.0
+
+PLAN_TABLE_DDL = """
+create table if not exists _control.sql_bench_plan (
+    id           bigserial   primary key,
+    run_id       text        not null,
+    executed_at  timestamptz not null default now(),
+    volume       bigint      not null,
+    stage        text        not null,
+    execution_ms numeric     not null,
+    planning_ms  numeric     not null,
+    shared_hit   bigint,
+    shared_read  bigint,
+    plan         jsonb       not null,
+    flags        text[]      not null default '{}'
+);
+
+create index if not exists ix_sql_bench_plan_stage_volume
+    on _control.sql_bench_plan (stage, volume, executed_at desc);
+"""
+
+INSERT_PLAN_SQL = """
+insert into _control.sql_bench_plan (
+    run_id, volume, stage, execution_ms, planning_ms, shared_hit, shared_read, plan, flags
+)
+values (%s, %s, %s, %s, %s, %s, %s, %s::jsonb, %s);
+"""
+
+PREVIOUS_PLAN_SQL = """
+select execution_ms
+from _control.sql_bench_plan
+where stage = %s and volume = %s and run_id <> %s
+order by executed_at desc
+limit 1;
+"""
+
+
+@dataclass
+class PlanCapture:
+    stage: str
+    volume: int
+    execution_ms: float
+    planning_ms: float
+    shared_hit: int | None
+    shared_read: int | None
+    plan: dict[str, Any]
+    flags: list[str] = field(default_factory=list)
+
+
+def explain_analyze(cur: Cursor, stmt: str, params: dict[str, Any] | None = None) -> dict[str, Any]:
+    """
+    Executa stmt sob EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) e devolve o
+    objeto de topo do plano (com "Plan", "Planning Time", "Execution Time").
+    """
+    cur.execute("explain (analyze, buffers, format json)\n" + stmt.strip().rstrip(";"), params)
+    result = cur.fetchone()[0]
+    if isinstance(result, str):
+        result = json.loads(result)
+    return result[0]
+
+
+def iter_nodes(node: dict[str, Any]) -> Iterator[dict[str, Any]]:
+    yield node
+    for child in node.get("Plans", []):
+        yield from iter_nodes(child)
+
+
+def seq_scans(plan: dict[str, Any], min_rows: int = SEQ_SCAN_MIN_ROWS) -> list[tuple[str, int]]:
+    """
+    Seq Scans que examinaram pelo menos min_rows linhas
+    (retornadas + removidas pelo filtro, vezes o número de loops).
+    """
+    found = []
+    for node in iter_nodes(plan["Plan"]):
+        if node.get("Node Type") != "Seq Scan":
+            continue
+        loops = node.get("Actual Loops", 1) or 1
+        examined = (node.get("Actual Rows", 0) + node.get("Rows Removed by Filter", 0)) * loops
+        if examined >= min_rows:
+            relation = f'{node.get("Schema", "")}.{node.get("Relation Name", "")}'.lstrip(".")
+            found.append((relation, int(examined)))
+    return found
+
+
+def capture(
+    cur: Cursor,
+    stage: str,
+    volume: int,
+    stmt: str,
+    params: dict[str, Any] | None = None,
+    allow_seq_scan: tuple[str, ...] = (),
+) -> PlanCapture:
+    """
+    Roda a etapa com EXPLAIN ANALYZE e sinaliza Seq Scans em relações que não
+    estão em allow_seq_scan (nomes schema.tabela, sem aspas).
+    """
+    result = explain_analyze(cur, stmt, params)
+    top = result["Plan"]
+    cap = PlanCapture(
+        stage=stage,
+        volume=volume,
+        execution_ms=float(result.get("Execution Time", 0.0)),
+        planning_ms=float(result.get("Planning Time", 0.0)),
+        shared_hit=top.get("Shared Hit Blocks"),
+        shared_read=top.get("Shared Read Blocks"),
+        plan=result,
+    )
+    for relation, examined in seq_scans(result):
+        if relation not in allow_seq_scan:
+            cap.flags.append(f"seq scan em {relation} ({examined} linhas)")
+    return cap
+
+
+def compare_previous(cur: Cursor, cap: PlanCapture, run_id: str) -> None:
+    """
+    Compara com a última captura gravada (mesma etapa e volume) de outra execução.
+    """
+    cur.execute(PREVIOUS_PLAN_SQL, (cap.stage, cap.volume, run_id))
+    row = cur.fetchone()
+    if row is None:
+        return
+    previous = float(row[0])
+    if cap.execution_ms > previous * RUNTIME_GROWTH_LIMIT and cap.execution_ms - previous > RUNTIME_MIN_DIFF_MS:
+        cap.flags.append(f"tempo {cap.execution_ms:.1f} ms vs {previous:.1f} ms na execução anterior")
+
+
+def store_capture(cur: Cursor, cap: PlanCapture, run_id: str) -> None:
+    cur.execute(
+        INSERT_PLAN_SQL,
+        (
+            run_id,
+            cap.volume,
+            cap.stage,
+            cap.execution_ms,
+            cap.planning_ms,
+            cap.shared_hit,
+            cap.shared_read,
+            json.dumps(cap.plan),
+            cap.flags,
+        ),
+    )
+
+
+def scaling_flags(captures: list[PlanCapture], incremental: bool) -> list[str]:
+    """
+    Crescimento do tempo de uma etapa entre o menor e o maior volume.
+    - incremental: delta de tamanho fixo => tempo deve ficar ~constante
+    - heal: tempo no máximo ~proporcional ao volume
+    """
+    if len(captures) < 2:
+        return []
+    ordered = sorted(captures, key=lambda c: c.volume)
+    small, large = ordered[0], ordered[-1]
+    if small.execution_ms <= 0 or large.execution_ms - small.execution_ms < RUNTIME_MIN_DIFF_MS:
+        return []
+
+    growth = large.execution_ms / small.execution_ms
+    limit = INCREMENTAL_SCALING_LIMIT if incremental else HEAL_SCALING_FACTOR * large.volume / small.volume
+    if growth > limit:
+        return [
+            f"{large.stage}: tempo x{growth:.1f} de {small.volume} para {large.volume} linhas "
+            f"(limite x{limit:.1f})"
+        ]
+    return []
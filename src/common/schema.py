@@ -0,0 +1,246 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import psycopg
+from psycopg import Connection, sql
+from psycopg import connect as pg_connect
+from psycopg.rows import tuple_row
+
+from common.settings import settings
+
+# Declaração versionada das tabelas e índices que o SQL incremental assume.
+#
+# As tabelas bronze/silver/gold são criadas fora do repositório; aqui ficam as
+# chaves únicas e os índices de apoio dos anti-joins (NOT EXISTS), das janelas
+# de watermark (extracted_at / bronze_extracted_at / ingested_at) e dos filtros
+# por dia (dt_entrada). apply_schema() roda no início do cron:
+# - tabela declarada ausente      => reportada (não é criada aqui)
+# - índice equivalente já existe  => nada a fazer (qualquer nome, mesmas colunas à esquerda)
+# - índice faltando               => create index concurrently if not exists
+# - falha (ex.: duplicatas ao criar unique) => reportada; o índice inválido é removido
+#
+# Ao alterar as declarações, incremente SCHEMA_VERSION.
+# As tabelas criadas pelo próprio código (agregados, HLL, ocupação, snapshot do
+# de/para, layout da gold) continuam com o DDL nos respectivos módulos.
+
+SCHEMA_VERSION = 1
+
+
+@dataclass(frozen=True)
+class TableSpec:
+    schema: str
+    name: str
+
+    @property
+    def qualified(self) -> str:
+        return f'"{self.schema}".{self.name}'
+
+
+@dataclass(frozen=True)
+class IndexSpec:
+    table: TableSpec
+    name: str
+    columns: tuple[str, ...]
+    unique: bool = False
+
+
+BRONZE_LIMBER = TableSpec("_bronze", "limber_acessos_raw")
+BRONZE_QUALITY = TableSpec("_bronze", "quality_acessos_raw")
+BRONZE_CLIMA = TableSpec("_bronze", "scraping_clima_raw")
+S_LIMBER = TableSpec("_silver-transacional", "s_limber_acesso")
+S_QUALITY = TableSpec("_silver-transacional", "s_quality_acesso")
+S_CLIMA = TableSpec("_silver-transacional", "s_clima")
+DEPARA_LIMBER = TableSpec("_silver-contexto", "dim_depara_tipo_publico_limber")
+DEPARA_QUALITY = TableSpec("_silver-contexto", "dim_depara_tipo_publico_quality")
+FATO_LIMBER = TableSpec("_silver-contexto", "fato_acesso_limber")
+FATO_QUALITY = TableSpec("_silver-contexto", "fato_acesso_quality")
+FATO_CLIMA_CONTEXTO = TableSpec("_silver-contexto", "fato_clima_contexto")
+GOLD_FATO_ACESSOS = TableSpec("_gold", "fato_acessos")
+GOLD_FATO_CLIMA = TableSpec("_gold", "fato_clima")
+ETL_WATERMARK = TableSpec("_control", "etl_watermark")
+
+TABLES: tuple[TableSpec, ...] = (
+    BRONZE_LIMBER,
+    BRONZE_QUALITY,
+    BRONZE_CLIMA,
+    S_LIMBER,
+    S_QUALITY,
+    S_CLIMA,
+    DEPARA_LIMBER,
+    DEPARA_QUALITY,
+    FATO_LIMBER,
+    FATO_QUALITY,
+    FATO_CLIMA_CONTEXTO,
+    GOLD_FATO_ACESSOS,
+    GOLD_FATO_CLIMA,
+    ETL_WATERMARK,
+)
+
+INDEXES: tuple[IndexSpec, ...] = (
+    # bronze: chave do upsert + janela do watermark da silver-trans
+    IndexSpec(BRONZE_LIMBER, "ux_limber_acessos_raw_nrvoucher", ("nrvoucher",), unique=True),
+    IndexSpec(BRONZE_LIMBER, "ix_limber_acessos_raw_extracted_at", ("extracted_at",)),
+    IndexSpec(BRONZE_QUALITY, "ux_quality_acessos_raw_idacesso", ("idacesso",), unique=True),
+    IndexSpec(BRONZE_QUALITY, "ix_quality_acessos_raw_extracted_at", ("extracted_at",)),
+    IndexSpec(BRONZE_CLIMA, "ix_scraping_clima_raw_ingested_at", ("ingested_at",)),
+    # silver-trans: anti-join bronze -> silver + janela do contexto
+    IndexSpec(S_LIMBER, "ux_s_limber_acesso_id_acesso", ("id_acesso",), unique=True),
+    IndexSpec(S_LIMBER, "ix_s_limber_acesso_bronze_extracted_at", ("bronze_extracted_at",)),
+    IndexSpec(S_QUALITY, "ux_s_quality_acesso_id_acesso", ("id_acesso",), unique=True),
+    IndexSpec(S_QUALITY, "ix_s_quality_acesso_bronze_extracted_at", ("bronze_extracted_at",)),
+    IndexSpec(S_QUALITY, "ix_s_quality_acesso_dt_entrada", ("dt_entrada",)),
+    IndexSpec(S_CLIMA, "ux_s_clima_bronze_id", ("bronze_id",), unique=True),
+    # de/para: join por tipo_ingresso
+    IndexSpec(DEPARA_LIMBER, "ix_dim_depara_tipo_publico_limber_tipo_ingresso", ("tipo_ingresso",)),
+    IndexSpec(DEPARA_QUALITY, "ix_dim_depara_tipo_publico_quality_tipo_ingresso", ("tipo_ingresso",)),
+    # contexto: anti-join silver -> contexto, janela da gold, reclassificação
+    IndexSpec(FATO_LIMBER, "ux_fato_acesso_limber_id_acesso", ("id_acesso",), unique=True),
+    IndexSpec(FATO_LIMBER, "ix_fato_acesso_limber_ingested_at", ("ingested_at",)),
+    IndexSpec(FATO_LIMBER, "ix_fato_acesso_limber_tipo_ingresso", ("tipo_ingresso",)),
+    IndexSpec(FATO_QUALITY, "ux_fato_acesso_quality_id_acesso", ("id_acesso",), unique=True),
+    IndexSpec(FATO_QUALITY, "ix_fato_acesso_quality_ingested_at", ("ingested_at",)),
+    IndexSpec(FATO_QUALITY, "ix_fato_acesso_quality_tipo_ingresso", ("tipo_ingresso",)),
+    IndexSpec(
+        FATO_CLIMA_CONTEXTO,
+        "ux_fato_clima_contexto_origem_cidade_uf_dt",
+        ("origem_dado", "cidade", "uf", "dt_forecast"),
+        unique=True,
+    ),
+    # gold: a chave única depende do layout (layout_gold_fato_acessos); aqui só o filtro por dia
+    IndexSpec(GOLD_FATO_ACESSOS, "ix_fato_acessos_dt_entrada", ("dt_entrada",)),
+    IndexSpec(GOLD_FATO_CLIMA, "ux_fato_clima_cidade_uf_dt", ("cidade", "uf", "dt_forecast"), unique=True),
+    IndexSpec(
+        ETL_WATERMARK,
+        "ux_etl_watermark_key",
+        ("source_system", "entity", "watermark_key"),
+        unique=True,
+    ),
+)
+
+SCHEMA_VERSION_DDL = """
+create table if not exists _control.schema_version (
+    version    integer     primary key,
+    applied_at timestamptz not null default now(),
+    pendencias integer     not null default 0
+);
+"""
+
+TABLE_KIND_SQL = """
+select c.relkind
+from pg_class c
+join pg_namespace n on n.oid = c.relnamespace
+where n.nspname = %s and c.relname = %s;
+"""
+
+# Índices existentes: unique?, válido?, colunas na ordem do índice
+TABLE_INDEXES_SQL = """
+select
+    ic.relname,
+    i.indisunique,
+    i.indisvalid,
+    array_agg(a.attname::text order by k.ord) as colunas
+from pg_index i
+join pg_class ic on ic.oid = i.indexrelid
+join lateral unnest(i.indkey::int2[]) with ordinality as k(attnum, ord) on true
+left join pg_attribute a on a.attrelid = i.indrelid and a.attnum = k.attnum
+where i.indrelid = %s::regclass
+  and i.indpred is null
+group by ic.relname, i.indisunique, i.indisvalid;
+"""
+
+RECORD_VERSION_SQL = """
+insert into _control.schema_version (version, applied_at, pendencias)
+values (%s, now(), %s)
+on conflict (version)
+do update set applied_at = excluded.applied_at, pendencias = excluded.pendencias;
+"""
+
+
+def _covers(spec: IndexSpec, unique: bool, valid: bool, colunas: list[str | None]) -> bool:
+    """
+    Um índice existente atende a declaração se for válido e tiver as mesmas
+    colunas à esquerda; para unique, precisa ser unique nas mesmas colunas exatas.
+    """
+    if not valid or None in colunas:
+        return False
+    if spec.unique:
+        return unique and tuple(colunas) == spec.columns
+    return tuple(colunas[: len(spec.columns)]) == spec.columns
+
+
+def _index_ident(spec: IndexSpec) -> sql.Composed:
+    return sql.Identifier(spec.table.schema, spec.name)
+
+
+def _create_index(conn: Connection, spec: IndexSpec, partitioned: bool) -> None:
+    # concurrently não é suportado em tabela particionada (cria nas partições com lock)
+    stmt = sql.SQL("create {unique}index {concurrently}if not exists {name} on {table} ({cols})").format(
+        unique=sql.SQL("unique " if spec.unique else ""),
+        concurrently=sql.SQL("" if partitioned else "concurrently "),
+        name=sql.Identifier(spec.name),
+        table=sql.Identifier(spec.table.schema, spec.table.name),
+        cols=sql.SQL(", ").join(sql.Identifier(c) for c in spec.columns),
+    )
+    try:
+        conn.execute(stmt)
+    except psycopg.Error:
+        # create index concurrently com erro deixa um índice inválido para trás
+        conn.execute(sql.SQL("drop index if exists {}").format(_index_ident(spec)))
+        raise
+
+
+def check_schema(create: bool = False) -> list[str]:
+    """
+    Confere tabelas e índices declarados. create=True cria os índices que faltam.
+    Retorna a lista de pendências (tabelas ausentes, índices faltando ou com falha).
+    """
+    pendencias: list[str] = []
+    # autocommit: create index concurrently não roda dentro de transação
+    with pg_connect(settings.pg_dsn(), row_factory=tuple_row, autocommit=True) as conn:
+        kinds: dict[TableSpec, str] = {}
+        for table in TABLES:
+            row = conn.execute(TABLE_KIND_SQL, (table.schema, table.name)).fetchone()
+            if row is None:
+                pendencias.append(f"tabela ausente: {table.qualified}")
+            else:
+                kinds[table] = row[0]
+
+        for spec in INDEXES:
+            if spec.table not in kinds:
+                continue
+
+            existentes = conn.execute(TABLE_INDEXES_SQL, (spec.table.qualified,)).fetchall()
+            if any(_covers(spec, u, v, c) for _, u, v, c in existentes):
+                continue
+
+            descricao = f"{spec.table.qualified} ({', '.join(spec.columns)})"
+            if not create:
+                pendencias.append(f"índice faltando: {descricao}")
+                continue
+            try:
+                _create_index(conn, spec, partitioned=kinds[spec.table] == "p")
+                print(f"[SCHEMA] índice criado: {spec.name} em {descricao}")
+            except psycopg.Error as exc:
+                pendencias.append(f"falha ao criar {spec.name} em {descricao}: {exc}".strip())
+
+    return pendencias
+
+
+def apply_schema() -> list[str]:
+    """
+    Aplica a versão atual do schema de forma idempotente (startup do cron)
+    e registra em _control.schema_version. Retorna as pendências restantes.
+    """
+    pendencias = check_schema(create=True)
+    for p in pendencias:
+        print(f"[SCHEMA] {p}")
+
+    with pg_connect(settings.pg_dsn(), row_factory=tuple_row) as conn:
+        with conn.cursor() as cur:
+            cur.execute(SCHEMA_VERSION_DDL)
+            cur.execute(RECORD_VERSION_SQL, (SCHEMA_VERSION, len(pendencias)))
+        conn.commit()
+
+    print(f"[SCHEMA] versão {SCHEMA_VERSION} aplicada | pendências: {len(pendencias)}")
+    return pendencias
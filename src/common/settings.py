@@ -52,10 +52,38 @@ class Settings(BaseSettings):
     quality_terminal_ids: str = Field(alias="quality_terminal_ids")
 
     force_run: bool = Field(default=False, alias="force_run")
-
-    def pg_dsn(self) -> str:
+    heal_run: bool = Field(default=False, alias="heal_run")
+    bronze_typed: bool = Field(default=False, alias="bronze_typed")
+
+    # Scraping de clima: Chromes headless simultâneos (pool)
+    clima_max_drivers: int = Field(default=3, alias="clima_max_drivers")
+    # tenta GET simples antes do Chrome (fallback automático)
+    clima_http_first: bool = Field(default=True, alias="clima_http_first")
+    # provedores no perfil lean (sem imagens/fontes/anúncios, carga eager), separados por vírgula
+    clima_lean_providers: str = Field(default="", alias="clima_lean_providers")
+    # backend de parsing do HTML: bs4 | bs4-lxml | lxml (ver bench_clima_parsers.py)
+    clima_parser_backend: str = Field(default="bs4", alias="clima_parser_backend")
+    # arquiva o HTML de cada página (zstd, dedup por sha256) para re-parse
+    clima_html_archive: bool = Field(default=True, alias="clima_html_archive")
+    # não grava na bronze previsões iguais ao último scraping da cidade (hash)
+    clima_skip_unchanged: bool = Field(default=True, alias="clima_skip_unchanged")
+    # Serviço de Chromes quentes (run_browser_service.py); 0 = sempre Chrome frio
+    clima_browser_slots: int = Field(default=0, alias="clima_browser_slots")
+    clima_browser_base_port: int = Field(default=9300, alias="clima_browser_base_port")
+    clima_browser_recycle_pages: int = Field(default=50, alias="clima_browser_recycle_pages")
+    clima_browser_state_dir: str = Field(default="/tmp/clima_browser", alias="clima_browser_state_dir")
+    clima_chrome_bin: str = Field(default="/usr/bin/chromium", alias="clima_chrome_bin")
+
+    # Arquivamento da bronze de acessos (Parquet zstd)
+    bronze_archive_dir: str = Field(default="/root/db_medallion/bronze/archive", alias="bronze_archive_dir")
+    bronze_retention_days: int = Field(default=180, alias="bronze_retention_days")
+
+    # Banco local descartável para o benchmark de SQL (mesmo host/credenciais)
+    bench_pg_db: str = Field(default="", alias="bench_pg_db")
+
+    def pg_dsn(self, dbname: str | None = None) -> str:
         return (
-            f"host={self.pg_host} port={self.pg_port} dbname={self.pg_db} "
+            f"host={self.pg_host} port={self.pg_port} dbname={dbname or self.pg_db} "
             f"user={self.pg_user} password={self.pg_password}"
         )
 
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from datetime import datetime
+
 from psycopg import connect as pg_connect
 from psycopg.rows import tuple_row
 
@@ -32,3 +34,18 @@ def set_watermark(source_system: str, entity: str, watermark_key: str, watermark
         with conn.cursor() as cur:
             cur.execute(sql, (source_system, entity, watermark_key, watermark_value))
         conn.commit()
+
+
+def get_ts_watermark(source_system: str, entity: str, watermark_key: str) -> datetime | None:
+    """
+    Lê um watermark gravado como timestamp ISO.
+    Retorna None quando ainda não existe (primeira execução).
+    """
+    value = get_watermark(source_system, entity, watermark_key)
+    if value in ("", "0"):
+        return None
+    return datetime.fromisoformat(value)
+
+
+def set_ts_watermark(source_system: str, entity: str, watermark_key: str, watermark_value: datetime) -> None:
+    set_watermark(source_system, entity, watermark_key, watermark_value.isoformat())
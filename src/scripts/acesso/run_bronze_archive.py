@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+import sys
+from datetime import date
+
+from _bootstrap import setup_sys_path
+setup_sys_path()
+
+from _bronze.acesso.archive_bronze_acessos import archive_bronze_acessos, replay_bronze_archive
+
+
+def main() -> int:
+    # uso:
+    #   run_bronze_archive.py [dias_retencao]                       (arquiva; padrão BRONZE_RETENTION_DAYS)
+    #   run_bronze_archive.py replay <tabela> <YYYY-MM-DD> <YYYY-MM-DD>
+    args = sys.argv[1:]
+    if args and args[0] == "replay":
+        if len(args) != 4:
+            print("uso: run_bronze_archive.py replay <limber_acessos_raw|quality_acessos_raw> <inicio> <fim>")
+            return 2
+        n = replay_bronze_archive(args[1], date.fromisoformat(args[2]), date.fromisoformat(args[3]))
+        print(f"[REPLAY] Linhas re-materializadas em _bronze.{args[1]}: {n}")
+        return 0
+
+    retention = int(args[0]) if args else None
+    n = archive_bronze_acessos(retention_days=retention)
+    print(f"[ARCHIVE] Linhas arquivadas e removidas da bronze: {n}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+import sys
+
+from _bootstrap import setup_sys_path
+setup_sys_path()
+
+from _bronze.acesso.layout_bronze_acessos import migrate_bronze_typed_columns, migrate_bronze_typed_landing
+
+
+def main() -> int:
+    # ADD COLUMN ... GENERATED reescreve as tabelas bronze: rodar fora do horário do cron
+    # uso: run_bronze_typed_columns.py [--landing]  (--landing: colunas regulares p/ BRONZE_TYPED)
+    if "--landing" in sys.argv[1:]:
+        migrate_bronze_typed_landing()
+    else:
+        migrate_bronze_typed_columns()
+    print("[BRONZE] Colunas tipadas e índices aplicados em _bronze.limber_acessos_raw / quality_acessos_raw")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+import sys
+from datetime import date
+
+from _bootstrap import setup_sys_path
+setup_sys_path()
+
+from _gold.acesso.load_gold_agg_acessos import reconstruir_gold_agg_acessos
+
+
+def main() -> int:
+    # uso: run_gold_agg_acessos.py --rebuild [YYYY-MM-DD YYYY-MM-DD]  (sem datas: histórico inteiro)
+    args = sys.argv[1:]
+    if "--rebuild" not in args:
+        print(f"[GOLD][AGG] uso: {sys.argv[0]} --rebuild [inicio fim]")
+        return 1
+    datas = [date.fromisoformat(a) for a in args if a != "--rebuild"]
+    if len(datas) not in (0, 2):
+        print(f"[GOLD][AGG] uso: {sys.argv[0]} --rebuild [inicio fim]")
+        return 1
+    inicio, fim = datas or (None, None)
+
+    rebuilt = reconstruir_gold_agg_acessos(inicio, fim)
+    periodo = f"{inicio.isoformat()} -> {fim.isoformat()}" if inicio else "histórico inteiro"
+    print(f"[GOLD][AGG] Cubos recalculados ({periodo}): {rebuilt} chaves/hora")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import sys
+
 from _bootstrap import setup_sys_path
 setup_sys_path()
 
@@ -7,7 +9,9 @@ from _gold.load_gold_fato_acessos import silver_contexto_to_gold_fato_acessos
 
 
 def main() -> int:
-    inserted = silver_contexto_to_gold_fato_acessos()
+    # --heal: UNION ALL completo com anti-join (padrão: incremental por origem)
+    heal = "--heal" in sys.argv[1:]
+    inserted = silver_contexto_to_gold_fato_acessos(heal=heal)
     print(f"[GOLD] Inseridos em _gold.fato_acessos: {inserted}")
     return 0
 
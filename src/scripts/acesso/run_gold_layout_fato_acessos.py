@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import sys
+
+from _bootstrap import setup_sys_path
+setup_sys_path()
+
+from datetime import date
+
+from _gold.acesso.layout_gold_fato_acessos import (
+    LAYOUT_COPY,
+    LAYOUT_MONTHLY,
+    LAYOUT_PARTITIONED,
+    detach_month_partition,
+    migrate_gold_fato_acessos_to_copy,
+    migrate_gold_fato_acessos_to_monthly,
+    migrate_gold_fato_acessos_to_partitioned,
+)
+
+
+def main() -> int:
+    # uso: run_gold_layout_fato_acessos.py partitioned|copy|monthly
+    #      run_gold_layout_fato_acessos.py detach YYYY-MM
+    layout = sys.argv[1] if len(sys.argv) > 1 else ""
+    if layout == LAYOUT_PARTITIONED:
+        migrate_gold_fato_acessos_to_partitioned()
+    elif layout == LAYOUT_COPY:
+        migrate_gold_fato_acessos_to_copy()
+    elif layout == LAYOUT_MONTHLY:
+        migrate_gold_fato_acessos_to_monthly()
+    elif layout == "detach" and len(sys.argv) > 2:
+        detach_month_partition(date.fromisoformat(f"{sys.argv[2]}-01"))
+    else:
+        print(
+            f"[GOLD][LAYOUT] uso: {sys.argv[0]} "
+            f"{LAYOUT_PARTITIONED}|{LAYOUT_COPY}|{LAYOUT_MONTHLY}|detach YYYY-MM"
+        )
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+import sys
+from datetime import date
+
+from _bootstrap import setup_sys_path
+setup_sys_path()
+
+from _gold.acesso.load_gold_ocupacao import load_gold_ocupacao
+
+
+def main() -> int:
+    # uso: run_gold_ocupacao.py [YYYY-MM-DD ...]  (sem datas: dias tocados desde o watermark)
+    dias = [date.fromisoformat(a) for a in sys.argv[1:]] or None
+    gravadas = load_gold_ocupacao(dias=dias)
+    print(f"[GOLD][OCUPACAO] Linhas gravadas em _gold.ocupacao_minuto: {gravadas}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import sys
+from datetime import date
+
+from _bootstrap import setup_sys_path
+setup_sys_path()
+
+from _gold.acesso.load_gold_hll_visitantes import contar_visitantes_distintos, reconstruir_gold_hll_visitantes
+
+
+def backfill(datas: list[str]) -> int:
+    # --backfill sem datas: só os dias sem sketch; com inicio fim: refaz o intervalo
+    if len(datas) not in (0, 2):
+        print(f"[GOLD][HLL] uso: {sys.argv[0]} --backfill [inicio fim]")
+        return 1
+    inicio, fim = [date.fromisoformat(d) for d in datas] or (None, None)
+    gravados = reconstruir_gold_hll_visitantes(inicio, fim)
+    print(f"[GOLD][HLL] Sketches gravados no backfill: {gravados}")
+    return 0
+
+
+def main() -> int:
+    # uso: run_gold_visitantes_distintos.py YYYY-MM-DD YYYY-MM-DD [LIMBER|QUALITY]
+    #      run_gold_visitantes_distintos.py --backfill [YYYY-MM-DD YYYY-MM-DD]
+    if "--backfill" in sys.argv[1:]:
+        return backfill([a for a in sys.argv[1:] if a != "--backfill"])
+    if len(sys.argv) < 3:
+        print(f"[GOLD][HLL] uso: {sys.argv[0]} inicio fim [origem]")
+        return 1
+    inicio = date.fromisoformat(sys.argv[1])
+    fim = date.fromisoformat(sys.argv[2])
+    origem = sys.argv[3] if len(sys.argv) > 3 else None
+
+    total = contar_visitantes_distintos(inicio, fim, origem=origem)
+    print(f"[GOLD][HLL] Visitantes distintos {inicio.isoformat()} -> {fim.isoformat()} ({origem or 'todas'}): ~{total}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,16 @@
+from __future__ import annotations
+
+from _bootstrap import setup_sys_path
+setup_sys_path()
+
+from _silver.acesso.load_reclass_tipo_publico import reclassificar_tipo_publico
+
+
+def main() -> int:
+    total = reclassificar_tipo_publico()
+    print(f"[RECLASS] tipo_ingresso reclassificados: {total}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
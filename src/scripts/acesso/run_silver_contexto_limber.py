@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import sys
+
 from _bootstrap import setup_sys_path
 
 setup_sys_path()
@@ -7,7 +9,9 @@ setup_sys_path()
 from _silver.limber.load_silver_contexto_limber import silver_trans_to_silver_contexto_fato_limber
 
 def main() -> int:
-    inserted = silver_trans_to_silver_contexto_fato_limber(source_file="firebird:limber")
+    # --heal: reconciliação completa silver-trans x fato (padrão: incremental por watermark)
+    heal = "--heal" in sys.argv[1:]
+    inserted = silver_trans_to_silver_contexto_fato_limber(source_file="firebird:limber", heal=heal)
     print(f"[SILVER-CONTEXTO][LIMBER] Inseridos em fato_acesso_limber: {inserted}")
     return 0
 
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import sys
+
 from _bootstrap import setup_sys_path
 setup_sys_path()
 
@@ -9,7 +11,9 @@ from _silver.quality.load_silver_contexto_quality import (
 
 
 def main() -> int:
-    inserted = silver_trans_to_silver_contexto_fato_quality(source_file="sqlserver:quality")
+    # --heal: reconciliação completa silver-trans x fato (padrão: incremental por watermark)
+    heal = "--heal" in sys.argv[1:]
+    inserted = silver_trans_to_silver_contexto_fato_quality(source_file="sqlserver:quality", heal=heal)
     print(f"[SILVER-CONTEXTO][QUALITY] Inseridos em fato_acesso_quality: {inserted}")
     return 0
 
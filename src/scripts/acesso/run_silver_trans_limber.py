@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import sys
+
 from _bootstrap import setup_sys_path
 
 setup_sys_path()
@@ -8,7 +10,9 @@ from _silver.limber.load_silver_trans_limber import bronze_to_silver_trans_limbe
 
 
 def main() -> int:
-    inserted = bronze_to_silver_trans_limber()
+    # --heal: anti-join completo bronze x silver (padrão: incremental por watermark)
+    heal = "--heal" in sys.argv[1:]
+    inserted = bronze_to_silver_trans_limber(heal=heal)
     print(f"[SILVER-TRANS][LIMBER] Inseridos em s_limber_acesso: {inserted}")
     return 0
 
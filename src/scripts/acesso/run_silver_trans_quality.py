@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import sys
+
 from _bootstrap import setup_sys_path
 setup_sys_path()
 
@@ -7,7 +9,9 @@ from _silver.quality.load_silver_trans_quality import bronze_to_silver_trans_qua
 
 
 def main() -> int:
-    inserted = bronze_to_silver_trans_quality()
+    # --heal: anti-join completo bronze x silver (padrão: incremental por watermark)
+    heal = "--heal" in sys.argv[1:]
+    inserted = bronze_to_silver_trans_quality(heal=heal)
     print(f"[SILVER-TRANS][QUALITY] Inseridos em s_quality_acesso: {inserted}")
     return 0
 
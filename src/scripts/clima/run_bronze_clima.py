@@ -1,10 +1,8 @@
 import logging
 import sys
 
-from src._bronze.clima.accuweather.extract_accuweather import extract_accuweather
+from src._bronze.clima.extract_clima import extract_clima
 from src._bronze.clima.accuweather.load_accuweather import load_accuweather
-
-from src._bronze.clima.climatempo.extract_climatempo import extract_climatempo
 from src._bronze.clima.climatempo.load_climatempo import load_climatempo
 
 
@@ -19,23 +17,24 @@ def main() -> int:
 
     exit_code = 0
 
-    # AccuWeather
+    # Extração concorrente (AccuWeather + Climatempo no mesmo pool de Chromes)
+    rows_by_provider: dict[str, list[dict]] = {}
     try:
-        rows = extract_accuweather()
-        inserted = load_accuweather(rows)
-        logging.info(f"[Clima][Bronze] AccuWeather finalizado ({inserted} linhas)")
+        rows_by_provider, falhas = extract_clima()
+        if falhas:
+            logging.warning(f"[Clima][Bronze] Provedores sem dados: {', '.join(falhas)}")
+            exit_code = 1
     except Exception:
-        logging.exception("[Clima][Bronze] AccuWeather falhou")
+        logging.exception("[Clima][Bronze] Extração falhou")
         exit_code = 1
 
-    # Climatempo
-    try:
-        rows = extract_climatempo()
-        inserted = load_climatempo(rows)
-        logging.info(f"[Clima][Bronze] Climatempo finalizado ({inserted} linhas)")
-    except Exception:
-        logging.exception("[Clima][Bronze] Climatempo falhou")
-        exit_code = 1
+    for provider, loader in (("AccuWeather", load_accuweather), ("Climatempo", load_climatempo)):
+        try:
+            inserted = loader(rows_by_provider.get(provider, []))
+            logging.info(f"[Clima][Bronze] {provider} finalizado ({inserted} linhas)")
+        except Exception:
+            logging.exception(f"[Clima][Bronze] {provider} falhou")
+            exit_code = 1
 
     if exit_code == 0:
         logging.info("[Clima][Bronze] Job finalizado com sucesso")
@@ -0,0 +1,24 @@
+import logging
+import sys
+
+from src._bronze.clima.browser_service import serve_forever
+
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+)
+
+
+def main() -> int:
+    # processo longo (systemd/supervisor): mantém os Chromes quentes do scraping de clima
+    try:
+        serve_forever()
+    except Exception:
+        logging.exception("[Clima][Browser] Serviço falhou")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
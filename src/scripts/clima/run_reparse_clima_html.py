@@ -0,0 +1,59 @@
+import argparse
+import logging
+import sys
+from datetime import date
+
+from src._bronze.clima.html_archive import iter_snapshots, reparse_html_archive
+from src._bronze.clima.accuweather.load_accuweather import load_accuweather
+from src._bronze.clima.climatempo.load_climatempo import load_climatempo
+from src._bronze.clima.fixtures import FIXTURES_DIR, fixture_path
+
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+)
+
+LOADERS = {"AccuWeather": load_accuweather, "Climatempo": load_climatempo}
+
+
+def _args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Re-parse do HTML arquivado do scraping de clima")
+    parser.add_argument("inicio", type=date.fromisoformat, help="YYYY-MM-DD (dia em app_tz)")
+    parser.add_argument("fim", type=date.fromisoformat, help="YYYY-MM-DD (inclusive)")
+    parser.add_argument("--provedor", choices=sorted(LOADERS), default=None)
+    parser.add_argument("--backend", default=None, help="bs4 | bs4-lxml | lxml (padrão: CLIMA_PARSER_BACKEND)")
+    parser.add_argument("--load", action="store_true", help="grava as linhas na bronze (ingestion_type=reparse)")
+    parser.add_argument("--fixtures", action="store_true", help="exporta o HTML mais recente por cidade como fixture")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = _args()
+
+    if args.fixtures:
+        FIXTURES_DIR.mkdir(parents=True, exist_ok=True)
+        ultimos: dict[tuple[str, str], str] = {}
+        for origem, cidade, _, html in iter_snapshots(args.inicio, args.fim, args.provedor):
+            ultimos[(origem, cidade)] = html  # ordenado por scraped_at: fica o último
+        for (origem, cidade), html in ultimos.items():
+            path = fixture_path(origem, cidade)
+            path.write_text(html, encoding="utf-8")
+            logging.info(f"[Clima][Reparse] fixture {path.name}")
+        return 0
+
+    rows_by_provider = reparse_html_archive(args.inicio, args.fim, args.provedor, args.backend)
+    exit_code = 0
+    for origem, rows in rows_by_provider.items():
+        logging.info(f"[Clima][Reparse] {origem}: {len(rows)} linhas")
+        if args.load:
+            try:
+                LOADERS[origem](rows, ingestion_type="reparse")
+            except Exception:
+                logging.exception(f"[Clima][Reparse] {origem}: falha na carga")
+                exit_code = 1
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,25 +2,33 @@ import logging
 import sys
 from datetime import datetime, UTC, timedelta
 
-from src._silver.clima.load_silver_trans_clima import load_silver_trans_clima
+from src._bootstrap import setup_sys_path
+
+# src/ no sys.path: o watermark (src.common.watermark) importa common.settings
+setup_sys_path()
+
+from src._silver.clima.load_silver_trans_clima import load_silver_trans_clima  # noqa: E402
 
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s - %(levelname)s - %(message)s",
 )
 
-# Estratégia simples (sem depender do seu watermark):
-# carrega últimas 48h por segurança, evitando perder algo por delay.
-# Depois a gente pluga watermark oficial do seu common/watermark.py.
-DEFAULT_LOOKBACK_HOURS = 48
+# Incremental pelo watermark de bronze_id (_control.etl_watermark).
+# --heal reprocessa a bronze inteira; --horas N usa uma janela explícita por
+# ingested_at (não mexe no watermark).
 
 
 def main() -> int:
     logging.info("[Clima][Silver Trans] Início do job")
 
+    args = sys.argv[1:]
     try:
-        since = datetime.now(UTC) - timedelta(hours=DEFAULT_LOOKBACK_HOURS)
-        inserted = load_silver_trans_clima(since_ingested_at=since)
+        if "--horas" in args:
+            horas = int(args[args.index("--horas") + 1])
+            inserted = load_silver_trans_clima(since_ingested_at=datetime.now(UTC) - timedelta(hours=horas))
+        else:
+            inserted = load_silver_trans_clima(heal="--heal" in args)
         logging.info(f"[Clima][Silver Trans] Inseridas {inserted} linhas")
         logging.info("[Clima][Silver Trans] Job finalizado com sucesso")
         return 0
@@ -9,6 +9,7 @@ from src._bootstrap import setup_sys_path
 setup_sys_path() 
 
 from common.settings import settings  # noqa: E402
+from common.schema import apply_schema  # noqa: E402
 
 # LIMBER
 from _bronze.limber.extract_limber import extract_limber_snapshot  # noqa: E402
@@ -26,6 +27,8 @@ from _silver.quality.load_silver_contexto_quality import (  # noqa: E402
     silver_trans_to_silver_contexto_fato_quality,
 )
 from _gold.load_gold_fato_acessos import silver_contexto_to_gold_fato_acessos  # noqa: E402
+from _gold.acesso.load_gold_ocupacao import load_gold_ocupacao  # noqa: E402
+from _silver.acesso.load_reclass_tipo_publico import reclassificar_tipo_publico  # noqa: E402
 
 from psycopg import connect as pg_connect  # noqa: E402
 
@@ -80,7 +83,18 @@ def should_run_clima(dt_local: datetime) -> bool:
     return 0 <= dt_local.minute <= CLIMA_MINUTE_TOLERANCE
 
 
-def run_clima_pipeline() -> None:
+# Heal do CLIMA (silver trans: upsert da bronze inteira por bronze_id) na
+# primeira execução do dia; o heal geral (07:00) não coincide com 08/17.
+CLIMA_HEAL_HOURS_LOCAL = {min(CLIMA_RUN_HOURS_LOCAL)}
+
+
+def should_run_clima_heal(dt_local: datetime) -> bool:
+    if settings.heal_run:
+        return True
+    return dt_local.hour in CLIMA_HEAL_HOURS_LOCAL
+
+
+def run_clima_pipeline(heal: bool = False) -> None:
     """
     Pipeline CLIMA integrado, com imports lazy para não impactar LIMBER/QUALITY
     quando CLIMA não for rodar.
@@ -89,9 +103,8 @@ def run_clima_pipeline() -> None:
     print("[CLIMA] Início")
 
     # Imports lazy (só carrega módulos Selenium/BS4 quando necessário)
-    from _bronze.clima.accuweather.extract_accuweather import extract_accuweather
+    from _bronze.clima.extract_clima import extract_clima
     from _bronze.clima.accuweather.load_accuweather import load_accuweather
-    from _bronze.clima.climatempo.extract_climatempo import extract_climatempo
     from _bronze.clima.climatempo.load_climatempo import load_climatempo
 
     from _silver.clima.load_silver_trans_clima import load_silver_trans_clima
@@ -101,27 +114,31 @@ def run_clima_pipeline() -> None:
 
     clima_ok = True
 
-    # Bronze AccuWeather
-    try:
-        rows = extract_accuweather()
-        inserted = load_accuweather(rows)
-        print(f"[CLIMA][Bronze] AccuWeather: +{inserted}")
-    except Exception as exc:
-        clima_ok = False
-        log_exception("CLIMA-BRONZE-ACCU", exc)
-
-    # Bronze Climatempo
+    # Bronze: AccuWeather + Climatempo em paralelo (pool de Chromes)
+    rows_by_provider: dict[str, list[dict]] = {}
     try:
-        rows = extract_climatempo()
-        inserted = load_climatempo(rows)
-        print(f"[CLIMA][Bronze] Climatempo: +{inserted}")
+        rows_by_provider, falhas = extract_clima()
+        if falhas:
+            clima_ok = False
+            print(f"[CLIMA][Bronze] Provedores sem nenhuma cidade extraída: {', '.join(falhas)}")
     except Exception as exc:
         clima_ok = False
-        log_exception("CLIMA-BRONZE-CLIMA", exc)
-
-    # Silver trans/contexto (auto-healing)
+        log_exception("CLIMA-BRONZE-EXTRACT", exc)
+
+    for provider, loader, tag in (
+        ("AccuWeather", load_accuweather, "CLIMA-BRONZE-ACCU"),
+        ("Climatempo", load_climatempo, "CLIMA-BRONZE-CLIMA"),
+    ):
+        try:
+            inserted = loader(rows_by_provider.get(provider, []))
+            print(f"[CLIMA][Bronze] {provider}: +{inserted}")
+        except Exception as exc:
+            clima_ok = False
+            log_exception(tag, exc)
+
+    # Silver trans: incremental por bronze_id (watermark); heal reprocessa a bronze inteira (upsert)
     try:
-        inserted_trans = load_silver_trans_clima(since_ingested_at=None)
+        inserted_trans = load_silver_trans_clima(heal=heal)
         print(f"[CLIMA][Silver-Trans] +{inserted_trans}")
     except Exception as exc:
         clima_ok = False
@@ -150,38 +167,63 @@ def run_clima_pipeline() -> None:
 
 
 # -------------------------
-# LIMBER / QUALITY (inalterados)
+# HEAL: anti-join completo 1x por dia
 # -------------------------
-def run_limber_pipeline(today: date) -> None:
-    print(f"[LIMBER] Início (dia={today.isoformat()})")
+HEAL_RUN_HOURS_LOCAL = {7}
+HEAL_MINUTE_TOLERANCE = 10
+
+
+def should_run_heal(dt_local: datetime) -> bool:
+    """
+    Nos demais ticks as cargas são incrementais (high-water mark).
+    O modo heal (anti-join completo) roda na primeira execução do dia (07:00 SP),
+    ou quando heal_run=True.
+    """
+    if settings.heal_run:
+        return True
+    if dt_local.hour not in HEAL_RUN_HOURS_LOCAL:
+        return False
+    return 0 <= dt_local.minute <= HEAL_MINUTE_TOLERANCE
+
+
+# -------------------------
+# LIMBER / QUALITY
+# -------------------------
+def run_limber_pipeline(today: date, heal: bool = False) -> None:
+    print(f"[LIMBER] Início (dia={today.isoformat()}, heal={heal})")
 
     rows = extract_limber_snapshot(start_date=today, end_date=today)
     inserted_bronze = load_limber_rows(rows)
     print(f"[LIMBER] Bronze _bronze.limber_acessos_raw: +{inserted_bronze}")
 
-    inserted_trans = bronze_to_silver_trans_limber()
+    inserted_trans = bronze_to_silver_trans_limber(heal=heal)
     print(f"[LIMBER] Silver-trans s_limber_acesso: +{inserted_trans}")
 
-    inserted_ctx = silver_trans_to_silver_contexto_fato_limber(source_file="firebird:limber")
+    inserted_ctx = silver_trans_to_silver_contexto_fato_limber(source_file="firebird:limber", heal=heal)
     print(f"[LIMBER] Silver-contexto fato_acesso_limber: +{inserted_ctx}")
 
     print("[LIMBER] Fim")
 
 
-def run_quality_pipeline(today: date) -> None:
-    print(f"[QUALITY] Início (dia={today.isoformat()})")
+def run_quality_pipeline(today: date, heal: bool = False) -> None:
+    print(f"[QUALITY] Início (dia={today.isoformat()}, heal={heal})")
 
     rows = extract_quality(start_date=today, end_date=today, min_id_acesso=None)
     inserted_bronze = load_quality_rows(rows)
     print(f"[QUALITY] Bronze _bronze.quality_acessos_raw: +{inserted_bronze}")
 
-    inserted_trans = bronze_to_silver_trans_quality()
+    inserted_trans = bronze_to_silver_trans_quality(heal=heal)
     print(f"[QUALITY] Silver-trans s_quality_acesso: +{inserted_trans}")
 
-    inserted_ctx = silver_trans_to_silver_contexto_fato_quality(source_file="sqlserver:quality")
+    inserted_ctx = silver_trans_to_silver_contexto_fato_quality(source_file="sqlserver:quality", heal=heal)
     print(f"[QUALITY] Silver-contexto fato_acesso_quality: +{inserted_ctx}")
 
     # ---- métricas de validação (auditoria) ----
+    # Anti-join completo: só junto com a reconciliação diária (heal).
+    if not heal:
+        print("[QUALITY] Fim")
+        return
+
     with pg_connect(settings.pg_dsn()) as conn:
         with conn.cursor() as cur:
             cur.execute(
@@ -221,16 +263,23 @@ def main() -> int:
         return 0
 
     today = now.date()
-    print(f"[CODE3] Execução incremental (dia={today.isoformat()})")
+    heal = should_run_heal(now)
+    print(f"[CODE3] Execução incremental (dia={today.isoformat()}, heal={heal})")
 
     limber_ok = True
     quality_ok = True
     clima_ok = True
 
+    # ---- SCHEMA (índices de apoio do SQL incremental; idempotente) ----
+    try:
+        apply_schema()
+    except Exception as exc:
+        log_exception("SCHEMA", exc)
+
     # ---- CLIMA (somente 08:00 e 17:00 SP, ou force_run) ----
     try:
         if should_run_clima(now):
-            run_clima_pipeline()
+            run_clima_pipeline(heal=should_run_clima_heal(now))
         else:
             print(f"[CLIMA] Skip (agora={now.isoformat()} não está no horário 08/17).")
     except Exception as exc:
@@ -239,26 +288,42 @@ def main() -> int:
 
     # ---- LIMBER ----
     try:
-        run_limber_pipeline(today)
+        run_limber_pipeline(today, heal=heal)
     except Exception as exc:
         limber_ok = False
         log_exception("LIMBER", exc)
 
     # ---- QUALITY ----
     try:
-        run_quality_pipeline(today)
+        run_quality_pipeline(today, heal=heal)
     except Exception as exc:
         quality_ok = False
         log_exception("QUALITY", exc)
 
+    # ---- RECLASSIFICAÇÃO tipo_publico (só age quando o de/para mudou) ----
+    try:
+        reclass = reclassificar_tipo_publico()
+        if reclass:
+            print(f"[RECLASS] tipo_ingresso reclassificados: {reclass}")
+    except Exception as exc:
+        log_exception("RECLASS", exc)
+
     # ---- GOLD (auto-healing) ----
     try:
-        inserted_gold = silver_contexto_to_gold_fato_acessos()
+        inserted_gold = silver_contexto_to_gold_fato_acessos(heal=heal)
         print(f"[GOLD] Inseridos em _gold.fato_acessos: +{inserted_gold}")
     except Exception as exc:
         log_exception("GOLD", exc)
         return 2
 
+    # ---- GOLD ocupação (dias tocados pela última carga Quality) ----
+    try:
+        gravadas = load_gold_ocupacao()
+        print(f"[GOLD] _gold.ocupacao_minuto: {gravadas} linhas regravadas")
+    except Exception as exc:
+        quality_ok = False
+        log_exception("GOLD-OCUPACAO", exc)
+
     if not limber_ok or not quality_ok or not clima_ok:
         print("[CODE3] Finalizado com falhas parciais (ver logs acima).")
         return 1
@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+import sys
+
+from _bootstrap import setup_sys_path
+setup_sys_path()
+
+from common.schema import SCHEMA_VERSION, apply_schema, check_schema
+
+
+def main() -> int:
+    # uso: run_schema.py [--check]  (--check só reporta, sem criar índices)
+    if "--check" in sys.argv[1:]:
+        pendencias = check_schema(create=False)
+        for p in pendencias:
+            print(f"[SCHEMA] {p}")
+        print(f"[SCHEMA] versão {SCHEMA_VERSION} | pendências: {len(pendencias)}")
+    else:
+        pendencias = apply_schema()
+    return 1 if pendencias else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
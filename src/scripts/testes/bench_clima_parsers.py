@@ -0,0 +1,84 @@
+import logging
+import statistics
+import sys
+import time
+from datetime import datetime, UTC
+
+from src._bronze.clima.parser_backends import BACKENDS, DEFAULT_BACKEND, PARSERS
+from src._bronze.clima.fixtures import FIXTURES_DIR
+
+# Benchmark dos backends de parsing de clima sobre o HTML salvo (fixtures).
+#
+#   python -m src.scripts.testes.bench_clima_parsers [repeticoes]
+#
+# Para cada página e backend: mediana do tempo de parede e de CPU por página
+# (perf_counter / process_time), conferindo a saída contra o bs4 (referência).
+# O mais rápido sem divergência é o candidato para CLIMA_PARSER_BACKEND.
+#
+# Roda sobre as fixtures versionadas dos dois provedores (as mesmas de
+# check_clima_parsers); para medir páginas reais, exporte o HTML arquivado com
+# run_reparse_clima_html.py --fixtures antes.
+
+DEFAULT_REPETICOES = 20
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+)
+
+
+def _provider(path) -> str | None:
+    for provider in PARSERS:
+        if path.name.startswith(f"{provider.lower()}_"):
+            return provider
+    return None
+
+
+def bench(repeticoes: int) -> int:
+    scraped_at = datetime.now(UTC)
+    paginas = sorted(FIXTURES_DIR.glob("*.html"))
+    if not paginas:
+        logging.warning(f"[Clima][Bench] Nenhuma fixture em {FIXTURES_DIR} (checkout incompleto?)")
+        return 1
+
+    total: dict[str, float] = dict.fromkeys(BACKENDS, 0.0)
+    divergentes: set[str] = set()
+
+    print(f"{'pagina':<32} {'backend':<9} {'wall ms':>9} {'cpu ms':>9} {'linhas':>7}")
+    for path in paginas:
+        provider = _provider(path)
+        if provider is None:
+            continue
+        html = path.read_text(encoding="utf-8")
+        referencia = PARSERS[provider][DEFAULT_BACKEND](html, "bench", scraped_at)
+
+        for backend in BACKENDS:
+            parse = PARSERS[provider][backend]
+            wall, cpu = [], []
+            for _ in range(repeticoes):
+                w0, c0 = time.perf_counter(), time.process_time()
+                rows = parse(html, "bench", scraped_at)
+                wall.append(time.perf_counter() - w0)
+                cpu.append(time.process_time() - c0)
+
+            ok = rows == referencia
+            if not ok:
+                divergentes.add(backend)
+            wall_ms = statistics.median(wall) * 1000
+            total[backend] += wall_ms
+            print(
+                f"{path.name:<32} {backend:<9} {wall_ms:>9.1f} {statistics.median(cpu) * 1000:>9.1f} "
+                f"{len(rows):>7}{'' if ok else '  DIVERGENTE'}"
+            )
+
+    candidatos = [b for b in BACKENDS if b not in divergentes]
+    melhor = min(candidatos, key=total.__getitem__)
+    print()
+    for backend in BACKENDS:
+        print(f"{backend:<9} total {total[backend]:>9.1f} ms{'  (divergente do bs4)' if backend in divergentes else ''}")
+    print(f"=> mais rápido sem divergência: CLIMA_PARSER_BACKEND={melhor}")
+    return 1 if divergentes else 0
+
+
+if __name__ == "__main__":
+    sys.exit(bench(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_REPETICOES))
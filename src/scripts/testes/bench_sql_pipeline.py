@@ -0,0 +1,294 @@
+from __future__ import annotations
+
+import sys
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from _bootstrap import setup_sys_path
+
+setup_sys_path()
+
+from psycopg import connect as pg_connect
+from psycopg.rows import tuple_row
+
+from common.explain import PLAN_TABLE_DDL, capture, compare_previous, scaling_flags, store_capture
+from common.settings import settings
+from _silver.acesso.limber.load_silver_trans_limber import (
+    BRONZE_TO_SILVER_INCREMENTAL_SQL,
+    BRONZE_TO_SILVER_SQL,
+)
+from _silver.acesso.quality.load_silver_trans_quality import (
+    BRONZE_TO_SILVER_QUALITY_INCREMENTAL_SQL,
+    BRONZE_TO_SILVER_QUALITY_SQL,
+)
+from _silver.acesso.limber.load_silver_contexto_limber import (
+    SILVER_TRANS_TO_CONTEXTO_INCREMENTAL_SQL,
+    SILVER_TRANS_TO_CONTEXTO_SQL,
+)
+from _silver.acesso.quality.load_silver_contexto_quality import (
+    SILVER_TRANS_TO_CONTEXTO_QUALITY_INCREMENTAL_SQL,
+    SILVER_TRANS_TO_CONTEXTO_QUALITY_SQL,
+)
+from _gold.acesso.load_gold_fato_acessos import (
+    DELTA_TABLE_DDL,
+    GOLD_ORIGENS,
+    SILVER_TO_GOLD_INCREMENTAL_SQL,
+    SILVER_TO_GOLD_SQL,
+)
+from _gold.clima.load_gold_clima_consolidado import GOLD_CLIMA_CONSOLIDADO_SQL
+
+# Benchmark do SQL do pipeline com EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON).
+#
+# Roda contra um banco LOCAL descartável (BENCH_PG_DB, mesmo host/credenciais,
+# já com o schema do pipeline). Para cada volume sintético:
+#   1. limpa bronze/silver/gold e semeia N acessos Limber e Quality (+ clima)
+#   2. etapas heal (anti-join completo), cada uma alimentando a seguinte
+#   3. semeia um delta fixo (DELTA_ROWS) e roda as etapas incrementais
+# Planos e tempos vão para _control.sql_bench_plan do banco de bench;
+# regressões (seq scan inesperado, tempo acima da execução anterior,
+# crescimento entre volumes) são listadas ao final.
+#
+# uso: bench_sql_pipeline.py [volume ...]   (padrão: 10000 100000 1000000)
+
+DEFAULT_VOLUMES = (10_000, 100_000, 1_000_000)
+DELTA_ROWS = 1_000
+
+TRUNCATE_SQL = """
+truncate table
+    _bronze.limber_acessos_raw,
+    _bronze.quality_acessos_raw,
+    "_silver-transacional".s_limber_acesso,
+    "_silver-transacional".s_quality_acesso,
+    "_silver-contexto".fato_acesso_limber,
+    "_silver-contexto".fato_acesso_quality,
+    "_silver-contexto".fato_clima_contexto,
+    _gold.fato_acessos,
+    _gold.fato_clima;
+"""
+
+SEED_LIMBER_SQL = """
+insert into _bronze.limber_acessos_raw (nrvoucher, extracted_at, payload)
+select
+    %(offset)s + g,
+    %(t0)s::timestamptz + g * interval '1 millisecond',
+    jsonb_build_object(
+        'DATA_ACESSO', (%(t0)s::timestamp - (g %% 365) * interval '1 day')::date,
+        'DT_HR_VOUCHER', %(t0)s::timestamp - (g %% 365) * interval '1 day' - interval '2 hours',
+        'QRCODE', 'QR' || (%(offset)s + g),
+        'DTBAIXA', %(t0)s::timestamp - (g %% 365) * interval '1 day' + (g %% 600) * interval '1 minute',
+        'PONTO_VENDA', 'PDV ' || (g %% 12),
+        'CODIGO_GRUPO', (g %% 20)::text,
+        'NOME_GRUPO', 'GRUPO ' || (g %% 20),
+        'TIPO_BILHETE', 'T' || (g %% 4),
+        'CODIGO_BILHETE', (g %% 40)::text,
+        'BILHETE', 'BILHETE ' || (g %% 40),
+        'CATEGORIA', 'CAT ' || (g %% 5),
+        'TIPO', 'TIPO ' || (g %% 3),
+        'QTDE', '1',
+        'VLR_UNITARIO', ((g %% 200) + 0.5)::text
+    )
+from generate_series(1, %(n)s) g;
+"""
+
+SEED_QUALITY_SQL = """
+insert into _bronze.quality_acessos_raw ("idacesso", extracted_at, payload)
+select
+    %(offset)s + g,
+    %(t0)s::timestamptz + g * interval '1 millisecond',
+    jsonb_build_object(
+        'data_hora_entrada', %(t0)s::timestamp - (g %% 365) * interval '1 day' + (g %% 600) * interval '1 minute',
+        'data_hora_saida', case when g %% 10 = 0 then null
+            else %(t0)s::timestamp - (g %% 365) * interval '1 day' + ((g %% 600) + 180) * interval '1 minute' end,
+        'terminal_entrada', (g %% 12)::text,
+        'terminal_saida', (g %% 12)::text,
+        'tipo_acesso', 'ENTRADA',
+        'socio_ou_ingresso', case when g %% 7 = 0 then 'SOCIO' else 'INGRESSO' end,
+        'categoria_tipo_ingresso', case when g %% 25 = 0 then 'SEM DELIMITADOR'
+            else (g %% 40) || ' - INGRESSO ' || (g %% 40) end,
+        'numero_ingresso', case when g %% 7 = 0 then null else 'NI' || (%(offset)s + g) end,
+        'idEmpresaRelacionamento', (g %% 5000)::text,
+        'email', null,
+        'telefone', null,
+        'celular', null
+    )
+from generate_series(1, %(n)s) g;
+"""
+
+SEED_CLIMA_SQL = """
+insert into "_silver-contexto".fato_clima_contexto (
+    origem_dado, cidade, uf, dt_forecast, dt_hr_scraping, ingested_at,
+    temp_min_c, temp_max_c, sensacao_termica, sensacao_termica_sombra,
+    uv_index_max, vento, probabilidade_chuva, relato
+)
+select
+    case when g %% 2 = 0 then 'AccuWeather' else 'Climatempo' end,
+    'Cidade ' || (g / 30),
+    'SP',
+    current_date + ((g / 2) %% 15),
+    now() - (g %% 1440) * interval '1 minute',
+    now(),
+    15 + (g %% 10), 25 + (g %% 10), 26 + (g %% 10), 24 + (g %% 10),
+    (g %% 12)::text, '10 km/h', (g %% 100)::text, 'Sol entre nuvens'
+from generate_series(1, %(n)s) g
+on conflict do nothing;
+"""
+
+ANALYZE_SQL = """
+analyze _bronze.limber_acessos_raw;
+analyze _bronze.quality_acessos_raw;
+analyze "_silver-transacional".s_limber_acesso;
+analyze "_silver-transacional".s_quality_acesso;
+analyze "_silver-contexto".fato_acesso_limber;
+analyze "_silver-contexto".fato_acesso_quality;
+analyze "_silver-contexto".fato_clima_contexto;
+analyze _gold.fato_acessos;
+"""
+
+MAX_INGESTED_AT_SQL = """
+select greatest(
+    (select max(ingested_at) from "_silver-contexto".fato_acesso_limber),
+    (select max(ingested_at) from "_silver-contexto".fato_acesso_quality)
+);
+"""
+
+BRONZE_LIMBER = "_bronze.limber_acessos_raw"
+BRONZE_QUALITY = "_bronze.quality_acessos_raw"
+S_LIMBER = "_silver-transacional.s_limber_acesso"
+S_QUALITY = "_silver-transacional.s_quality_acesso"
+FATO_LIMBER = "_silver-contexto.fato_acesso_limber"
+FATO_QUALITY = "_silver-contexto.fato_acesso_quality"
+GOLD_FATO = "_gold.fato_acessos"
+FATO_CLIMA_CONTEXTO = "_silver-contexto.fato_clima_contexto"
+
+
+def _heal_stages() -> list[tuple[str, str, dict | None, tuple[str, ...]]]:
+    # (etapa, sql, params, relações em que seq scan é esperado)
+    return [
+        ("limber_trans_heal", BRONZE_TO_SILVER_SQL, None, (BRONZE_LIMBER, S_LIMBER)),
+        ("quality_trans_heal", BRONZE_TO_SILVER_QUALITY_SQL, None, (BRONZE_QUALITY, S_QUALITY)),
+        (
+            "limber_contexto_heal",
+            SILVER_TRANS_TO_CONTEXTO_SQL,
+            {"source_file": "bench"},
+            (S_LIMBER, FATO_LIMBER),
+        ),
+        (
+            "quality_contexto_heal",
+            SILVER_TRANS_TO_CONTEXTO_QUALITY_SQL,
+            {"source_file": "bench"},
+            (S_QUALITY, FATO_QUALITY),
+        ),
+        ("gold_heal", SILVER_TO_GOLD_SQL, None, (FATO_LIMBER, FATO_QUALITY, GOLD_FATO)),
+        ("clima_gold", GOLD_CLIMA_CONSOLIDADO_SQL, None, (FATO_CLIMA_CONTEXTO,)),
+    ]
+
+
+def _incremental_stages(
+    since: datetime, until: datetime, gold_since: datetime | None
+) -> list[tuple[str, str, dict | None, tuple[str, ...]]]:
+    window = {"since": since, "until": until}
+    stages = [
+        ("limber_trans_incremental", BRONZE_TO_SILVER_INCREMENTAL_SQL, window, ()),
+        ("quality_trans_incremental", BRONZE_TO_SILVER_QUALITY_INCREMENTAL_SQL, window, ()),
+        (
+            "limber_contexto_incremental",
+            SILVER_TRANS_TO_CONTEXTO_INCREMENTAL_SQL,
+            {**window, "source_file": "bench"},
+            (),
+        ),
+        (
+            "quality_contexto_incremental",
+            SILVER_TRANS_TO_CONTEXTO_QUALITY_INCREMENTAL_SQL,
+            {**window, "source_file": "bench"},
+            (),
+        ),
+    ]
+    for origem, contexto in GOLD_ORIGENS.items():
+        stages.append(
+            (
+                f"gold_incremental_{origem.lower()}",
+                SILVER_TO_GOLD_INCREMENTAL_SQL.format(contexto=contexto),
+                {"origem": origem, "since": gold_since, "until": datetime.now(timezone.utc) + timedelta(hours=1)},
+                (),
+            )
+        )
+    return stages
+
+
+def _run_stage(conn, run_id: str, volume: int, stage, captures: dict) -> None:
+    name, stmt, params, allow = stage
+    with conn.cursor() as cur:
+        # as etapas da gold gravam no delta temporário da transação
+        cur.execute(DELTA_TABLE_DDL)
+        cap = capture(cur, name, volume, stmt, params, allow_seq_scan=allow)
+        compare_previous(cur, cap, run_id)
+        store_capture(cur, cap, run_id)
+    conn.commit()
+
+    captures.setdefault(name, []).append(cap)
+    status = "OK" if not cap.flags else "; ".join(cap.flags)
+    print(f"[BENCH][{volume}] {name}: {cap.execution_ms:.1f} ms (plan {cap.planning_ms:.1f} ms) | {status}")
+
+
+def run_volume(conn, run_id: str, volume: int, captures: dict) -> None:
+    t0 = datetime.now(timezone.utc) - timedelta(days=1)
+    with conn.cursor() as cur:
+        cur.execute(TRUNCATE_SQL)
+        cur.execute(SEED_LIMBER_SQL, {"offset": 0, "t0": t0, "n": volume})
+        cur.execute(SEED_QUALITY_SQL, {"offset": 0, "t0": t0, "n": volume})
+        cur.execute(SEED_CLIMA_SQL, {"n": max(volume // 10, 1)})
+        cur.execute(ANALYZE_SQL)
+    conn.commit()
+
+    for stage in _heal_stages():
+        _run_stage(conn, run_id, volume, stage, captures)
+
+    since = t0 + volume * timedelta(milliseconds=1)
+    t1 = since + timedelta(minutes=5)
+    with conn.cursor() as cur:
+        cur.execute(MAX_INGESTED_AT_SQL)
+        gold_since = cur.fetchone()[0]
+        cur.execute(SEED_LIMBER_SQL, {"offset": volume, "t0": t1, "n": DELTA_ROWS})
+        cur.execute(SEED_QUALITY_SQL, {"offset": volume, "t0": t1, "n": DELTA_ROWS})
+        cur.execute(ANALYZE_SQL)
+    conn.commit()
+
+    until = t1 + DELTA_ROWS * timedelta(milliseconds=1)
+    for stage in _incremental_stages(since, until, gold_since):
+        _run_stage(conn, run_id, volume, stage, captures)
+
+
+def main() -> int:
+    if not settings.bench_pg_db or settings.bench_pg_db == settings.pg_db:
+        print("[BENCH] defina BENCH_PG_DB com um banco local descartável (diferente de PG_DB).")
+        return 2
+
+    volumes = [int(a) for a in sys.argv[1:]] or list(DEFAULT_VOLUMES)
+    run_id = uuid.uuid4().hex
+    captures: dict = {}
+
+    with pg_connect(settings.pg_dsn(settings.bench_pg_db), row_factory=tuple_row) as conn:
+        with conn.cursor() as cur:
+            cur.execute(PLAN_TABLE_DDL)
+        conn.commit()
+
+        for volume in volumes:
+            run_volume(conn, run_id, volume, captures)
+
+    flags = [f"{c.stage} @ {c.volume}: {f}" for caps in captures.values() for c in caps for f in c.flags]
+    for name, caps in captures.items():
+        flags.extend(scaling_flags(caps, incremental="incremental" in name))
+
+    print(f"[BENCH] run_id={run_id} | planos em _control.sql_bench_plan ({settings.bench_pg_db})")
+    if flags:
+        print("[BENCH] Regressões:")
+        for f in flags:
+            print(f"  - {f}")
+        return 1
+
+    print("[BENCH] Sem regressões.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import random
+import sys
+import time
+
+from _bootstrap import setup_sys_path
+
+setup_sys_path()
+
+from psycopg import connect as pg_connect
+from psycopg.rows import tuple_row
+
+from common.settings import settings
+from _bronze.acesso.layout_bronze_acessos import FUNCTIONS_DDL
+from _bronze.acesso.quality.categoria_tipo_ingresso import parse_categoria_tipo_ingresso, parse_categorias
+
+# Checagem + benchmark do parser Python de categoria_tipo_ingresso.
+#
+# A partir de src/scripts:
+#   python -m testes.check_categoria_tipo_ingresso            # compara com _bronze.categoria_* e mede
+#   python -m testes.check_categoria_tipo_ingresso --bench    # só mede (sem banco)
+#
+# A comparação roda as mesmas funções de _bronze (FUNCTIONS_DDL) criadas em
+# pg_temp, sobre os casos abaixo + as categorias distintas da bronze do Quality.
+
+CASOS = [
+    None,
+    "",
+    "   ",
+    "OUTROS",
+    "SEM DELIMITADOR",
+    "12 - INTEIRA",
+    "12 - INTEIRA - PROMO",
+    " 7 - MEIA ",
+    "1 2 - ESPACO NO ID",
+    "12 -INTEIRA",
+    "12- INTEIRA",
+    "A1 - LETRA NO ID",
+    "-3 - NEGATIVO",
+    "12 -  ",
+    " - SEM ID",
+    "0042 - ZEROS",
+    "12 - INFANTIL (ATÉ 12 ANOS)",
+]
+
+CATEGORIAS_BRONZE_SQL = """
+select distinct payload->>'categoria_tipo_ingresso'
+from _bronze.quality_acessos_raw
+limit %s;
+"""
+
+CASE_SQL_SQL = """
+select c, pg_temp.categoria_id_tipo_ingresso(c), pg_temp.categoria_tipo_ingresso(c)
+from unnest(%s::text[]) as c;
+"""
+
+BENCH_LINHAS = 500_000
+
+
+def comparar() -> int:
+    with pg_connect(settings.pg_dsn(), row_factory=tuple_row) as conn:
+        with conn.cursor() as cur:
+            cur.execute(FUNCTIONS_DDL.replace("_bronze.", "pg_temp."))
+            cur.execute(CATEGORIAS_BRONZE_SQL, (1000,))
+            categorias = list(dict.fromkeys(CASOS + [r[0] for r in cur.fetchall()]))
+            cur.execute(CASE_SQL_SQL, (categorias,))
+            esperado = {c: (id_tipo, tipo) for c, id_tipo, tipo in cur.fetchall()}
+        conn.rollback()
+
+    divergencias = 0
+    for categoria in categorias:
+        obtido = parse_categoria_tipo_ingresso(categoria)
+        if obtido != esperado[categoria]:
+            divergencias += 1
+            print(f"[CATEGORIA] {categoria!r}: python={obtido} sql={esperado[categoria]}")
+    print(f"[CATEGORIA] {len(categorias)} categorias comparadas com _bronze.categoria_*, {divergencias} divergência(s)")
+    return 1 if divergencias else 0
+
+
+def bench() -> None:
+    rng = random.Random(42)
+    linhas = [rng.choice(CASOS) for _ in range(BENCH_LINHAS)]
+    sem_cache = parse_categoria_tipo_ingresso.__wrapped__
+
+    inicio = time.perf_counter()
+    for c in linhas:
+        sem_cache(c)
+    t_sem_cache = time.perf_counter() - inicio
+
+    parse_categoria_tipo_ingresso.cache_clear()
+    inicio = time.perf_counter()
+    for c in linhas:
+        parse_categoria_tipo_ingresso(c)
+    t_cache = time.perf_counter() - inicio
+
+    parse_categoria_tipo_ingresso.cache_clear()
+    inicio = time.perf_counter()
+    parse_categorias(linhas)
+    t_lote = time.perf_counter() - inicio
+
+    print(f"[CATEGORIA] {BENCH_LINHAS} linhas:")
+    print(f"  sem cache : {t_sem_cache:.3f}s")
+    print(f"  com cache : {t_cache:.3f}s ({t_sem_cache / t_cache:.1f}x)")
+    print(f"  em lote   : {t_lote:.3f}s ({t_sem_cache / t_lote:.1f}x)")
+
+
+def main() -> int:
+    bench()
+    if "--bench" in sys.argv[1:]:
+        return 0
+    return comparar()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
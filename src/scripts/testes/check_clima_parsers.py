@@ -0,0 +1,60 @@
+import logging
+import sys
+from datetime import datetime, UTC
+
+from src._bronze.clima.driver_pool import USER_AGENT
+from src._bronze.clima.fixtures import FIXTURES_DIR, fixture_path
+from src._bronze.clima.http_fetch import fetch_html, validate_rows
+from src._bronze.clima.accuweather.extract_accuweather import accuweather_tasks
+from src._bronze.clima.climatempo.extract_climatempo import climatempo_tasks
+
+# Checagem offline dos parsers de clima contra HTML salvo (sem Chrome, sem rede).
+#
+#   python -m src.scripts.testes.check_clima_parsers save   # baixa as páginas via HTTP
+#   python -m src.scripts.testes.check_clima_parsers        # parseia e valida as fixtures
+#
+# Também serve para capturar a página do Chrome: salve driver.page_source com o
+# mesmo nome de arquivo e rode a checagem.
+#
+# As fixtures versionadas (fixtures/clima, uma por provedor/cidade) são páginas
+# reduzidas só com a marcação que os parsers leem, para a checagem rodar num
+# checkout limpo; 'save' (ou run_reparse_clima_html.py --fixtures) as troca
+# pela página real.
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+)
+
+
+def save() -> int:
+    FIXTURES_DIR.mkdir(parents=True, exist_ok=True)
+    for task in accuweather_tasks() + climatempo_tasks():
+        path = fixture_path(task.provider, task.cidade)
+        path.write_text(fetch_html(task.url, USER_AGENT), encoding="utf-8")
+        logging.info(f"[Clima][Fixtures] {path.name} salvo")
+    return 0
+
+
+def check() -> int:
+    scraped_at = datetime.now(UTC)
+    exit_code = 0
+    for task in accuweather_tasks() + climatempo_tasks():
+        path = fixture_path(task.provider, task.cidade)
+        if not path.exists():
+            logging.warning(f"[Clima][Fixtures] {path.name} ausente (rode com 'save')")
+            exit_code = 1
+            continue
+
+        rows = task.parse(path.read_text(encoding="utf-8"), task.cidade, scraped_at)
+        motivo = validate_rows(rows, task.min_blocks)
+        if motivo:
+            logging.warning(f"[Clima][Fixtures] {path.name}: rejeitado ({motivo})")
+            exit_code = 1
+        else:
+            logging.info(f"[Clima][Fixtures] {path.name}: {len(rows)} blocos OK")
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(save() if sys.argv[1:] == ["save"] else check())